@@ -0,0 +1,134 @@
+"""
+Per-user robot access.
+
+A user may act on the robots they are assigned to (RobotUser); superusers
+on every robot. The allowed robot ids of a user are loaded with one query,
+kept in the shared cache (and on the user object for the rest of the
+request), and dropped when the user's RobotUser rows change: by the
+signals in signals.py for single rows, by assignments.py for bulk writes.
+ROBOT_ACCESS_CACHE_TTL bounds how long a lost invalidation can linger.
+
+Authorization is then a set lookup:
+
+    can_access_robot(request.user, robot_id)
+    scope_queryset(Schedule.objects.all(), request.user)
+    permission_classes = [IsAuthenticated, HasRobotAccess]
+
+Scoping only applies to authenticated users. Whether anonymous requests
+(devices on AllowAny endpoints, unauthenticated WebSockets) are accepted
+at all is left to each endpoint, as before.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.permissions import BasePermission
+
+from .models import RobotUser
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "robot_access:user"
+
+
+def _cache_key(user_id):
+    return f"{CACHE_PREFIX}:{user_id}"
+
+
+def is_unrestricted(user):
+    return bool(user and user.is_authenticated and user.is_superuser)
+
+
+def allowed_robot_ids(user):
+    """
+    Frozen set of robot ids ``user`` may access, or None for every robot
+    (superusers). Anonymous users get an empty set.
+    """
+    if is_unrestricted(user):
+        return None
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    robot_ids = getattr(user, "_allowed_robot_ids", None)
+    if robot_ids is not None:
+        return robot_ids
+
+    key = _cache_key(user.pk)
+    try:
+        robot_ids = cache.get(key)
+    except Exception:
+        logger.exception("Robot access cache read failed")
+
+    if robot_ids is None:
+        robot_ids = frozenset(
+            RobotUser.objects.filter(user_id=user.pk).values_list("robot_id", flat=True)
+        )
+        try:
+            cache.set(key, robot_ids, settings.ROBOT_ACCESS_CACHE_TTL)
+        except Exception:
+            logger.exception("Robot access cache write failed")
+
+    user._allowed_robot_ids = robot_ids
+    return robot_ids
+
+
+def can_access_robot(user, robot_id):
+    robot_ids = allowed_robot_ids(user)
+    if robot_ids is None:
+        return True
+    try:
+        return int(robot_id) in robot_ids
+    except (TypeError, ValueError):
+        return False
+
+
+def scope_queryset(queryset, user, lookup="robot_id"):
+    """Rows of ``queryset`` whose ``lookup`` is a robot ``user`` may access."""
+    robot_ids = allowed_robot_ids(user)
+    if robot_ids is None:
+        return queryset
+    return queryset.filter(**{f"{lookup}__in": robot_ids})
+
+
+def invalidate_users(user_ids):
+    """Forget the cached robot sets of these users once the transaction commits."""
+    keys = [_cache_key(user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+
+    def drop():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.exception("Robot access cache invalidation failed")
+
+    transaction.on_commit(drop)
+
+
+class HasRobotAccess(BasePermission):
+    """
+    Denies authenticated users access to a robot (``robot_id`` URL kwarg,
+    ``robo_id`` on the older calibration routes where it is the robot's id,
+    or the robot resolved by the view's ``get_access_robot_id()``) they are
+    not assigned to.
+    """
+    message = "You do not have access to this robot."
+    url_kwargs = ("robot_id", "robo_id")
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated or is_unrestricted(user):
+            return True
+
+        if hasattr(view, "get_access_robot_id"):
+            robot_id = view.get_access_robot_id()
+        else:
+            robot_id = next(
+                (view.kwargs[kwarg] for kwarg in self.url_kwargs if kwarg in view.kwargs), None
+            )
+
+        # Nothing robot-specific in the URL (or unknown object → 404 later)
+        if robot_id is None:
+            return True
+        return can_access_robot(user, robot_id)
@@ -0,0 +1,95 @@
+"""
+Bulk robot ↔ user assignment.
+
+Every call resolves robots (by robo_id) and users (by id) with one IN query
+each, reads the pairs that already exist with one more, and writes the
+rest with a single bulk_create / delete, whatever the number of ids.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from robot_management.models import Robot
+from .access import invalidate_users
+from .models import RobotUser
+
+
+def _resolve(robo_ids, user_ids):
+    robots = {
+        robot.robo_id: robot
+        for robot in Robot.objects.filter(robo_id__in=set(robo_ids)).only("id", "robo_id")
+    }
+    users = {
+        user.id: user
+        for user in User.objects.filter(id__in=set(user_ids)).only("id", "username")
+    }
+    missing = {
+        "robots": sorted(set(robo_ids) - robots.keys()),
+        "users": sorted(set(user_ids) - users.keys()),
+    }
+    return robots, users, missing
+
+
+def _existing_pairs(robots, users):
+    return set(
+        RobotUser.objects
+        .filter(robot_id__in=[robot.id for robot in robots.values()], user_id__in=users.keys())
+        .values_list("robot_id", "user_id")
+    )
+
+
+def assign(robo_ids, user_ids, assigned_by=None):
+    """
+    Assign every user to every robot.
+
+    Returns {"robots": {robo_id: {"created": [user ids], "existing": [user ids]}},
+    "missing": {"robots": [robo ids], "users": [user ids]}}.
+    """
+    robots, users, missing = _resolve(robo_ids, user_ids)
+    existing = _existing_pairs(robots, users)
+
+    results = {}
+    new_rows = []
+    for robo_id, robot in robots.items():
+        result = results[robo_id] = {"created": [], "existing": []}
+        for user_id in sorted(users):
+            if (robot.id, user_id) in existing:
+                result["existing"].append(user_id)
+            else:
+                result["created"].append(user_id)
+                new_rows.append(RobotUser(robot=robot, user_id=user_id, assigned_by=assigned_by))
+
+    # A pair inserted concurrently since the read above is skipped, not an error
+    with transaction.atomic():
+        RobotUser.objects.bulk_create(new_rows, batch_size=1000, ignore_conflicts=True)
+        invalidate_users(row.user_id for row in new_rows)
+
+    return {"robots": results, "missing": missing}
+
+
+def revoke(robo_ids, user_ids):
+    """
+    Remove every user from every robot.
+
+    Returns {"robots": {robo_id: {"removed": [user ids], "not_assigned": [user ids]}},
+    "missing": {...}} like assign().
+    """
+    robots, users, missing = _resolve(robo_ids, user_ids)
+
+    with transaction.atomic():
+        existing = _existing_pairs(robots, users)
+
+        results = {}
+        for robo_id, robot in robots.items():
+            result = results[robo_id] = {"removed": [], "not_assigned": []}
+            for user_id in sorted(users):
+                key = "removed" if (robot.id, user_id) in existing else "not_assigned"
+                result[key].append(user_id)
+
+        if existing:
+            RobotUser.objects.filter(
+                robot_id__in=[robot.id for robot in robots.values()],
+                user_id__in=users.keys(),
+            ).delete()
+            invalidate_users(user_id for _, user_id in existing)
+
+    return {"robots": results, "missing": missing}
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import User
+from django.conf import settings
 from rest_framework import serializers
 from .models import UserProfile
 from robot_management.models import Robot
@@ -83,3 +84,23 @@ class UserRobotAssignSerializer(serializers.Serializer):
         child=serializers.CharField(),
         allow_empty=False
     )
+
+
+class BulkRobotUserSerializer(serializers.Serializer):
+    """Every user in user_ids × every robot (robo_id) in robot_ids."""
+    robot_ids = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False
+    )
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False
+    )
+
+    def validate(self, data):
+        pairs = len(set(data["robot_ids"])) * len(set(data["user_ids"]))
+        if pairs > settings.ROBOT_ASSIGNMENT_BULK_MAX_PAIRS:
+            raise serializers.ValidationError(
+                f"At most {settings.ROBOT_ASSIGNMENT_BULK_MAX_PAIRS} robot/user pairs per request"
+            )
+        return data
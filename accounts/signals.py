@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .access import invalidate_users
+from .models import RobotUser
+
+
+# Bulk writes (assignments.py) invalidate explicitly: bulk_create sends no signals
+
+@receiver(post_save, sender=RobotUser)
+def robot_user_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_users([instance.user_id])
+
+
+@receiver(post_delete, sender=RobotUser)
+def robot_user_deleted(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
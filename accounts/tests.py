@@ -1,3 +1,29 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from robot_management.models import Robot
+from .models import RobotUser
+
+
+class HasRobotAccessTests(TestCase):
+
+    def setUp(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.operator = User.objects.create_user("operator")
+        self.own = Robot.objects.create(name="Own", robo_id="RB-OWN")
+        self.other = Robot.objects.create(name="Other", robo_id="RB-OTHER")
+        RobotUser.objects.create(robot=self.own, user=self.operator, assigned_by=admin)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.operator)
+
+    def test_calibration_routes_keyed_by_robo_id_are_scoped(self):
+        for name in ("calibration-detail", "hand-activation", "hand-point-update"):
+            response = self.client.get(reverse(name, kwargs={"robo_id": self.other.id}))
+            self.assertEqual(response.status_code, 403, name)
+
+    def test_robot_id_routes_are_scoped(self):
+        response = self.client.get(reverse("robot-location", kwargs={"robot_id": self.other.id}))
+        self.assertEqual(response.status_code, 403)
@@ -31,5 +31,8 @@ urlpatterns = [
         RemoveRobotsFromUserView.as_view(),
         name="remove-robots-from-user"
     ),
+
+    path("robots/bulk-assign/", BulkAssignRobotUsersView.as_view(), name="bulk-assign-robot-users"),
+    path("robots/bulk-revoke/", BulkRevokeRobotUsersView.as_view(), name="bulk-revoke-robot-users"),
     
 ]
@@ -11,9 +11,10 @@ from django.utils import timezone
 from .models import UserProfile,RobotUser
 from rest_framework.decorators import api_view, permission_classes
 from .serializers import UserListSerializer,RobotUserAssignSerializer
-from robot_management.models import Robot
 from .serializers import *
 from rest_framework.pagination import PageNumberPagination
+from django.shortcuts import get_object_or_404
+from . import assignments
 # ------------------- Registration -------------------
 class RegisterAPIView(APIView):
     permission_classes = [AllowAny]
@@ -256,25 +257,24 @@ class AssignUsersToRobotView(APIView):
         robot_id = serializer.validated_data["robot_id"]
         user_ids = serializer.validated_data["user_ids"]
 
-        robot = Robot.objects.get(robo_id=robot_id)
-
-        assigned_users = []
-
-        for user_id in user_ids:
-            user = User.objects.get(id=user_id)
-
-            obj, created = RobotUser.objects.get_or_create(
-                robot=robot,
-                user=user,
-                defaults={"assigned_by": request.user}
+        result = assignments.assign([robot_id], user_ids, assigned_by=request.user)
+        if robot_id not in result["robots"]:
+            return Response(
+                {"success": False, "message": "Robot not found"},
+                status=status.HTTP_404_NOT_FOUND
             )
-            assigned_users.append(user.username)
+
+        assigned_ids = set(user_ids) - set(result["missing"]["users"])
+        assigned_users = list(
+            User.objects.filter(id__in=assigned_ids).order_by("id").values_list("username", flat=True)
+        )
 
         return Response({
             "success": True,
             "message": "Users assigned successfully",
-            "robot": robot.robo_id,
-            "users": assigned_users
+            "robot": robot_id,
+            "users": assigned_users,
+            "missing_users": result["missing"]["users"]
         }, status=status.HTTP_200_OK)
     
 
@@ -305,22 +305,17 @@ class AssignRobotsToUserView(APIView):
         user_id = serializer.validated_data["user_id"]
         robot_ids = serializer.validated_data["robot_ids"]
 
-        user = User.objects.get(id=user_id)
-        robots = Robot.objects.filter(robo_id__in=robot_ids)
+        user = get_object_or_404(User, id=user_id)
+        result = assignments.assign(robot_ids, [user.id], assigned_by=request.user)
 
         assigned = []
         already_assigned = []
 
-        for robot in robots:
-            obj, created = RobotUser.objects.get_or_create(
-                user=user,
-                robot=robot,
-                defaults={"assigned_by": request.user}
-            )
-            if created:
-                assigned.append(robot.robo_id)
+        for robo_id, outcome in result["robots"].items():
+            if outcome["created"]:
+                assigned.append(robo_id)
             else:
-                already_assigned.append(robot.robo_id)
+                already_assigned.append(robo_id)
 
         return Response(
             {
@@ -328,7 +323,8 @@ class AssignRobotsToUserView(APIView):
                 "message": "Robots assignment processed",
                 "user": user.username,
                 "assigned_robots": assigned,
-                "already_assigned": already_assigned
+                "already_assigned": already_assigned,
+                "missing_robots": result["missing"]["robots"]
             },
             status=status.HTTP_200_OK
         )
@@ -356,3 +352,54 @@ class RemoveRobotsFromUserView(APIView):
             },
             status=status.HTTP_200_OK
         )
+
+
+class BulkAssignRobotUsersView(APIView):
+    """
+    Assign every user in user_ids to every robot in robot_ids (robo_id)
+    with a constant number of queries; reports per robot which users were
+    newly assigned / already assigned, and ids that don't exist.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkRobotUserSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = assignments.assign(
+            serializer.validated_data["robot_ids"],
+            serializer.validated_data["user_ids"],
+            assigned_by=request.user
+        )
+
+        return Response(
+            {
+                "success": True,
+                "message": "Bulk assignment processed",
+                "data": result
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class BulkRevokeRobotUsersView(APIView):
+    """Remove every user in user_ids from every robot in robot_ids."""
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkRobotUserSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = assignments.revoke(
+            serializer.validated_data["robot_ids"],
+            serializer.validated_data["user_ids"]
+        )
+
+        return Response(
+            {
+                "success": True,
+                "message": "Bulk revoke processed",
+                "data": result
+            },
+            status=status.HTTP_200_OK
+        )
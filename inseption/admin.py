@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Inspection, RimType,Schedule
+from .models import Inspection, RimType,Schedule, ScheduleRecurrence
 
 # Register your models here.
 
@@ -37,4 +37,35 @@ class ScheduleAdmin(admin.ModelAdmin):
     readonly_fields = (
         "created_at",
         "end_time",
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ScheduleRecurrence)
+class ScheduleRecurrenceAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "robot",
+        "location",
+        "frequency",
+        "interval",
+        "start_date",
+        "end_date",
+        "scheduled_time",
+        "end_time",
+        "is_active",
+        "materialized_until",
+    )
+
+    list_filter = (
+        "frequency",
+        "is_active",
+        "robot",
+    )
+
+    ordering = ("-id",)
+
+    readonly_fields = (
+        "materialized_until",
+        "created_at",
+        "updated_at",
+    )
@@ -0,0 +1,111 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InspectionBroadcaster:
+    """
+    Coalesces inspection_created events per channel-layer group.
+
+    Request threads only append to an in-process buffer. A background
+    thread flushes every INSPECTION_BROADCAST_WINDOW_MS and sends ONE
+    ``inspections_created`` message per group carrying the whole batch,
+    so a robot pushing 10 frames/s costs ~4 group_sends/s instead of 10.
+    A window of 0 sends synchronously (handy for tests / debugging).
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending = defaultdict(list)
+        self._has_pending = threading.Event()
+        self._thread = None
+
+    @property
+    def window(self):
+        return settings.INSPECTION_BROADCAST_WINDOW_MS / 1000
+
+    def publish(self, group_name, data):
+        self.publish_many(group_name, [data])
+
+    def publish_many(self, group_name, items):
+        if not items:
+            return
+
+        if self.window <= 0:
+            self._send({group_name: list(items)})
+            return
+
+        # Forked worker (gunicorn --preload etc.): the parent's thread is gone
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._lock:
+            self._pending[group_name].extend(items)
+            self._has_pending.set()
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="inspection-broadcaster",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def flush(self, at_exit=False):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(list)
+            self._has_pending.clear()
+
+        if pending:
+            self._send(pending, at_exit=at_exit)
+
+    def _run(self):
+        while True:
+            self._has_pending.wait()
+            # Let the window fill up before sending
+            time.sleep(self.window)
+            self.flush()
+
+    def _send(self, pending, at_exit=False):
+        try:
+            if at_exit:
+                # async_to_sync needs a thread pool, which refuses new work
+                # once the interpreter is shutting down
+                asyncio.run(self._group_send_all(pending))
+            else:
+                async_to_sync(self._group_send_all)(pending)
+        except Exception:
+            logger.exception("Failed to broadcast inspections_created")
+
+    @staticmethod
+    async def _group_send_all(pending):
+        channel_layer = get_channel_layer()
+        await asyncio.gather(*(
+            channel_layer.group_send(
+                group_name,
+                {
+                    "type": "inspections_created",  # consumer method
+                    "event": "inspections_created",
+                    "data": items,
+                }
+            )
+            for group_name, items in pending.items()
+        ))
+
+
+inspection_broadcaster = InspectionBroadcaster()
+atexit.register(inspection_broadcaster.flush, at_exit=True)
@@ -0,0 +1,381 @@
+"""
+Incremental maintenance of RobotCounter / ScheduleCounter.
+
+Single-row writes (save / delete) are picked up by the signal handlers in
+signals.py. Paths that bypass signals (bulk_create, queryset.update) must
+call the matching helper below.
+
+Every helper also invalidates the cached dashboard responses of the
+robots it touched (dashboard_cache.py).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from . import dashboard_cache
+from .models import Inspection, RobotCounter, Schedule, ScheduleCounter
+
+
+INSPECTION_COUNTER_FIELDS = (
+    "total_inspections",
+    "total_defected",
+    "approved_count",
+    "human_verified_count",
+    "pending_verification_count",
+    "false_detected_count",
+)
+
+SCHEDULE_COUNTER_FIELDS = (
+    "total_schedules",
+    "scheduled_count",
+    "processing_count",
+    "completed_count",
+)
+
+SCHEDULE_STATUS_FIELDS = {
+    "scheduled": "scheduled_count",
+    "processing": "processing_count",
+    "completed": "completed_count",
+}
+
+INSPECTION_STATE_FIELDS = ("schedule_id", "is_defect", "is_approved", "is_human_verified", "false_detected")
+SCHEDULE_STATE_FIELDS = ("robot_id", "status", "is_canceled")
+
+
+# ---------------- contributions ----------------
+
+def inspection_state(inspection):
+    return {field: getattr(inspection, field) for field in INSPECTION_STATE_FIELDS}
+
+
+def schedule_state(schedule):
+    return {field: getattr(schedule, field) for field in SCHEDULE_STATE_FIELDS}
+
+
+def inspection_contribution(state):
+    if not state:
+        return {}
+
+    return {
+        "total_inspections": 1,
+        "total_defected": int(state["is_defect"]),
+        "approved_count": int(state["is_approved"]),
+        "human_verified_count": int(state["is_human_verified"]),
+        "pending_verification_count": int(
+            not state["is_human_verified"] and not state["is_approved"]
+        ),
+        "false_detected_count": int(state["false_detected"]),
+    }
+
+
+def schedule_contribution(state):
+    if not state or state["is_canceled"]:
+        return {}
+
+    contribution = {"total_schedules": 1}
+    status_field = SCHEDULE_STATUS_FIELDS.get(state["status"])
+    if status_field:
+        contribution[status_field] = 1
+    return contribution
+
+
+def _diff(old, new):
+    deltas = {}
+    for field in set(old) | set(new):
+        delta = new.get(field, 0) - old.get(field, 0)
+        if delta:
+            deltas[field] = delta
+    return deltas
+
+
+def _negate(contribution):
+    return {field: -value for field, value in contribution.items()}
+
+
+def _drop_zero(deltas):
+    return {field: value for field, value in deltas.items() if value}
+
+
+def _apply(model, lookup, deltas):
+    if not deltas:
+        return
+
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+
+    # Missing row: only create it for increments. Pure decrements happen
+    # while parents are being deleted and must not resurrect the row.
+    if not any(delta > 0 for delta in deltas.values()):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Created concurrently by another writer
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _robot_id_for_schedule(schedule_id):
+    return (
+        Schedule.objects
+        .filter(id=schedule_id)
+        .values_list("robot_id", flat=True)
+        .first()
+    )
+
+
+def _invalidate(robot_ids):
+    if robot_ids is None:
+        dashboard_cache.invalidate_all()
+    else:
+        dashboard_cache.invalidate_robots(robot_ids)
+
+
+# ---------------- inspections ----------------
+
+def inspection_changed(old_state, new_state):
+    """Apply the counter delta between two inspection states (either may be None)."""
+    old_schedule = old_state["schedule_id"] if old_state else None
+    new_schedule = new_state["schedule_id"] if new_state else None
+
+    if old_schedule == new_schedule:
+        per_schedule = [(new_schedule, _diff(
+            inspection_contribution(old_state),
+            inspection_contribution(new_state),
+        ))]
+    else:
+        per_schedule = [
+            (old_schedule, _negate(inspection_contribution(old_state))),
+            (new_schedule, inspection_contribution(new_state)),
+        ]
+
+    for schedule_id, deltas in per_schedule:
+        if schedule_id is None or not deltas:
+            continue
+
+        _apply(ScheduleCounter, {"schedule_id": schedule_id}, deltas)
+
+        robot_id = _robot_id_for_schedule(schedule_id)
+        if robot_id is not None:
+            _apply(RobotCounter, {"robot_id": robot_id}, deltas)
+            dashboard_cache.invalidate_robots([robot_id])
+
+
+def inspections_created(inspections):
+    """Counter update for rows inserted with bulk_create (no signals fired)."""
+    per_schedule = {}
+    per_robot = {}
+
+    for inspection in inspections:
+        contribution = inspection_contribution(inspection_state(inspection))
+        robot_id = inspection.schedule.robot_id
+
+        for bucket, key in ((per_schedule, inspection.schedule_id), (per_robot, robot_id)):
+            totals = bucket.setdefault(key, {})
+            for field, value in contribution.items():
+                totals[field] = totals.get(field, 0) + value
+
+    for schedule_id, deltas in per_schedule.items():
+        _apply(ScheduleCounter, {"schedule_id": schedule_id}, _drop_zero(deltas))
+
+    for robot_id, deltas in per_robot.items():
+        _apply(RobotCounter, {"robot_id": robot_id}, _drop_zero(deltas))
+
+    dashboard_cache.invalidate_robots(per_robot)
+
+
+# ---------------- schedules ----------------
+
+def schedule_changed(old_state, new_state):
+    """Apply the robot counter delta between two schedule states (either may be None)."""
+    if old_state and new_state and old_state["robot_id"] != new_state["robot_id"]:
+        # Schedule moved to another robot: its inspections move with it
+        rebuild_counters(robot_ids=[old_state["robot_id"], new_state["robot_id"]])
+        return
+
+    robot_id = (new_state or old_state)["robot_id"]
+    _apply(RobotCounter, {"robot_id": robot_id}, _diff(
+        schedule_contribution(old_state),
+        schedule_contribution(new_state),
+    ))
+    # Any schedule write changes the cached schedule lists
+    dashboard_cache.invalidate_robots([robot_id])
+
+
+def refresh_schedule_counters(robot_ids=None):
+    """
+    Recompute only the schedule fields of RobotCounter.
+    Use after Schedule queryset.update() calls (robot_ids=None → all robots).
+    """
+    schedules = Schedule.objects.all()
+    counters = RobotCounter.objects.all()
+    if robot_ids is not None:
+        schedules = schedules.filter(robot_id__in=robot_ids)
+        counters = counters.filter(robot_id__in=robot_ids)
+
+    totals = {row.pop("robot_id"): row for row in _schedule_totals(schedules)}
+
+    with transaction.atomic():
+        counters.exclude(robot_id__in=totals).update(
+            **{field: 0 for field in SCHEDULE_COUNTER_FIELDS}
+        )
+        for robot_id, values in totals.items():
+            RobotCounter.objects.update_or_create(robot_id=robot_id, defaults=values)
+
+    _invalidate(robot_ids)
+
+
+# ---------------- rebuild ----------------
+
+def _schedule_totals(schedules):
+    active = Q(is_canceled=False)
+    return (
+        schedules
+        .order_by()
+        .values("robot_id")
+        .annotate(
+            total_schedules=Count("id", filter=active),
+            scheduled_count=Count("id", filter=active & Q(status="scheduled")),
+            processing_count=Count("id", filter=active & Q(status="processing")),
+            completed_count=Count("id", filter=active & Q(status="completed")),
+        )
+    )
+
+
+def _inspection_totals(inspections, group_by):
+    return (
+        inspections
+        .order_by()
+        .values(group_by)
+        .annotate(
+            total_inspections=Count("id"),
+            total_defected=Count("id", filter=Q(is_defect=True)),
+            approved_count=Count("id", filter=Q(is_approved=True)),
+            human_verified_count=Count("id", filter=Q(is_human_verified=True)),
+            pending_verification_count=Count(
+                "id", filter=Q(is_human_verified=False, is_approved=False)
+            ),
+            false_detected_count=Count("id", filter=Q(false_detected=True)),
+        )
+    )
+
+
+def rebuild_counters(robot_ids=None):
+    """Recompute RobotCounter / ScheduleCounter from the source tables."""
+    schedules = Schedule.objects.all()
+    inspections = Inspection.objects.all()
+    robot_counters = RobotCounter.objects.all()
+    schedule_counters = ScheduleCounter.objects.all()
+
+    if robot_ids is not None:
+        schedules = schedules.filter(robot_id__in=robot_ids)
+        inspections = inspections.filter(schedule__robot_id__in=robot_ids)
+        robot_counters = robot_counters.filter(robot_id__in=robot_ids)
+        schedule_counters = schedule_counters.filter(schedule__robot_id__in=robot_ids)
+
+    robots = {}
+    for row in _schedule_totals(schedules):
+        robots[row.pop("robot_id")] = row
+    for row in _inspection_totals(inspections, "schedule__robot_id"):
+        robots.setdefault(row.pop("schedule__robot_id"), {}).update(row)
+
+    with transaction.atomic():
+        robot_counters.delete()
+        schedule_counters.delete()
+
+        RobotCounter.objects.bulk_create(
+            [RobotCounter(robot_id=robot_id, **values) for robot_id, values in robots.items()],
+            batch_size=500,
+        )
+        ScheduleCounter.objects.bulk_create(
+            [
+                ScheduleCounter(schedule_id=row.pop("schedule_id"), **row)
+                for row in _inspection_totals(inspections, "schedule_id")
+            ],
+            batch_size=500,
+        )
+
+    _invalidate(robot_ids)
+    return len(robots)
+
+
+# ---------------- readers ----------------
+
+def schedule_summary(counter):
+    """``counter`` is a RobotCounter, a dict of its fields, or None."""
+    if isinstance(counter, dict):
+        values = {field: counter.get(field) or 0 for field in SCHEDULE_COUNTER_FIELDS}
+    else:
+        values = {field: getattr(counter, field, 0) for field in SCHEDULE_COUNTER_FIELDS}
+
+    return {
+        "total": values["total_schedules"],
+        "scheduled": values["scheduled_count"],
+        "processing": values["processing_count"],
+        "completed": values["completed_count"],
+    }
+
+
+def window_summary(schedules):
+    """
+    (schedule_summary, inspection_summary) of a filtered Schedule queryset
+    in ONE grouped query: per-status schedule counts plus the sums of their
+    ScheduleCounter rows (one-to-one join, so no fan-out).
+    """
+    rows = (
+        schedules
+        .order_by()
+        .values("status")
+        .annotate(
+            schedules=Count("id"),
+            **{field: Sum(f"counters__{field}") for field in INSPECTION_COUNTER_FIELDS},
+        )
+    )
+
+    per_status = {}
+    inspections = dict.fromkeys(INSPECTION_COUNTER_FIELDS, 0)
+    for row in rows:
+        per_status[row["status"]] = row["schedules"]
+        for field in INSPECTION_COUNTER_FIELDS:
+            inspections[field] += row[field] or 0
+
+    summary = {
+        "total": sum(per_status.values()),
+        "scheduled": per_status.get("scheduled", 0),
+        "processing": per_status.get("processing", 0),
+        "completed": per_status.get("completed", 0),
+    }
+    return summary, inspection_summary(inspections)
+
+
+def robot_schedule_summary(robot_id=None, robot_ids=None):
+    """
+    schedule_summary for one robot, or summed over ``robot_ids`` (None: all
+    robots) with one small query.
+    """
+    counters = RobotCounter.objects.all()
+    if robot_id is not None:
+        counters = counters.filter(robot_id=robot_id)
+    if robot_ids is not None:
+        counters = counters.filter(robot_id__in=robot_ids)
+    return schedule_summary(counters.aggregate(
+        **{field: Sum(field) for field in SCHEDULE_COUNTER_FIELDS}
+    ))
+
+
+def inspection_summary(counter):
+    """``counter`` is a RobotCounter / ScheduleCounter, a dict of its fields, or None."""
+    if isinstance(counter, dict):
+        values = {field: counter.get(field) or 0 for field in INSPECTION_COUNTER_FIELDS}
+    else:
+        values = {field: getattr(counter, field, 0) for field in INSPECTION_COUNTER_FIELDS}
+
+    return {
+        "total": values["total_inspections"],
+        "defected": values["total_defected"],
+        "non_defected": values["total_inspections"] - values["total_defected"],
+        "approved": values["approved_count"],
+        "human_verified": values["human_verified_count"],
+        "pending_verification": values["pending_verification_count"],
+    }
@@ -0,0 +1,102 @@
+"""
+Response cache for the schedule / inspection dashboard endpoints.
+
+Entries are keyed by endpoint, robot, a version number and a hash of the
+request parameters (filter window, cursor, page size). Writes don't delete
+entries; they bump the robot's version (and the cross-robot "all" version),
+so every cached variant of that robot becomes unreachable at once and
+simply expires. invalidate_all() bumps a global epoch for fleet-wide
+updates.
+
+Invalidation runs on transaction commit from the model signals and from
+the counter helpers that bulk paths (bulk_create, queryset.update, the
+schedule dispatcher and Celery tasks) already have to call.
+
+Cache failures never break a request: the view falls back to the database.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "dashboard"
+EPOCH_KEY = f"{PREFIX}:epoch"
+ALL_ROBOTS = "all"
+
+
+def _version_key(robot_id):
+    return f"{PREFIX}:v:{ALL_ROBOTS if robot_id is None else robot_id}"
+
+
+def _bump(keys):
+    try:
+        for key in keys:
+            # Version keys never expire; add() only succeeds the first time
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+    except Exception:
+        logger.exception("Dashboard cache invalidation failed")
+
+
+def invalidate_robots(robot_ids):
+    """Drop cached dashboard data of these robots once the transaction commits."""
+    keys = {_version_key(robot_id) for robot_id in robot_ids if robot_id is not None}
+    if not keys:
+        return
+
+    keys.add(_version_key(None))
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_all():
+    transaction.on_commit(lambda: _bump([EPOCH_KEY]))
+
+
+def _params_hash(params):
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def cached(name, robot_id, params, build):
+    """
+    Return ``build()`` through the cache. ``params`` is everything besides
+    the robot that changes the response (query string, filter body).
+    """
+    try:
+        versions = cache.get_many([EPOCH_KEY, _version_key(robot_id)])
+        key = ":".join((
+            PREFIX,
+            name,
+            str(ALL_ROBOTS if robot_id is None else robot_id),
+            str(versions.get(EPOCH_KEY, 0)),
+            str(versions.get(_version_key(robot_id), 0)),
+            _params_hash(params),
+        ))
+        value = cache.get(key)
+    except Exception:
+        logger.exception("Dashboard cache read failed")
+        return build()
+
+    if value is not None:
+        return value
+
+    value = build()
+    try:
+        cache.set(key, value, settings.DASHBOARD_CACHE_TTL)
+    except Exception:
+        logger.exception("Dashboard cache write failed")
+    return value
+
+
+def request_params(request, **extra):
+    """
+    Query string (as a plain dict of lists) plus the host, which ends up in
+    pagination links, and any ``extra`` inputs: a stable hash input.
+    """
+    params = {key: request.query_params.getlist(key) for key in request.query_params}
+    return {"host": request.get_host(), "query": params, **extra}
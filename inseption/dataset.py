@@ -0,0 +1,200 @@
+"""
+Training-dataset export of human-verified inspections.
+
+Samples are written WebDataset-style: each inspection becomes two tar
+members sharing one key,
+
+    000000123.jpeg   image bytes
+    000000123.json   labels / metadata
+
+The tar framing is produced by hand (header, streamed body, padding), so
+an export holds one read chunk in memory whatever the dataset size. Under
+ASGI the stream has to be served through astream_samples(): Django
+buffers a synchronous iterator whole before sending it.
+Exports are ordered by (verified_at, id); a cursor on that key makes them
+incremental. verified_at is stamped before the verification commits, so a
+shard stops TRAINING_DATASET_EXPORT_LAG_SECONDS short of now: a row that
+commits after later-stamped rows went out would otherwise fall behind the
+client's cursor and never be exported.
+"""
+import base64
+import binascii
+import json
+import logging
+import os
+import tarfile
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Inspection
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK = 64 * 1024
+
+
+# ---------------- cursor ----------------
+
+def encode_cursor(verified_at, inspection_id):
+    raw = f"{verified_at.isoformat()}|{inspection_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (verified_at, id); raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        verified_at, inspection_id = raw.rsplit("|", 1)
+        parsed = parse_datetime(verified_at)
+        if parsed is None:
+            raise ValueError(verified_at)
+        return parsed, int(inspection_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+# ---------------- queryset ----------------
+
+def verified_inspections(after=None, until=None):
+    """
+    Human-verified inspections with an image, in (verified_at, id) order,
+    strictly after ``after`` and up to ``until`` inclusive (both keys).
+    """
+    qs = (
+        Inspection.objects
+        .filter(is_human_verified=True, verified_at__isnull=False)
+        .exclude(image="")
+        .exclude(image__isnull=True)
+        .select_related("rim_type")
+        .only(
+            "id", "rim_id", "image", "is_defect", "false_detected", "correct_label",
+            "is_approved", "verified_at", "schedule_id", "rim_type__name",
+        )
+        .order_by("verified_at", "id")
+    )
+
+    if after:
+        verified_at, inspection_id = after
+        qs = qs.filter(
+            Q(verified_at__gt=verified_at)
+            | Q(verified_at=verified_at, id__gt=inspection_id)
+        )
+    if until:
+        verified_at, inspection_id = until
+        qs = qs.filter(
+            Q(verified_at__lt=verified_at)
+            | Q(verified_at=verified_at, id__lte=inspection_id)
+        )
+    return qs
+
+
+def shard_end(after, limit, now=None):
+    """
+    Key of the last of the next ``limit`` samples after ``after``, leaving
+    out the lag window; None if none are left.
+    """
+    upper = (now or timezone.now()) - timedelta(seconds=settings.TRAINING_DATASET_EXPORT_LAG_SECONDS)
+    keys = verified_inspections(after).filter(verified_at__lte=upper).values_list("verified_at", "id")
+    return keys[limit - 1:limit].first() or keys.last()
+
+
+def sample_metadata(inspection):
+    return {
+        "id": inspection.id,
+        "rim_id": inspection.rim_id,
+        "schedule_id": inspection.schedule_id,
+        "rim_type": inspection.rim_type.name if inspection.rim_type else None,
+        "is_defect": inspection.is_defect,
+        "false_detected": inspection.false_detected,
+        "correct_label": inspection.correct_label,
+        "is_approved": inspection.is_approved,
+        "verified_at": inspection.verified_at.isoformat(),
+    }
+
+
+# ---------------- tar framing ----------------
+
+def _member_header(name, size, mtime):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = mtime
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _padding(size):
+    remainder = size % tarfile.BLOCKSIZE
+    return b"\0" * (tarfile.BLOCKSIZE - remainder) if remainder else b""
+
+
+def tar_member(name, fileobj, size, mtime):
+    """Yield one tar member, reading ``fileobj`` in READ_CHUNK pieces."""
+    yield _member_header(name, size, mtime)
+
+    remaining = size
+    while remaining:
+        chunk = fileobj.read(min(READ_CHUNK, remaining))
+        if not chunk:
+            raise IOError(f"{name}: file shrank while exporting")
+        remaining -= len(chunk)
+        yield chunk
+
+    yield _padding(size)
+
+
+def tar_bytes_member(name, data, mtime):
+    yield _member_header(name, len(data), mtime)
+    yield data
+    yield _padding(len(data))
+
+
+def tar_end():
+    # Two zero blocks close the archive
+    return b"\0" * (2 * tarfile.BLOCKSIZE)
+
+
+def sample_chunks(inspection):
+    """Tar chunks of one sample; empty if its image is missing from storage."""
+    key = f"{inspection.id:09d}"
+    ext = os.path.splitext(inspection.image.name)[1].lower() or ".jpg"
+    mtime = int(inspection.verified_at.timestamp())
+
+    try:
+        image = inspection.image.open("rb")
+        size = inspection.image.size
+    except (FileNotFoundError, OSError):
+        logger.warning("Dataset export: image missing for inspection %s", inspection.id)
+        return
+
+    with image:
+        yield from tar_member(f"{key}{ext}", image, size, mtime)
+
+    metadata = json.dumps(sample_metadata(inspection), ensure_ascii=False).encode()
+    yield from tar_bytes_member(f"{key}.json", metadata, mtime)
+
+
+def stream_samples(inspections):
+    """One uncompressed tar of ``inspections`` as an iterator of byte chunks."""
+    for inspection in inspections.iterator(chunk_size=500):
+        yield from sample_chunks(inspection)
+    yield tar_end()
+
+
+async def astream_samples(inspections):
+    """stream_samples() for ASGI: each chunk is read in the sync thread."""
+    chunks = stream_samples(inspections)
+    # thread_sensitive keeps the queryset iterator on one connection
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
@@ -0,0 +1,123 @@
+"""
+Thumbnail / medium variants of Inspection.image.
+
+Variants are rendered by the ``generate_inspection_derivatives`` Celery
+task after the inspection row is committed, so uploads never wait on
+Pillow. Sizes and format come from INSPECTION_IMAGE_DERIVATIVES /
+INSPECTION_IMAGE_DERIVATIVE_FORMAT.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .models import Inspection
+
+logger = logging.getLogger(__name__)
+
+# variant name → Inspection field
+VARIANT_FIELDS = {
+    "thumb": "image_thumb",
+    "medium": "image_medium",
+}
+
+EXTENSIONS = {
+    "WEBP": "webp",
+    "JPEG": "jpg",
+}
+
+SAVE_OPTIONS = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 80, "optimize": True, "progressive": True},
+}
+
+
+def render_variant(source, max_edge, image_format):
+    """Downscale ``source`` (file-like) to fit max_edge × max_edge; returns bytes."""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, **SAVE_OPTIONS[image_format])
+        return buffer.getvalue()
+
+
+def generate_derivatives(inspection, force=False):
+    """
+    Render every configured variant of ``inspection.image``.
+    Returns the list of fields written.
+    """
+    if not inspection.image:
+        return []
+
+    image_format = settings.INSPECTION_IMAGE_DERIVATIVE_FORMAT
+    extension = EXTENSIONS[image_format]
+    stem = os.path.splitext(os.path.basename(inspection.image.name))[0]
+
+    updates = {}
+    replaced = []
+    for variant, max_edge in settings.INSPECTION_IMAGE_DERIVATIVES.items():
+        field_name = VARIANT_FIELDS[variant]
+        current = getattr(inspection, field_name)
+        if current and not force:
+            continue
+
+        with inspection.image.open("rb") as source:
+            content = render_variant(source, max_edge, image_format)
+
+        field = Inspection._meta.get_field(field_name)
+        name = field.generate_filename(inspection, f"{stem}_{variant}.{extension}")
+        updates[field_name] = field.storage.save(name, ContentFile(content))
+        if current:
+            replaced.append((field.storage, current.name))
+
+    if updates:
+        # .update(): no post_save, the counter / derivative signals stay quiet
+        Inspection.objects.filter(pk=inspection.pk).update(**updates)
+        for field_name, name in updates.items():
+            setattr(inspection, field_name, name)
+
+    for storage, name in replaced:
+        storage.delete(name)
+
+    return list(updates)
+
+
+def generate_for_ids(inspection_ids, force=False):
+    """Task body: render variants for a batch of inspections."""
+    done = 0
+    for inspection in Inspection.objects.filter(id__in=inspection_ids).exclude(image=""):
+        try:
+            if generate_derivatives(inspection, force=force):
+                done += 1
+        except Exception:
+            # Corrupt / missing source: keep going with the rest of the batch
+            logger.exception("Derivatives failed for inspection %s", inspection.id)
+    return done
+
+
+def enqueue_derivatives(inspection_ids):
+    """Queue variant rendering once the surrounding transaction commits."""
+    inspection_ids = list(inspection_ids)
+    if not inspection_ids:
+        return
+
+    from .tasks import generate_inspection_derivatives
+
+    def send():
+        try:
+            generate_inspection_derivatives.delay(inspection_ids)
+        except Exception:
+            # Broker down: the serializer falls back to the original image,
+            # backfill_image_derivatives picks these up later
+            logger.warning("Could not queue derivatives for %s", inspection_ids, exc_info=True)
+
+    transaction.on_commit(send)
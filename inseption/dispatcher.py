@@ -0,0 +1,265 @@
+"""
+Schedule status dispatcher.
+
+Replaces the per-schedule Celery ETA tasks: one long-running process
+(``manage.py run_schedule_dispatcher``) keeps an in-memory heap of
+upcoming scheduled → processing → completed transitions, rehydrated from
+the Schedule table on start and kept in sync through Schedule.updated_at.
+
+The database stays the source of truth: every transition is applied with
+a guarded bulk UPDATE, so stale heap entries (edited / canceled schedules)
+are harmless.
+"""
+import heapq
+import itertools
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+from .models import Schedule
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUSES = ("scheduled", "processing")
+
+# status → statuses it may be entered from
+TRANSITION_SOURCES = {
+    "processing": ("scheduled",),
+    "completed": ("scheduled", "processing"),
+}
+
+# Re-read a little history on every sync so rows committed by slow
+# transactions (older updated_at) are not missed.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def transition_times(schedule):
+    """Aware start / end datetimes of a schedule in the project time zone."""
+    start = timezone.make_aware(
+        datetime.combine(schedule.scheduled_date, schedule.scheduled_time)
+    )
+    end = None
+    if schedule.end_time:
+        end = timezone.make_aware(
+            datetime.combine(schedule.scheduled_date, schedule.end_time)
+        )
+    return start, end
+
+
+def pending_transitions(schedule):
+    """{status: due_at} still ahead of this schedule."""
+    if schedule.is_canceled or schedule.status not in PENDING_STATUSES:
+        return {}
+
+    start, end = transition_times(schedule)
+    transitions = {}
+    if schedule.status == "scheduled":
+        transitions["processing"] = start
+    if end:
+        transitions["completed"] = end
+    return transitions
+
+
+def apply_transitions(processing_ids=(), completed_ids=()):
+    """
+    Move schedules to processing / completed with one guarded bulk UPDATE per
+    status, then send one schedule_updated event per robot.
+    Returns the list of (schedule_id, status) actually applied.
+    """
+    now = timezone.now()
+    applied = []
+    per_robot = defaultdict(list)
+
+    with transaction.atomic():
+        for new_status, ids in (("processing", processing_ids), ("completed", completed_ids)):
+            if not ids:
+                continue
+
+            qs = Schedule.objects.filter(
+                id__in=ids,
+                is_canceled=False,
+                status__in=TRANSITION_SOURCES[new_status],
+            )
+            rows = list(qs.values_list("id", "robot_id", "robot__robo_id"))
+            if not rows:
+                continue
+
+            Schedule.objects.filter(id__in=[row[0] for row in rows]).update(
+                status=new_status,
+                updated_at=now,
+            )
+
+            for schedule_id, robot_id, robo_id in rows:
+                applied.append((schedule_id, new_status))
+                per_robot[(robot_id, robo_id)].append(
+                    {"id": schedule_id, "status": new_status}
+                )
+
+        if per_robot:
+            # queryset.update() skips the counter signals
+            counters.refresh_schedule_counters(
+                robot_ids=[robot_id for robot_id, _ in per_robot]
+            )
+
+    if per_robot:
+        _broadcast(per_robot)
+
+    return applied
+
+
+def _broadcast(per_robot):
+    channel_layer = get_channel_layer()
+
+    for (_, robo_id), schedules in per_robot.items():
+        statuses = {item["status"] for item in schedules}
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f"robot_message_{robo_id}",
+                {
+                    "type": "robot_message",  # must match consumer method
+                    "event": "schedule_updated",
+                    "data": {
+                        # kept for existing robot clients
+                        "status": "processing" if "processing" in statuses else "completed",
+                        "schedules": schedules,
+                    },
+                }
+            )
+        except Exception:
+            logger.exception("schedule_updated broadcast failed for robot %s", robo_id)
+
+
+class ScheduleDispatcher:
+    """
+    Indexed min-heap of upcoming schedule transitions.
+
+    Heap entries are (due_at, seq, schedule_id, status). ``_index`` holds the
+    current {status: due_at} per schedule; a popped entry that no longer
+    matches the index belongs to an older version of the schedule and is
+    dropped (lazy deletion), so re-tracking is O(log n).
+    """
+
+    def __init__(self, horizon_days=None):
+        self.horizon = timedelta(
+            days=horizon_days or settings.SCHEDULE_DISPATCHER_HORIZON_DAYS
+        )
+        self._heap = []
+        self._index = {}
+        self._seq = itertools.count()
+        self._synced_at = None
+        self._loaded_at = None
+
+    def __len__(self):
+        return len(self._index)
+
+    # -------- loading --------
+
+    def _window_end(self, now):
+        return timezone.localtime(now).date() + self.horizon
+
+    def load(self, now=None):
+        """Full rehydrate from the database (startup / periodic refresh)."""
+        now = now or timezone.now()
+        self._heap = []
+        self._index = {}
+
+        schedules = Schedule.objects.filter(
+            is_canceled=False,
+            status__in=PENDING_STATUSES,
+            scheduled_date__lte=self._window_end(now),
+        ).only("id", "scheduled_date", "scheduled_time", "end_time", "status", "is_canceled")
+
+        for schedule in schedules.iterator(chunk_size=2000):
+            self.track(schedule)
+
+        self._synced_at = now
+        self._loaded_at = now
+        logger.info("Schedule dispatcher loaded %s schedules", len(self._index))
+
+    def sync(self, now=None):
+        """Pick up schedules created / edited / canceled since the last sync."""
+        now = now or timezone.now()
+        if self._synced_at is None:
+            return self.load(now)
+
+        changed = Schedule.objects.filter(
+            updated_at__gte=self._synced_at - SYNC_OVERLAP,
+        ).only("id", "scheduled_date", "scheduled_time", "end_time", "status", "is_canceled")
+
+        window_end = self._window_end(now)
+        for schedule in changed.iterator(chunk_size=2000):
+            if schedule.scheduled_date > window_end:
+                self.untrack(schedule.id)
+            else:
+                self.track(schedule)
+
+        self._synced_at = now
+
+    def track(self, schedule):
+        transitions = pending_transitions(schedule)
+        if not transitions:
+            self.untrack(schedule.id)
+            return
+
+        if self._index.get(schedule.id) == transitions:
+            return
+
+        self._index[schedule.id] = transitions
+        for status, due_at in transitions.items():
+            heapq.heappush(self._heap, (due_at, next(self._seq), schedule.id, status))
+
+    def untrack(self, schedule_id):
+        self._index.pop(schedule_id, None)
+
+    # -------- dispatching --------
+
+    def _is_current(self, entry):
+        due_at, _, schedule_id, status = entry
+        return self._index.get(schedule_id, {}).get(status) == due_at
+
+    def next_due(self):
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return {status: [schedule_id, ...]} due at or before ``now``."""
+        due = defaultdict(set)
+
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+
+            _, _, schedule_id, status = entry
+            due[status].add(schedule_id)
+
+            remaining = self._index[schedule_id]
+            remaining.pop(status)
+            if not remaining:
+                del self._index[schedule_id]
+
+        # Missed the whole window (e.g. dispatcher was down): go straight to completed
+        due["processing"] -= due["completed"]
+        return due
+
+    def tick(self, now=None):
+        now = now or timezone.now()
+        due = self.pop_due(now)
+        if not due["processing"] and not due["completed"]:
+            return []
+
+        return apply_transitions(
+            processing_ids=sorted(due["processing"]),
+            completed_ids=sorted(due["completed"]),
+        )
+
+    def needs_reload(self, now):
+        return self._loaded_at is None or now - self._loaded_at >= timedelta(hours=1)
@@ -0,0 +1,114 @@
+from django.db import transaction
+
+from . import counters
+from .derivatives import enqueue_derivatives
+from .models import Inspection
+from .serializers import InspectionBatchItemSerializer, InspectionSerializer
+
+
+def _failed(index, rim_id, errors):
+    return {
+        "index": index,
+        "rim_id": rim_id,
+        "success": False,
+        "errors": errors,
+    }
+
+
+def ingest_inspections(schedule, items):
+    """
+    Validate and insert a batch of inspections for one schedule.
+
+    ``items`` is a list of dicts shaped like InspectionBatchItemSerializer
+    input (``image`` may hold an uploaded file). Files are stored in one
+    pass and all rows go in with a single bulk_create inside one
+    transaction.
+
+    Returns ``(created, results)``: the created Inspection objects and one
+    result dict per input item, in input order.
+    """
+    results = [None] * len(items)
+    pending = []
+    seen = set()
+
+    # -------- Per-item validation (no DB hits) --------
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _failed(index, None, {"item": ["Must be an object."]})
+            continue
+
+        serializer = InspectionBatchItemSerializer(data=item)
+        if not serializer.is_valid():
+            results[index] = _failed(index, item.get("rim_id"), serializer.errors)
+            continue
+
+        rim_id = serializer.validated_data["rim_id"]
+        if rim_id in seen:
+            results[index] = _failed(
+                index, rim_id, {"rim_id": ["Duplicate rim_id in this batch."]}
+            )
+            continue
+
+        seen.add(rim_id)
+        pending.append((index, serializer.validated_data))
+
+    # -------- rim_id uniqueness (one query for the whole batch) --------
+    existing = set(
+        Inspection.objects
+        .filter(rim_id__in=seen)
+        .values_list("rim_id", flat=True)
+    )
+
+    to_create = []
+    for index, data in pending:
+        if data["rim_id"] in existing:
+            results[index] = _failed(
+                index,
+                data["rim_id"],
+                {"rim_id": ["Inspection with this rim id already exists."]},
+            )
+            continue
+        to_create.append((index, Inspection(schedule=schedule, **data)))
+
+    if not to_create:
+        return [], results
+
+    # -------- Store files + bulk insert --------
+    image_field = Inspection._meta.get_field("image")
+    stored = []
+
+    try:
+        with transaction.atomic():
+            for _, inspection in to_create:
+                if inspection.image:
+                    image_field.pre_save(inspection, add=True)
+                    stored.append(inspection.image.name)
+
+            Inspection.objects.bulk_create(
+                [inspection for _, inspection in to_create]
+            )
+            # bulk_create skips post_save, keep the counters in step here
+            counters.inspections_created(
+                [inspection for _, inspection in to_create]
+            )
+            enqueue_derivatives(
+                inspection.pk for _, inspection in to_create if inspection.image
+            )
+    except Exception:
+        # Rows were rolled back; don't leave orphaned frames on disk.
+        # (No-op for the shared blob store; gc_image_blobs collects those.)
+        for name in stored:
+            image_field.storage.delete(name)
+        raise
+
+    created = []
+    for index, inspection in to_create:
+        created.append(inspection)
+        results[index] = {
+            "index": index,
+            "rim_id": inspection.rim_id,
+            "success": True,
+            "inspection": InspectionSerializer(inspection).data,
+        }
+
+    return created, results
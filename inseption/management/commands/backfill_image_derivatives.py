@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from inseption.derivatives import generate_for_ids
+from inseption.models import Inspection
+from inseption.tasks import generate_inspection_derivatives
+
+
+class Command(BaseCommand):
+    help = "Render thumb / medium variants for inspections that don't have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render variants even if they already exist.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Inspections per task / per chunk (default 200).",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Queue Celery tasks instead of rendering in this process.",
+        )
+
+    def handle(self, *args, **options):
+        inspections = Inspection.objects.exclude(Q(image="") | Q(image__isnull=True))
+        if not options["force"]:
+            missing = Q()
+            for field in ("image_thumb", "image_medium"):
+                missing |= Q(**{field: ""}) | Q(**{f"{field}__isnull": True})
+            inspections = inspections.filter(missing)
+
+        ids = list(inspections.order_by("id").values_list("id", flat=True))
+        batch_size = options["batch_size"]
+
+        done = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            if options["queue"]:
+                generate_inspection_derivatives.delay(chunk, force=options["force"])
+                done += len(chunk)
+            else:
+                done += generate_for_ids(chunk, force=options["force"])
+            self.stdout.write(f"{min(start + batch_size, len(ids))}/{len(ids)}")
+
+        verb = "Queued" if options["queue"] else "Rendered"
+        self.stdout.write(self.style.SUCCESS(f"{verb} variants for {done} inspection(s)"))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from inseption.models import Inspection
+from inseption.utilities import save_false_detection_image
+
+
+class Command(BaseCommand):
+    help = (
+        "Write every human-corrected (false detected) frame into "
+        "media/human_feedback_data with its manifest.jsonl entry. "
+        "Frames exported before are skipped."
+    )
+
+    def handle(self, *args, **options):
+        inspections = (
+            Inspection.objects
+            .filter(false_detected=True, correct_label__isnull=False)
+            .exclude(correct_label="")
+            .exclude(image="")
+            .only(
+                "id", "rim_id", "image", "correct_label",
+                "is_approved", "false_detected", "user_description",
+            )
+            .order_by("id")
+        )
+
+        exported = 0
+        skipped = 0
+        for inspection in inspections.iterator(chunk_size=2000):
+            try:
+                written = save_false_detection_image(inspection)
+            except FileNotFoundError:
+                self.stderr.write(f"Inspection {inspection.id}: image missing on disk")
+                continue
+
+            if written:
+                exported += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {exported} frame(s), {skipped} already in the dataset"
+        ))
@@ -0,0 +1,96 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inseption.dataset import (
+    decode_cursor,
+    encode_cursor,
+    shard_end,
+    stream_samples,
+    verified_inspections,
+)
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Export human-verified inspections as WebDataset-style tar shards. "
+        "Incremental: continues after the checkpoint stored in the output directory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory for the shards and checkpoint.json")
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=1000,
+            help="Samples per shard (default 1000).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="rims",
+            help="Shard file prefix: <prefix>-000000.tar (default rims).",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the checkpoint and export everything from shard 0.",
+        )
+
+    def _read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path) as fh:
+            return json.load(fh)
+
+    def _write_checkpoint(self, path, checkpoint):
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "w") as fh:
+            json.dump(checkpoint, fh)
+        os.replace(tmp_path, path)
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        shard_size = options["shard_size"]
+        if shard_size < 1:
+            raise CommandError("--shard-size must be positive")
+
+        os.makedirs(output, exist_ok=True)
+        checkpoint_path = os.path.join(output, CHECKPOINT_FILE)
+
+        checkpoint = None if options["full"] else self._read_checkpoint(checkpoint_path)
+        after = None
+        shard = 0
+        if checkpoint:
+            try:
+                after = decode_cursor(checkpoint["cursor"])
+            except (KeyError, ValueError):
+                raise CommandError(f"Unreadable checkpoint: {checkpoint_path}")
+            shard = checkpoint["next_shard"]
+
+        written = 0
+        while True:
+            end = shard_end(after, shard_size)
+            if end is None:
+                break
+
+            path = os.path.join(output, f"{options['prefix']}-{shard:06d}.tar")
+            tmp_path = f"{path}.part"
+            with open(tmp_path, "wb") as fh:
+                for chunk in stream_samples(verified_inspections(after, end)):
+                    fh.write(chunk)
+            os.replace(tmp_path, path)
+
+            # Checkpoint after every finished shard so an interrupted run resumes here
+            after = end
+            shard += 1
+            written += 1
+            self._write_checkpoint(checkpoint_path, {
+                "cursor": encode_cursor(*end),
+                "next_shard": shard,
+            })
+            self.stdout.write(f"Wrote {path}")
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {written} new shard(s)"))
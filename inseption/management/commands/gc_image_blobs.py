@@ -0,0 +1,64 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from inseption.models import Inspection
+from inseption.storage import BLOB_NAME, image_storage
+
+IMAGE_FIELDS = ("image", "image_thumb", "image_medium")
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed image blobs no Inspection refers to any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Keep blobs younger than this (uploads not committed yet). Default 24.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        referenced = set()
+        for field in IMAGE_FIELDS:
+            referenced.update(
+                Inspection.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+                .values_list(field, flat=True)
+                .iterator(chunk_size=5000)
+            )
+
+        cutoff = time.time() - options["min_age_hours"] * 3600
+        root = image_storage.path("rim_photos")
+        removed = 0
+        freed = 0
+
+        for directory, _, filenames in os.walk(root):
+            in_incoming = os.path.basename(directory) == ".incoming"
+
+            for filename in filenames:
+                # Leftover temp files from interrupted uploads, or unreferenced blobs
+                if not (in_incoming or BLOB_NAME.match(filename)):
+                    continue
+
+                full_path = os.path.join(directory, filename)
+                name = os.path.relpath(full_path, image_storage.location).replace("\\", "/")
+                stat = os.stat(full_path)
+                if name in referenced or stat.st_mtime > cutoff:
+                    continue
+
+                removed += 1
+                freed += stat.st_size
+                if not options["dry_run"]:
+                    image_storage.purge(name)
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {removed} blob(s), {freed / (1024 * 1024):.1f} MiB"
+        ))
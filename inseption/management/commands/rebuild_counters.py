@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from inseption.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild RobotCounter / ScheduleCounter from the Schedule and Inspection tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--robot",
+            type=int,
+            action="append",
+            dest="robot_ids",
+            help="Only rebuild this robot id (repeatable). Default: all robots.",
+        )
+
+    def handle(self, *args, **options):
+        robots = rebuild_counters(robot_ids=options["robot_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {robots} robot(s)"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from inseption.rollups import rebuild, refresh
+
+
+class Command(BaseCommand):
+    help = "Fold new / newly verified inspections into the hourly and daily trend rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop all rollups and recompute them from every inspection.",
+        )
+
+    def handle(self, *args, **options):
+        hours = rebuild() if options["rebuild"] else refresh()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {hours} hour bucket(s)"))
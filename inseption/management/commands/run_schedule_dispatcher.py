@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from inseption.dispatcher import ScheduleDispatcher
+
+
+class Command(BaseCommand):
+    help = "Run the schedule status dispatcher (scheduled → processing → completed)"
+
+    def handle(self, *args, **options):
+        dispatcher = ScheduleDispatcher()
+        dispatcher.load()
+        self.stdout.write(f"Tracking {len(dispatcher)} schedules")
+
+        poll = settings.SCHEDULE_DISPATCHER_POLL_SECONDS
+
+        while True:
+            close_old_connections()
+            now = timezone.now()
+
+            if dispatcher.needs_reload(now):
+                dispatcher.load(now)
+            else:
+                dispatcher.sync(now)
+
+            for schedule_id, status in dispatcher.tick(now):
+                self.stdout.write(f"Schedule {schedule_id} → {status}")
+
+            # Sleep until the next transition, but wake up at least every
+            # `poll` seconds to pick up new / edited schedules.
+            sleep_for = poll
+            next_due = dispatcher.next_due()
+            if next_due is not None:
+                sleep_for = min(poll, max((next_due - timezone.now()).total_seconds(), 0))
+            time.sleep(max(sleep_for, 0.5))
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_counters(apps, schema_editor):
+    Schedule = apps.get_model("inseption", "Schedule")
+    Inspection = apps.get_model("inseption", "Inspection")
+    RobotCounter = apps.get_model("inseption", "RobotCounter")
+    ScheduleCounter = apps.get_model("inseption", "ScheduleCounter")
+
+    active = Q(is_canceled=False)
+    inspection_counts = dict(
+        total_inspections=Count("id"),
+        total_defected=Count("id", filter=Q(is_defect=True)),
+        approved_count=Count("id", filter=Q(is_approved=True)),
+        human_verified_count=Count("id", filter=Q(is_human_verified=True)),
+        pending_verification_count=Count("id", filter=Q(is_human_verified=False, is_approved=False)),
+        false_detected_count=Count("id", filter=Q(false_detected=True)),
+    )
+
+    robots = {}
+    for row in Schedule.objects.order_by().values("robot_id").annotate(
+        total_schedules=Count("id", filter=active),
+        scheduled_count=Count("id", filter=active & Q(status="scheduled")),
+        processing_count=Count("id", filter=active & Q(status="processing")),
+        completed_count=Count("id", filter=active & Q(status="completed")),
+    ):
+        robots[row.pop("robot_id")] = row
+
+    for row in Inspection.objects.order_by().values("schedule__robot_id").annotate(**inspection_counts):
+        robots.setdefault(row.pop("schedule__robot_id"), {}).update(row)
+
+    RobotCounter.objects.bulk_create(
+        [RobotCounter(robot_id=robot_id, **values) for robot_id, values in robots.items()],
+        batch_size=500,
+    )
+    ScheduleCounter.objects.bulk_create(
+        [
+            ScheduleCounter(schedule_id=row.pop("schedule_id"), **row)
+            for row in Inspection.objects.order_by().values("schedule_id").annotate(**inspection_counts)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0002_inspection_user_description'),
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_schedules', models.IntegerField(default=0)),
+                ('scheduled_count', models.IntegerField(default=0)),
+                ('processing_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('total_inspections', models.IntegerField(default=0)),
+                ('total_defected', models.IntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('human_verified_count', models.IntegerField(default=0)),
+                ('pending_verification_count', models.IntegerField(default=0)),
+                ('false_detected_count', models.IntegerField(default=0)),
+                ('robot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='robot_management.robot')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_inspections', models.IntegerField(default=0)),
+                ('total_defected', models.IntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('human_verified_count', models.IntegerField(default=0)),
+                ('pending_verification_count', models.IntegerField(default=0)),
+                ('false_detected_count', models.IntegerField(default=0)),
+                ('schedule', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='inseption.schedule')),
+            ],
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0004_schedule_updated_at'),
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['robot', 'scheduled_date', 'is_canceled', 'scheduled_time', 'end_time'], name='schedule_slot_idx'),
+        ),
+    ]
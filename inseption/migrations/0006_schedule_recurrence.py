@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0005_schedule_slot_idx'),
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleRecurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(max_length=150)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly')], default='daily', max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('weekdays', models.JSONField(blank=True, default=list)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('scheduled_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('materialized_until', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('robot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrences', to='robot_management.robot')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='recurrence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='schedules', to='inseption.schedulerecurrence'),
+        ),
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=models.UniqueConstraint(fields=('recurrence', 'scheduled_date'), name='unique_recurrence_occurrence'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0006_schedule_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspection',
+            name='image_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='rim_photos/medium/'),
+        ),
+        migrations.AddField(
+            model_name='inspection',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='rim_photos/thumb/'),
+        ),
+    ]
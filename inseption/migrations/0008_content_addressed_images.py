@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:40
+
+import inseption.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0007_inspection_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inspection',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=inseption.storage.get_image_storage, upload_to='rim_photos/'),
+        ),
+        migrations.AlterField(
+            model_name='inspection',
+            name='image_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=inseption.storage.get_image_storage, upload_to='rim_photos/medium/'),
+        ),
+        migrations.AlterField(
+            model_name='inspection',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=inseption.storage.get_image_storage, upload_to='rim_photos/thumb/'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_verified_at(apps, schema_editor):
+    # Best known approximation for rows verified before the column existed
+    Inspection = apps.get_model("inseption", "Inspection")
+    Inspection.objects.filter(is_human_verified=True, verified_at__isnull=True).update(
+        verified_at=F("inspected_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0008_content_addressed_images'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspection',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inspection',
+            name='verified_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verified_inspections', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_verified_at, migrations.RunPython.noop),
+    ]
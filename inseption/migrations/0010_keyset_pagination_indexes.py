@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0009_inspection_verified_at'),
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['schedule', 'inspected_at', 'id'], name='inspection_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['scheduled_date', 'scheduled_time', 'id'], name='schedule_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inseption', '0010_keyset_pagination_indexes'),
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InspectionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('total', models.IntegerField(default=0)),
+                ('defects', models.IntegerField(default=0)),
+                ('false_detected', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('human_verified', models.IntegerField(default=0)),
+                ('rim_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inspection_rollups', to='inseption.rimtype')),
+                ('robot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inspection_rollups', to='robot_management.robot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'bucket'], name='rollup_bucket_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('rim_type__isnull', False)), fields=('granularity', 'robot', 'rim_type', 'bucket'), name='unique_rollup_bucket'), models.UniqueConstraint(condition=models.Q(('rim_type__isnull', True)), fields=('granularity', 'robot', 'bucket'), name='unique_rollup_bucket_no_rim_type')],
+            },
+        ),
+    ]
@@ -1,10 +1,50 @@
+from django.conf import settings
 from django.db import models
 from datetime import timedelta, datetime
 from robot_management.models import Robot
+from .storage import get_image_storage
 
 # Create your models here.
 
 
+class ScheduleRecurrence(models.Model):
+    """
+    Repeating inspection run for a robot (RRULE-style daily / weekly).
+    Schedule rows are materialized only up to a rolling horizon; see
+    recurrence.py.
+    """
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+
+    robot = models.ForeignKey(
+        Robot,
+        on_delete=models.CASCADE,
+        related_name="recurrences",
+    )
+
+    location = models.CharField(max_length=150)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default="daily")
+    interval = models.PositiveSmallIntegerField(default=1)
+    # 0 = Monday ... 6 = Sunday, used by weekly rules
+    weekdays = models.JSONField(default=list, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    scheduled_time = models.TimeField()
+    end_time = models.TimeField()
+    is_active = models.BooleanField(default=True)
+
+    # Last date Schedule rows exist for
+    materialized_until = models.DateField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recurrence {self.id} ({self.frequency}) at {self.location}"
+
+
 class Schedule(models.Model):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
@@ -26,7 +66,16 @@ class Schedule(models.Model):
     end_time = models.TimeField(null=True, blank=True)
     is_canceled = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="scheduled")
+    recurrence = models.ForeignKey(
+        ScheduleRecurrence,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="schedules",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Lets the schedule dispatcher pick up edits incrementally
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     # def save(self, *args, **kwargs):
     #     # Auto set end_time = scheduled_time + 1 hour
@@ -36,6 +85,27 @@ class Schedule(models.Model):
 
     #     super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            # Overlap checks: equality on robot / date / is_canceled, range on the times
+            models.Index(
+                fields=["robot", "scheduled_date", "is_canceled", "scheduled_time", "end_time"],
+                name="schedule_slot_idx",
+            ),
+            # Keyset pagination of schedule lists
+            models.Index(
+                fields=["scheduled_date", "scheduled_time", "id"],
+                name="schedule_keyset_idx",
+            ),
+        ]
+        constraints = [
+            # Materializing the same occurrence twice is a no-op
+            models.UniqueConstraint(
+                fields=["recurrence", "scheduled_date"],
+                name="unique_recurrence_occurrence",
+            ),
+        ]
+
     def __str__(self):
         return f"Schedule {self.id} at {self.location}"
     
@@ -66,7 +136,15 @@ class Inspection(models.Model):
 
     rim_id = models.CharField(max_length=50,unique=True)
 
-    image = models.ImageField(upload_to="rim_photos/", null=True, blank=True)
+    # Content-addressed (SHA-256) blobs, see storage.py
+    image = models.ImageField(upload_to="rim_photos/", storage=get_image_storage, null=True, blank=True)
+    # Rendered from image by the generate_inspection_derivatives task
+    image_thumb = models.ImageField(
+        upload_to="rim_photos/thumb/", storage=get_image_storage, null=True, blank=True, editable=False
+    )
+    image_medium = models.ImageField(
+        upload_to="rim_photos/medium/", storage=get_image_storage, null=True, blank=True, editable=False
+    )
     is_defect = models.BooleanField(default=False)
 
     inspected_at = models.DateTimeField(auto_now_add=True)
@@ -90,8 +168,24 @@ class Inspection(models.Model):
         blank=True
     )
 
+    verified_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    verified_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="verified_inspections"
+    )
+
     class Meta:
         unique_together = ("schedule", "rim_id")
+        indexes = [
+            # Keyset pagination of a schedule's inspections
+            models.Index(
+                fields=["schedule", "inspected_at", "id"],
+                name="inspection_keyset_idx",
+            ),
+        ]
     def __str__(self):
         return f"Inspection {self.rim_id} -> Schedule {self.schedule.id}"
     
@@ -121,3 +215,113 @@ class EmergencyStop(models.Model):
         return f"Emergency Stop: {'ON' if self.is_emergency_stop else 'OFF'}"
 
 
+
+
+# ---------------- MATERIALIZED COUNTERS ----------------
+# Maintained incrementally by inseption/counters.py.
+# Rebuild from scratch with: python manage.py rebuild_counters
+
+class RobotCounter(models.Model):
+    robot = models.OneToOneField(
+        Robot,
+        on_delete=models.CASCADE,
+        related_name="counters"
+    )
+
+    # Schedule summary (non-canceled schedules only)
+    total_schedules = models.IntegerField(default=0)
+    scheduled_count = models.IntegerField(default=0)
+    processing_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    # Inspection summary
+    total_inspections = models.IntegerField(default=0)
+    total_defected = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    human_verified_count = models.IntegerField(default=0)
+    pending_verification_count = models.IntegerField(default=0)
+    false_detected_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Counters for robot {self.robot_id}"
+
+
+class ScheduleCounter(models.Model):
+    schedule = models.OneToOneField(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="counters"
+    )
+
+    total_inspections = models.IntegerField(default=0)
+    total_defected = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    human_verified_count = models.IntegerField(default=0)
+    pending_verification_count = models.IntegerField(default=0)
+    false_detected_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Counters for schedule {self.schedule_id}"
+
+
+class InspectionRollup(models.Model):
+    """
+    Hourly / daily inspection totals per robot and rim type, bucketed by
+    inspected_at in the project time zone. Maintained by the
+    refresh_inspection_rollups beat task (rollups.py).
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    robot = models.ForeignKey(
+        Robot,
+        on_delete=models.CASCADE,
+        related_name="inspection_rollups"
+    )
+    rim_type = models.ForeignKey(
+        RimType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="inspection_rollups"
+    )
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+
+    total = models.IntegerField(default=0)
+    defects = models.IntegerField(default=0)
+    false_detected = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    human_verified = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "robot", "rim_type", "bucket"],
+                condition=models.Q(rim_type__isnull=False),
+                name="unique_rollup_bucket",
+            ),
+            # NULLs are distinct in unique indexes: rows without a rim type need their own
+            models.UniqueConstraint(
+                fields=["granularity", "robot", "bucket"],
+                condition=models.Q(rim_type__isnull=True),
+                name="unique_rollup_bucket_no_rim_type",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["granularity", "bucket"], name="rollup_bucket_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} rollup robot {self.robot_id} @ {self.bucket}"
+
+
+class RollupCheckpoint(models.Model):
+    """High-water marks of the rollup job (one row per tracked column)."""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} → {self.position}"
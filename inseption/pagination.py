@@ -0,0 +1,171 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with ``WHERE (k1, k2, ...) > (last row keys)`` on an
+indexed ordering instead of OFFSET, so page 500 costs the same as page 1,
+and no COUNT(*) is issued: views pass the total from the materialized
+counters (counters.py) to get_paginated_response().
+"""
+import base64
+import binascii
+import json
+import math
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    ``ordering`` must end in a unique field (id) so every row has a distinct
+    key. Fields may be prefixed with "-" and may name annotations.
+
+    The opaque cursor carries the boundary key, the direction and the page
+    number, so responses can still report current_page / total_pages.
+    """
+    ordering = ("-id",)
+    page_size = 10
+    page_size_query_param = None
+    max_page_size = None
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    # -------- cursor --------
+
+    def encode_cursor(self, values, reverse, page):
+        payload = json.dumps({"v": values, "r": reverse, "p": page}, default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(raw.encode()).decode())
+            values = payload["v"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return (
+                [self._to_python(field, value) for field, value in zip(self.ordering, values)],
+                bool(payload["r"]),
+                int(payload["p"]),
+            )
+        except (ValueError, TypeError, KeyError, UnicodeDecodeError,
+                binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, field, value):
+        try:
+            model_field = self.model._meta.get_field(field.lstrip("-"))
+        except FieldDoesNotExist:
+            # Annotation: JSON round-trips ints / strings as is
+            return value
+        return model_field.to_python(value)
+
+    def _key(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip("-"))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    # -------- query --------
+
+    def _after(self, values, reverse):
+        """Rows strictly after ``values`` in ordering (before, if reverse)."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _order(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size or size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        values, reverse, page = cursor if cursor else (None, False, 1)
+
+        qs = queryset.order_by(*self._order(reverse))
+        if values is not None:
+            qs = qs.filter(self._after(values, reverse))
+
+        rows = list(qs[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page_number = page
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (has_more if reverse else values is not None) and page > 1
+        self.first_key = self._key(rows[0]) if rows else values
+        self.last_key = self._key(rows[-1]) if rows else values
+        return rows
+
+    # -------- links --------
+
+    def _link(self, values, reverse, page):
+        url = self.request.build_absolute_uri()
+        if page <= 1 and reverse:
+            # Back on the first page: plain URL, no cursor
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(values, reverse, page)
+        )
+
+    def get_next_link(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return self._link(self.last_key, False, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return self._link(self.first_key, True, self.page_number - 1)
+
+    def page_info(self, count):
+        """Legacy page-number style summary for ``count`` total rows."""
+        return {
+            "current_page": self.page_number,
+            "total_pages": max(1, math.ceil(count / self.page_size)) if count else 1,
+            "total_records": count,
+            "page_size": self.page_size,
+            "has_next": self.get_next_link() is not None,
+            "has_previous": self.get_previous_link() is not None,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+
+    def get_paginated_response(self, data, count=None, **extra):
+        return Response({
+            "count": count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+            **extra,
+        })
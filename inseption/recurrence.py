@@ -0,0 +1,191 @@
+"""
+Lazy materialization of ScheduleRecurrence rules.
+
+Only occurrences up to SCHEDULE_RECURRENCE_HORIZON_DAYS ahead exist as
+Schedule rows; the ``materialize_recurrences`` beat task rolls the horizon
+forward. Occurrences further out are computed from the rule on demand
+(upcoming_occurrences).
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import counters
+from .models import Schedule, ScheduleRecurrence
+from .scheduling import build_rule, existing_bookings, find_conflicts
+
+logger = logging.getLogger(__name__)
+
+
+def horizon_end(today=None):
+    today = today or timezone.localdate()
+    return today + timedelta(days=settings.SCHEDULE_RECURRENCE_HORIZON_DAYS)
+
+
+def recurrence_dates(recurrence, start, end):
+    """Occurrence dates of the rule within [start, end]."""
+    start = max(start, recurrence.start_date)
+    if recurrence.end_date:
+        end = min(end, recurrence.end_date)
+    if start > end:
+        return []
+
+    # dtstart stays at start_date so intervals / weekdays keep their phase
+    rule = build_rule(
+        recurrence.start_date,
+        recurrence.end_date,
+        recurrence.frequency,
+        recurrence.interval,
+        recurrence.weekdays,
+    )
+    return [
+        occurrence.date()
+        for occurrence in rule.between(
+            datetime.combine(start, time.min),
+            datetime.combine(end, time.min),
+            inc=True,
+        )
+    ]
+
+
+def _slot(recurrence, scheduled_date):
+    return {
+        "location": recurrence.location,
+        "scheduled_date": scheduled_date,
+        "scheduled_time": recurrence.scheduled_time,
+        "end_time": recurrence.end_time,
+    }
+
+
+def materialize(recurrence, until=None):
+    """
+    Create the Schedule rows of ``recurrence`` up to ``until`` (default: the
+    rolling horizon). Occurrences overlapping another booking of the robot
+    are skipped. Returns the number of rows created.
+    """
+    until = until or horizon_end()
+    today = timezone.localdate()
+    now_time = timezone.localtime().time()
+
+    with transaction.atomic():
+        recurrence = ScheduleRecurrence.objects.select_for_update().get(pk=recurrence.pk)
+        if not recurrence.is_active:
+            return 0
+
+        start = today
+        if recurrence.materialized_until:
+            start = max(start, recurrence.materialized_until + timedelta(days=1))
+        if start > until:
+            return 0
+
+        slots = [
+            _slot(recurrence, scheduled_date)
+            for scheduled_date in recurrence_dates(recurrence, start, until)
+            # today's run may already be over
+            if not (scheduled_date == today and recurrence.end_time <= now_time)
+        ]
+
+        conflicts = find_conflicts(slots, existing_bookings(recurrence.robot_id, slots))
+        for index, reason in conflicts.items():
+            logger.info(
+                "Recurrence %s: skipped %s (%s)",
+                recurrence.id, slots[index]["scheduled_date"], reason,
+            )
+
+        to_create = [
+            Schedule(robot_id=recurrence.robot_id, recurrence=recurrence, **slot)
+            for index, slot in enumerate(slots)
+            if index not in conflicts
+        ]
+        # Dates the operator already canceled keep their row and are ignored here
+        Schedule.objects.bulk_create(to_create, ignore_conflicts=True)
+
+        ScheduleRecurrence.objects.filter(pk=recurrence.pk).update(materialized_until=until)
+
+        if to_create:
+            # bulk_create skips the counter signals
+            counters.refresh_schedule_counters(robot_ids=[recurrence.robot_id])
+
+    return len(to_create)
+
+
+def materialize_all(today=None):
+    """Roll every active recurrence forward to the horizon. Returns rows created."""
+    until = horizon_end(today)
+    due = ScheduleRecurrence.objects.filter(is_active=True).exclude(
+        materialized_until__gte=until
+    ).exclude(end_date__lt=timezone.localdate())
+
+    created = 0
+    for recurrence in due.iterator():
+        try:
+            created += materialize(recurrence, until)
+        except Exception:
+            logger.exception("Materializing recurrence %s failed", recurrence.id)
+    return created
+
+
+def drop_future_occurrences(recurrence):
+    """
+    Delete materialized occurrences that have not started yet, so an edited
+    (or removed) rule can be materialized again from now on. Rows that
+    already have inspections are kept.
+    """
+    now = timezone.localtime()
+    upcoming = Schedule.objects.filter(
+        recurrence=recurrence,
+        is_canceled=False,
+        status="scheduled",
+        inspections__isnull=True,
+    ).filter(
+        Q(scheduled_date__gt=now.date())
+        | Q(scheduled_date=now.date(), scheduled_time__gt=now.time())
+    )
+
+    # Row-by-row delete keeps the counter signals firing
+    deleted, _ = upcoming.delete()
+    ScheduleRecurrence.objects.filter(pk=recurrence.pk).update(materialized_until=None)
+    recurrence.materialized_until = None
+    return deleted
+
+
+def upcoming_occurrences(robot_id, start, end):
+    """
+    Everything a robot will run between start and end (inclusive): the
+    materialized Schedule rows plus occurrences of active recurrences that
+    are still beyond their materialized horizon.
+    """
+    occurrences = [
+        {**row, "materialized": True}
+        for row in Schedule.objects.filter(
+            robot_id=robot_id,
+            scheduled_date__range=(start, end),
+            is_canceled=False,
+        ).values(
+            "id", "recurrence_id", "location", "scheduled_date",
+            "scheduled_time", "end_time", "status",
+        )
+    ]
+
+    today = timezone.localdate()
+    recurrences = ScheduleRecurrence.objects.filter(robot_id=robot_id, is_active=True)
+    for recurrence in recurrences:
+        virtual_start = max(start, today)
+        if recurrence.materialized_until:
+            virtual_start = max(virtual_start, recurrence.materialized_until + timedelta(days=1))
+
+        for scheduled_date in recurrence_dates(recurrence, virtual_start, end):
+            occurrences.append({
+                "id": None,
+                "recurrence_id": recurrence.id,
+                **_slot(recurrence, scheduled_date),
+                "status": "scheduled",
+                "materialized": False,
+            })
+
+    occurrences.sort(key=lambda item: (item["scheduled_date"], item["scheduled_time"]))
+    return occurrences
@@ -0,0 +1,232 @@
+"""
+Hourly / daily inspection rollups for trend charts.
+
+The refresh_inspection_rollups beat task works incrementally from two
+checkpoints: inspections created since the last run (inspected_at) and
+inspections verified since the last run (verified_at, which is when
+defect / false-detection / approval flags change). Only the hour buckets
+those rows fall in are recomputed, with one grouped query per run of
+nearby buckets; day rows are then re-summed from their hour rows.
+
+Each run stops INSPECTION_ROLLUP_LAG_SECONDS short of now so rows of
+transactions still in flight are not skipped. Deleted inspections are not tracked: rebuild()
+(``manage.py refresh_inspection_rollups --rebuild``) recomputes everything.
+"""
+import logging
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Q, Sum
+from django.db.models.functions import Trunc, TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import Inspection, InspectionRollup, RollupCheckpoint
+
+logger = logging.getLogger(__name__)
+
+CREATED_CHECKPOINT = "inspection_rollup.inspected_at"
+VERIFIED_CHECKPOINT = "inspection_rollup.verified_at"
+
+ROLLUP_FIELDS = ("total", "defects", "false_detected", "approved", "human_verified")
+
+# Trend bucket → (rollup granularity read, max requested range in days)
+TREND_BUCKETS = {
+    "hour": ("hour", 31),
+    "day": ("day", 366),
+    "week": ("day", 3 * 366),
+    "month": ("day", 5 * 366),
+}
+
+# Dirty hours further apart than this are recomputed by separate queries
+CLUSTER_GAP = timedelta(hours=24)
+
+
+def _counts():
+    return {
+        "total": Count("id"),
+        "defects": Count("id", filter=Q(is_defect=True)),
+        "false_detected": Count("id", filter=Q(false_detected=True)),
+        "approved": Count("id", filter=Q(is_approved=True)),
+        "human_verified": Count("id", filter=Q(is_human_verified=True)),
+    }
+
+
+def day_start(value):
+    """Local midnight of the day ``value`` (aware datetime or date) falls on."""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date()
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def _clusters(hours):
+    cluster = []
+    for hour in sorted(hours):
+        if cluster and hour - cluster[-1] > CLUSTER_GAP:
+            yield cluster
+            cluster = []
+        cluster.append(hour)
+    if cluster:
+        yield cluster
+
+
+def _rebuild_hours(hours):
+    """Replace the hour rows of ``hours`` (aware bucket starts) from Inspection."""
+    rows = []
+    for cluster in _clusters(hours):
+        wanted = set(cluster)
+        grouped = (
+            Inspection.objects
+            .filter(inspected_at__gte=cluster[0], inspected_at__lt=cluster[-1] + timedelta(hours=1))
+            .annotate(hour=TruncHour("inspected_at"), robot_id=F("schedule__robot_id"))
+            .values("hour", "robot_id", "rim_type_id")
+            .annotate(**_counts())
+            .order_by()
+        )
+        rows.extend(
+            InspectionRollup(
+                granularity="hour",
+                bucket=group["hour"],
+                robot_id=group["robot_id"],
+                rim_type_id=group["rim_type_id"],
+                **{field: group[field] for field in ROLLUP_FIELDS},
+            )
+            for group in grouped
+            if group["hour"] in wanted
+        )
+
+    InspectionRollup.objects.filter(granularity="hour", bucket__in=list(hours)).delete()
+    InspectionRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+def _rebuild_days(days):
+    """Replace the day rows of ``days`` (local midnights) by summing hour rows."""
+    rows = []
+    for cluster in _clusters(days):
+        wanted = set(cluster)
+        grouped = (
+            InspectionRollup.objects
+            .filter(
+                granularity="hour",
+                bucket__gte=cluster[0],
+                bucket__lt=cluster[-1] + timedelta(days=1),
+            )
+            .annotate(day=TruncDay("bucket"))
+            .values("day", "robot_id", "rim_type_id")
+            .annotate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+            .order_by()
+        )
+        rows.extend(
+            InspectionRollup(
+                granularity="day",
+                bucket=group["day"],
+                robot_id=group["robot_id"],
+                rim_type_id=group["rim_type_id"],
+                **{field: group[field] for field in ROLLUP_FIELDS},
+            )
+            for group in grouped
+            if group["day"] in wanted
+        )
+
+    InspectionRollup.objects.filter(granularity="day", bucket__in=list(days)).delete()
+    InspectionRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+def _checkpoints():
+    """Both checkpoint rows, locked: concurrent refreshes run one after the other."""
+    for name in (CREATED_CHECKPOINT, VERIFIED_CHECKPOINT):
+        RollupCheckpoint.objects.get_or_create(
+            name=name, defaults={"position": datetime(1970, 1, 1, tzinfo=dt_timezone.utc)}
+        )
+    locked = RollupCheckpoint.objects.select_for_update().filter(
+        name__in=(CREATED_CHECKPOINT, VERIFIED_CHECKPOINT)
+    )
+    return {checkpoint.name: checkpoint for checkpoint in locked}
+
+
+def refresh(now=None):
+    """Recompute the buckets touched since the last run. Returns the number of dirty hours."""
+    upper = (now or timezone.now()) - timedelta(seconds=settings.INSPECTION_ROLLUP_LAG_SECONDS)
+
+    with transaction.atomic():
+        checkpoints = _checkpoints()
+        created = checkpoints[CREATED_CHECKPOINT]
+        verified = checkpoints[VERIFIED_CHECKPOINT]
+
+        changed = Inspection.objects.filter(
+            Q(inspected_at__gt=created.position, inspected_at__lte=upper)
+            | Q(verified_at__gt=verified.position, verified_at__lte=upper)
+        )
+        hours = set(
+            changed
+            .annotate(hour=TruncHour("inspected_at"))
+            .values_list("hour", flat=True)
+            .distinct()
+            .order_by()
+        )
+
+        if hours:
+            _rebuild_hours(hours)
+            _rebuild_days({day_start(hour) for hour in hours})
+
+        for checkpoint in (created, verified):
+            if checkpoint.position < upper:
+                checkpoint.position = upper
+                checkpoint.save(update_fields=["position"])
+
+    if hours:
+        logger.info("Inspection rollups: recomputed %s hour bucket(s)", len(hours))
+    return len(hours)
+
+
+def rebuild(now=None):
+    """Drop every rollup and recompute from scratch."""
+    with transaction.atomic():
+        InspectionRollup.objects.all().delete()
+        RollupCheckpoint.objects.filter(
+            name__in=(CREATED_CHECKPOINT, VERIFIED_CHECKPOINT)
+        ).delete()
+        return refresh(now)
+
+
+def refreshed_until():
+    checkpoint = RollupCheckpoint.objects.filter(name=CREATED_CHECKPOINT).first()
+    return checkpoint.position if checkpoint else None
+
+
+def trend(bucket, start_date, end_date, robot_id=None, rim_type_id=None, robot_ids=None):
+    """
+    Time series of rollup totals between two dates (inclusive), one row per
+    ``bucket`` (hour / day / week / month) that has inspections. ``robot_ids``
+    (None = all robots) limits the series to the robots a user may access.
+    """
+    granularity, _ = TREND_BUCKETS[bucket]
+
+    rows = InspectionRollup.objects.filter(
+        granularity=granularity,
+        bucket__gte=day_start(start_date),
+        bucket__lt=day_start(end_date + timedelta(days=1)),
+    )
+    if robot_id is not None:
+        rows = rows.filter(robot_id=robot_id)
+    if robot_ids is not None:
+        rows = rows.filter(robot_id__in=robot_ids)
+    if rim_type_id is not None:
+        rows = rows.filter(rim_type_id=rim_type_id)
+
+    series = (
+        rows
+        .annotate(period=Trunc("bucket", bucket, output_field=DateTimeField()))
+        .values("period")
+        .annotate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+        .order_by("period")
+    )
+
+    return [
+        {
+            "bucket": timezone.localtime(point["period"]).isoformat(),
+            **{field: point[field] for field in ROLLUP_FIELDS},
+            "defect_rate": round(point["defects"] / point["total"], 4) if point["total"] else 0.0,
+        }
+        for point in series
+    ]
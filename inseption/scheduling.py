@@ -0,0 +1,118 @@
+"""
+Schedule slot helpers: overlap lookups, recurring plan expansion and the
+in-memory sweep-line used to validate many slots against one query.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from dateutil import rrule
+
+from .models import Schedule
+
+
+WEEKDAYS = (rrule.MO, rrule.TU, rrule.WE, rrule.TH, rrule.FR, rrule.SA, rrule.SU)
+
+FREQUENCIES = {
+    "daily": rrule.DAILY,
+    "weekly": rrule.WEEKLY,
+}
+
+
+def overlapping_schedules(robot_id, scheduled_date, start_time, end_time):
+    """
+    Active schedules of a robot overlapping [start_time, end_time) on a day.
+    Served by the (robot, scheduled_date, is_canceled, scheduled_time,
+    end_time) index on Schedule.
+    """
+    return Schedule.objects.filter(
+        robot_id=robot_id,
+        scheduled_date=scheduled_date,
+        is_canceled=False,
+        scheduled_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+
+
+def build_rule(start_date, end_date, frequency, interval=1, weekdays=None):
+    """rrule for a daily / weekly plan; end_date=None means open-ended."""
+    return rrule.rrule(
+        FREQUENCIES[frequency],
+        dtstart=start_date,
+        until=end_date,
+        interval=interval,
+        byweekday=[WEEKDAYS[day] for day in weekdays] if weekdays else None,
+    )
+
+
+def plan_dates(start_date, end_date, frequency, interval=1, weekdays=None):
+    """Dates of a daily / weekly plan between start_date and end_date (inclusive)."""
+    rule = build_rule(start_date, end_date, frequency, interval, weekdays)
+    return [occurrence.date() for occurrence in rule]
+
+
+def find_conflicts(slots, existing):
+    """
+    Sweep-line overlap check.
+
+    ``slots``: list of dicts with scheduled_date / scheduled_time / end_time.
+    ``existing``: iterable of (scheduled_date, scheduled_time, end_time)
+    for already booked, non-canceled schedules.
+
+    Returns {slot_index: reason} for slots that overlap an existing booking
+    or an earlier-starting slot of the same batch. O((n + m) log m).
+    """
+    booked = defaultdict(list)
+    for scheduled_date, start, end in existing:
+        if end is not None:
+            booked[scheduled_date].append((start, end))
+
+    # Per day: starts sorted + running max of ends, so "does anything that
+    # starts before X end after Y" is one bisect.
+    booked_index = {}
+    for scheduled_date, intervals in booked.items():
+        intervals.sort()
+        booked_index[scheduled_date] = (
+            [start for start, _ in intervals],
+            list(accumulate((end for _, end in intervals), max)),
+        )
+
+    by_day = defaultdict(list)
+    for index, slot in enumerate(slots):
+        by_day[slot["scheduled_date"]].append(index)
+
+    conflicts = {}
+    for scheduled_date, indexes in by_day.items():
+        starts, max_ends = booked_index.get(scheduled_date, ([], []))
+        batch_end = None
+
+        indexes.sort(key=lambda i: (slots[i]["scheduled_time"], i))
+        for index in indexes:
+            start = slots[index]["scheduled_time"]
+            end = slots[index]["end_time"]
+
+            position = bisect_left(starts, end)
+            if position and max_ends[position - 1] > start:
+                conflicts[index] = "Time slot already booked for this robot"
+                continue
+
+            if batch_end is not None and start < batch_end:
+                conflicts[index] = "Overlaps another slot in this request"
+                continue
+
+            batch_end = end if batch_end is None else max(batch_end, end)
+
+    return conflicts
+
+
+def existing_bookings(robot_id, slots):
+    """One query: every active booking of the robot within the slots' date span."""
+    if not slots:
+        return []
+
+    dates = [slot["scheduled_date"] for slot in slots]
+    return Schedule.objects.filter(
+        robot_id=robot_id,
+        scheduled_date__range=(min(dates), max(dates)),
+        is_canceled=False,
+    ).values_list("scheduled_date", "scheduled_time", "end_time")
@@ -1,7 +1,7 @@
 # serializers.py
 
 from rest_framework import serializers
-from .models import Schedule, Inspection,RimType
+from .models import Schedule, Inspection,RimType, ScheduleRecurrence
 
 class ScheduleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,6 +14,28 @@ class InspectionSerializer(serializers.ModelSerializer):
         model = Inspection
         fields = "__all__"
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Variants are rendered asynchronously; until then serve the original
+        for field in ("image_thumb", "image_medium"):
+            if field in data and not data[field]:
+                data[field] = data.get("image")
+        return data
+
+
+class InspectionBatchItemSerializer(serializers.ModelSerializer):
+    """
+    Validates a single frame of a batch upload.
+    rim_id uniqueness is checked once for the whole batch in ingest.py,
+    so the per-item unique validators are disabled here.
+    """
+
+    class Meta:
+        model = Inspection
+        exclude = ["schedule"]
+        validators = []
+        extra_kwargs = {"rim_id": {"validators": []}}
+
 class InspectionHumanVerifySerializer(serializers.ModelSerializer):
     class Meta:
         model = Inspection
@@ -104,6 +126,11 @@ class ScheduleDateRangeFilterSerializer(serializers.Serializer):
         return data
     
 
+class InspectionTrendFilterSerializer(ScheduleDateRangeFilterSerializer):
+    bucket = serializers.ChoiceField(choices=["hour", "day", "week", "month"], default="day")
+    robot = serializers.IntegerField(required=False, min_value=1)
+    rim_type = serializers.IntegerField(required=False, min_value=1)
+
 
 class RimTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -141,3 +168,115 @@ class ScheduleFilterSerializer(serializers.Serializer):
                 )
 
         return data
+
+
+class ScheduleSlotSerializer(serializers.Serializer):
+    location = serializers.CharField(max_length=150)
+    scheduled_date = serializers.DateField()
+    scheduled_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, data):
+        if data["end_time"] <= data["scheduled_time"]:
+            raise serializers.ValidationError(
+                {"end_time": "end_time must be greater than scheduled_time"}
+            )
+        return data
+
+
+class SchedulePlanSerializer(serializers.Serializer):
+    """Recurring daily / weekly slot between start_date and end_date."""
+
+    location = serializers.CharField(max_length=150)
+    frequency = serializers.ChoiceField(choices=["daily", "weekly"])
+    interval = serializers.IntegerField(min_value=1, default=1)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+        allow_empty=False,
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    scheduled_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, data):
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError(
+                "start_date must be less than or equal to end_date"
+            )
+
+        if data["end_time"] <= data["scheduled_time"]:
+            raise serializers.ValidationError(
+                {"end_time": "end_time must be greater than scheduled_time"}
+            )
+
+        if data["frequency"] == "weekly" and not data.get("weekdays"):
+            raise serializers.ValidationError(
+                {"weekdays": "weekdays are required for a weekly plan (0 = Monday)"}
+            )
+
+        return data
+
+
+class ScheduleBulkCreateSerializer(serializers.Serializer):
+    slots = ScheduleSlotSerializer(many=True, required=False)
+    plans = SchedulePlanSerializer(many=True, required=False)
+    # False: reject the whole request if any slot conflicts
+    skip_conflicts = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if not data.get("slots") and not data.get("plans"):
+            raise serializers.ValidationError("Provide slots and/or plans")
+        return data
+
+
+class ScheduleRecurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduleRecurrence
+        fields = [
+            "id",
+            "robot",
+            "location",
+            "frequency",
+            "interval",
+            "weekdays",
+            "start_date",
+            "end_date",
+            "scheduled_time",
+            "end_time",
+            "is_active",
+            "materialized_until",
+            "created_at",
+        ]
+        read_only_fields = ["id", "robot", "materialized_until", "created_at"]
+
+    def validate_weekdays(self, value):
+        if not isinstance(value, list) or any(
+            not isinstance(day, int) or not 0 <= day <= 6 for day in value
+        ):
+            raise serializers.ValidationError("weekdays must be a list of 0 (Monday) .. 6 (Sunday)")
+        return sorted(set(value))
+
+    def validate(self, data):
+        def current(field):
+            if field in data:
+                return data[field]
+            return getattr(self.instance, field, None)
+
+        if current("end_date") and current("start_date") > current("end_date"):
+            raise serializers.ValidationError(
+                "start_date must be less than or equal to end_date"
+            )
+
+        if current("end_time") <= current("scheduled_time"):
+            raise serializers.ValidationError(
+                {"end_time": "end_time must be greater than scheduled_time"}
+            )
+
+        if current("frequency") == "weekly" and not current("weekdays"):
+            raise serializers.ValidationError(
+                {"weekdays": "weekdays are required for a weekly rule (0 = Monday)"}
+            )
+
+        return data
@@ -0,0 +1,98 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import counters
+from .derivatives import enqueue_derivatives
+from .models import Inspection, Schedule
+
+
+# Snapshot the counted fields when a row is loaded so post_save can diff
+# against it without re-reading the row. Deferred fields → no snapshot,
+# and the affected counters are rebuilt instead.
+
+def _snapshot(instance, fields, state_fn):
+    if instance.get_deferred_fields() & set(fields):
+        return None
+    return state_fn(instance)
+
+
+def _image_name(instance):
+    return instance.image.name or ""
+
+
+@receiver(post_init, sender=Inspection)
+def snapshot_inspection(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._counter_state = None
+        instance._image_state = None
+        return
+    instance._counter_state = _snapshot(
+        instance, counters.INSPECTION_STATE_FIELDS, counters.inspection_state
+    )
+    instance._image_state = _snapshot(instance, ["image"], _image_name)
+
+
+@receiver(post_save, sender=Inspection)
+def inspection_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    old_state = None if created else instance._counter_state
+    new_state = counters.inspection_state(instance)
+
+    if old_state is None and not created:
+        counters.rebuild_counters(robot_ids=[instance.schedule.robot_id])
+    else:
+        counters.inspection_changed(old_state, new_state)
+
+    instance._counter_state = new_state
+
+    # Only a new image needs variants; a verify / PATCH before the task ran
+    # must not queue the same job again
+    image_state = _image_name(instance)
+    if created or image_state != instance._image_state:
+        if instance.image and not instance.image_thumb:
+            enqueue_derivatives([instance.pk])
+    instance._image_state = image_state
+
+
+@receiver(post_delete, sender=Inspection)
+def inspection_deleted(sender, instance, **kwargs):
+    old_state = instance._counter_state
+    if old_state is None:
+        return
+    counters.inspection_changed(old_state, None)
+
+
+@receiver(post_init, sender=Schedule)
+def snapshot_schedule(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._counter_state = None
+        return
+    instance._counter_state = _snapshot(
+        instance, counters.SCHEDULE_STATE_FIELDS, counters.schedule_state
+    )
+
+
+@receiver(post_save, sender=Schedule)
+def schedule_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    old_state = None if created else instance._counter_state
+    new_state = counters.schedule_state(instance)
+
+    if old_state is None and not created:
+        counters.refresh_schedule_counters(robot_ids=[instance.robot_id])
+    else:
+        counters.schedule_changed(old_state, new_state)
+
+    instance._counter_state = new_state
+
+
+@receiver(post_delete, sender=Schedule)
+def schedule_deleted(sender, instance, **kwargs):
+    old_state = instance._counter_state
+    if old_state is None:
+        return
+    counters.schedule_changed(old_state, None)
@@ -0,0 +1,103 @@
+"""
+Content-addressed storage for inspection images.
+
+Blobs are named by the SHA-256 of their bytes:
+
+    rim_photos/3f/a2/3fa2...c9.jpg
+
+so a frame re-sent after a robot retry maps to the file already on disk
+instead of a new ``download_1jQqxBK.jpeg`` copy. Several rows (and the
+human feedback dataset, through hard links) may share one blob, so
+``delete()`` never removes anything; unreferenced blobs are collected by
+``manage.py gc_image_blobs``.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_NAME = re.compile(r"^[0-9a-f]{64}(\.[0-9a-z]+)?$")
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def blob_name(self, directory, digest, ext):
+        return "/".join(
+            part for part in (directory, digest[:2], digest[2:4], f"{digest}{ext}") if part
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content; _save picks it
+        return name
+
+    def _makedirs(self, directory):
+        if self.directory_permissions_mode is None:
+            os.makedirs(directory, exist_ok=True)
+            return
+
+        old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+        try:
+            os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+        finally:
+            os.umask(old_umask)
+
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+
+        incoming = self.path(os.path.join(directory, ".incoming"))
+        self._makedirs(incoming)
+
+        # Hash while spooling to a temp file: one pass over the upload
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=incoming, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            name = self.blob_name(directory, digest.hexdigest(), ext)
+            full_path = self.path(name)
+
+            try:
+                # Dedup hit: a fresh mtime keeps gc_image_blobs (--min-age-hours)
+                # off the blob until the row referring to it commits
+                os.utime(full_path)
+            except FileNotFoundError:
+                self._makedirs(os.path.dirname(full_path))
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                try:
+                    # Atomic publish; a concurrent writer of the same bytes wins harmlessly
+                    os.link(tmp_path, full_path)
+                except FileExistsError:
+                    pass
+                else:
+                    self._ensure_location_group_id(full_path)
+        finally:
+            os.unlink(tmp_path)
+
+        return name
+
+    def delete(self, name):
+        # Blobs are shared; see gc_image_blobs
+        pass
+
+    def purge(self, name):
+        """Really remove a blob (garbage collection only)."""
+        super().delete(name)
+
+
+image_storage = ContentAddressedStorage()
+
+
+def get_image_storage():
+    """Callable storage for Inspection image fields (keeps migrations stable)."""
+    return image_storage
@@ -1,57 +1,57 @@
 # tasks.py
+#
+# Schedule status transitions are driven by `manage.py run_schedule_dispatcher`.
+# These tasks are kept so ETA messages already sitting in the broker are
+# drained safely: they only apply a transition that is still due for the
+# schedule as it is now (canceled / edited schedules are ignored).
+#
+# materialize_recurrences runs from CELERY_BEAT_SCHEDULE.
+# refresh_inspection_rollups runs from CELERY_BEAT_SCHEDULE.
+# generate_inspection_derivatives is queued after inspection ingest.
 
 from celery import shared_task
 from django.utils import timezone
 from .models import Schedule
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from .dispatcher import apply_transitions, pending_transitions
+from .recurrence import materialize_all
+from .derivatives import generate_for_ids
+from .rollups import refresh as refresh_rollups
+
+
+def _still_due(schedule_id, status):
+    schedule = Schedule.objects.filter(id=schedule_id).first()
+    if not schedule:
+        return False
+
+    due_at = pending_transitions(schedule).get(status)
+    return due_at is not None and due_at <= timezone.now()
 
 
 @shared_task
 def set_status_processing(schedule_id):
-    try:
-        schedule = Schedule.objects.select_related("robot").get(id=schedule_id)
-        schedule.status = "processing"
-        schedule.save()
-
-        channel_layer = get_channel_layer()
-        group_name = f"robot_message_{schedule.robot.robo_id}"
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "robot_message",  # must match consumer method
-                "event": "schedule_updated",
-                "data": {
-                    "status": schedule.status,
-                },
-            }
-        )
-
-    except Schedule.DoesNotExist:
-        pass
+    if _still_due(schedule_id, "processing"):
+        apply_transitions(processing_ids=[schedule_id])
 
 
 @shared_task
 def set_status_completed(schedule_id):
-    try:
-        schedule = Schedule.objects.select_related("robot").get(id=schedule_id)
-        schedule.status = "completed"
-        schedule.save()
-
-        channel_layer = get_channel_layer()
-        group_name = f"robot_message_{schedule.robot.robo_id}"
-        print(group_name)
-
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "robot_message",
-                "event": "schedule_updated",
-                "data": {
-                    "status": schedule.status,
-                },
-            }
-        )
-
-    except Schedule.DoesNotExist:
-        pass
+    if _still_due(schedule_id, "completed"):
+        apply_transitions(completed_ids=[schedule_id])
+
+
+@shared_task
+def materialize_recurrences():
+    """Beat job: keep recurring schedules materialized up to the horizon."""
+    return materialize_all()
+
+
+@shared_task
+def generate_inspection_derivatives(inspection_ids, force=False):
+    """Render thumb / medium variants of inspection images."""
+    return generate_for_ids(inspection_ids, force=force)
+
+
+@shared_task
+def refresh_inspection_rollups():
+    """Beat job: fold new / newly verified inspections into the trend rollups."""
+    return refresh_rollups()
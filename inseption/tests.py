@@ -1,3 +1,175 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time as clock
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from robot_management.models import Robot
+from . import dataset
+from .models import Inspection, Schedule
+from .storage import image_storage
+from .utilities import link_or_copy
+
+
+class LinkOrCopyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.src = os.path.join(self.dir, "blob.jpg")
+        self.dst = os.path.join(self.dir, "export.jpg")
+
+    def test_missing_source_leaves_no_file(self):
+        with self.assertRaises(FileNotFoundError):
+            link_or_copy(self.src, self.dst)
+        self.assertFalse(os.path.exists(self.dst))
+
+    def test_failed_copy_leaves_no_file(self):
+        with open(self.src, "wb") as src:
+            src.write(b"frame")
+
+        # Cross-device link → copy fallback, which then fails half way
+        with mock.patch("os.link", side_effect=OSError(18, "cross-device")), \
+                mock.patch("shutil.copyfileobj", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                link_or_copy(self.src, self.dst)
+        self.assertFalse(os.path.exists(self.dst))
+
+    def test_copy_fallback(self):
+        with open(self.src, "wb") as src:
+            src.write(b"frame")
+
+        with mock.patch("os.link", side_effect=OSError(18, "cross-device")):
+            link_or_copy(self.src, self.dst)
+        with open(self.dst, "rb") as dst:
+            self.assertEqual(dst.read(), b"frame")
+
+
+class ImageBlobGCTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def save_stale_blob(self, data):
+        name = image_storage.save("rim_photos/frame.jpg", ContentFile(data))
+        stale = clock.time() - 48 * 3600
+        os.utime(image_storage.path(name), (stale, stale))
+        return name
+
+    def gc(self):
+        call_command("gc_image_blobs", "--min-age-hours=24", stdout=io.StringIO())
+
+    def test_gc_purges_old_unreferenced_blob(self):
+        name = self.save_stale_blob(b"frame")
+        self.gc()
+        self.assertFalse(image_storage.exists(name))
+
+    def test_dedup_hit_protects_blob_from_gc(self):
+        name = self.save_stale_blob(b"frame")
+
+        # The robot re-sends the frame; its row is not committed yet
+        self.assertEqual(image_storage.save("rim_photos/retry.jpg", ContentFile(b"frame")), name)
+        self.gc()
+
+        self.assertTrue(image_storage.exists(name))
+
+
+class DerivativeEnqueueTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        robot = Robot.objects.create(name="Robot", robo_id="RB-V")
+        self.schedule = Schedule.objects.create(
+            robot=robot, location="Bay 1", scheduled_date=date(2026, 1, 5), scheduled_time=time(9)
+        )
+
+    @mock.patch("inseption.signals.enqueue_derivatives")
+    def test_only_new_images_are_queued(self, enqueue):
+        inspection = Inspection.objects.create(
+            schedule=self.schedule, rim_id="RIM-1", image=ContentFile(b"frame", name="rim.jpg")
+        )
+        self.assertEqual(enqueue.call_count, 1)
+
+        # Verified (twice) before the task ran: still the same image
+        inspection.is_human_verified = True
+        inspection.save()
+        reloaded = Inspection.objects.get(pk=inspection.pk)
+        reloaded.is_approved = True
+        reloaded.save()
+        self.assertEqual(enqueue.call_count, 1)
+
+        reloaded.image = ContentFile(b"another frame", name="rim.jpg")
+        reloaded.save()
+        self.assertEqual(enqueue.call_count, 2)
+        enqueue.assert_called_with([inspection.pk])
+
+
+class DatasetExportStreamingTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        robot = Robot.objects.create(name="Robot", robo_id="RB-D")
+        schedule = Schedule.objects.create(
+            robot=robot, location="Bay 1", scheduled_date=date(2026, 1, 5), scheduled_time=time(9)
+        )
+        self.frames = {}
+        for index in range(3):
+            data = os.urandom(dataset.READ_CHUNK + 100)
+            inspection = Inspection.objects.create(schedule=schedule, rim_id=f"RIM-{index}")
+            # update(): skip the derivative / counter signals, only the export matters here
+            Inspection.objects.filter(pk=inspection.pk).update(
+                image=image_storage.save("rim_photos/frame.jpg", ContentFile(data)),
+                is_human_verified=True,
+                verified_at=timezone.now() - timedelta(minutes=10),
+            )
+            self.frames[f"{inspection.pk:09d}.jpg"] = data
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(admin).access_token}"}
+
+    async def test_asgi_export_is_streamed_chunk_by_chunk(self):
+        response = await self.async_client.get(reverse("training-dataset-export"), headers=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        # A sync iterator would be read into a list before the first byte goes out
+        self.assertTrue(response.is_async)
+
+        chunks = []
+        async for chunk in response.streaming_content:
+            self.assertLessEqual(len(chunk), dataset.READ_CHUNK)
+            chunks.append(chunk)
+        self.assertGreater(len(chunks), len(self.frames) * 2)
+
+        with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as tar:
+            for name, data in self.frames.items():
+                self.assertEqual(tar.extractfile(name).read(), data)
+
+    def test_recent_verifications_are_held_back(self):
+        Inspection.objects.update(verified_at=timezone.now())
+        response = self.client.get(reverse("training-dataset-export"), headers=self.auth)
+        self.assertEqual(response.status_code, 204)
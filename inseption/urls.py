@@ -9,7 +9,11 @@ urlpatterns = [
     path("schedule/cancel-all/", views.cancel_all_schedules),
     path("robots/<int:robot_id>/schedules/", views.list_schedules_by_robot,name="list-schedules" ),
     path("robots/<int:robot_id>/schedule/create/", views.create_schedule,name="create-schedule" ),
+    path("robots/<int:robot_id>/schedule/bulk-create/", views.bulk_create_schedules, name="bulk-create-schedules"),
     path("robots/<int:robot_id>/schedule/create-immediately/",views.create_schedule_immediately,name="create-schedule-immediately"),
+    path("robots/<int:robot_id>/schedule/upcoming/", views.UpcomingSchedulesView.as_view(), name="upcoming-schedules"),
+    path("robots/<int:robot_id>/recurrences/", views.ScheduleRecurrenceListCreateView.as_view(), name="schedule-recurrences"),
+    path("robots/<int:robot_id>/recurrences/<int:recurrence_id>/", views.ScheduleRecurrenceDetailView.as_view(), name="schedule-recurrence-detail"),
     path("robots/<int:robot_id>/schedule/<int:schedule_id>/", views.create_or_update_schedule),
     path("robots/<int:robot_id>/schedule/<int:schedule_id>/cancel/",views.cancel_schedule),
     path("schedule/create/", views.create_schedule),
@@ -17,9 +21,12 @@ urlpatterns = [
     path("schedule/delete/<int:schedule_id>/", views.delete_schedule),
     path('schedule/update-immediately/<int:schedule_id>/', views.update_schedule, name='update_schedule'),
     path("schedule/<int:schedule_id>/inspections/", views.InspectionListCreateView.as_view()),
+    path("schedule/<int:schedule_id>/inspections/batch/", views.InspectionBatchCreateView.as_view()),
     path("schedule/robot/<int:robot_id>/filter/", views.ScheduleFilterView.as_view(), name="schedule-filter-by-date-range"),
     path("inspection/<int:pk>/", views.InspectionDetailView.as_view()),
     path("inspection/<int:pk>/verify/", views.InspectionHumanVerifyAPIView.as_view()),
+    path("inspections/trends/", views.InspectionTrendView.as_view(), name="inspection-trends"),
+    path("inspections/dataset/export/", views.TrainingDatasetExportView.as_view(), name="training-dataset-export"),
     path('speak/start/', views.StartSpeakView.as_view(), name='start-speak'),
     path('speak/stop/', views.StopSpeakView.as_view(), name='stop-speak'),
     path("speak/status/", views.SpeakStatusView.as_view()),
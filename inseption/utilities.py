@@ -1,32 +1,81 @@
+import json
 import os
 import shutil
 from django.conf import settings
+from django.core.files import locks
+from django.utils import timezone
 from django.utils.text import slugify
 
 
-def get_unique_path(base_dir, filename):
-    name, ext = os.path.splitext(filename)
-    counter = 1
-    unique_filename = filename
+FEEDBACK_DIR = "human_feedback_data"
+FEEDBACK_MANIFEST = "manifest.jsonl"
 
-    while os.path.exists(os.path.join(base_dir, unique_filename)):
-        unique_filename = f"{name}_{counter}{ext}"
-        counter += 1
 
-    return os.path.join(base_dir, unique_filename)
+def link_or_copy(src_path, dst_path):
+    """
+    Hard-link a stored blob into the dataset; copy across filesystems.
+    Raises FileExistsError if dst_path is already taken and
+    FileNotFoundError if the blob is missing, leaving dst_path untouched.
+    """
+    try:
+        os.link(src_path, dst_path)
+    except (FileExistsError, FileNotFoundError):
+        raise
+    except OSError:
+        # Source first: a missing blob must not leave an empty dst behind
+        with open(src_path, "rb") as src:
+            # O_EXCL keeps the copy fallback just as collision-safe as link()
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+            fd = os.open(dst_path, flags, 0o644)
+            try:
+                with os.fdopen(fd, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            except BaseException:
+                # A partial file would pass for a finished export on the next run
+                os.unlink(dst_path)
+                raise
+
+
+def feedback_filename(inspection, ext):
+    # The inspection id makes the name unique: no directory probing needed
+    return f"{slugify(inspection.correct_label)}_{inspection.pk}{ext.lower()}"
+
+
+def append_feedback_manifest(entry):
+    """Append one JSON line to the dataset manifest (safe across processes)."""
+    base_dir = os.path.join(settings.MEDIA_ROOT, FEEDBACK_DIR)
+    line = (json.dumps(entry, default=str) + "\n").encode()
+
+    fd = os.open(
+        os.path.join(base_dir, FEEDBACK_MANIFEST),
+        os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+        0o644,
+    )
+    try:
+        locks.lock(fd, locks.LOCK_EX)
+        os.write(fd, line)
+    finally:
+        locks.unlock(fd)
+        os.close(fd)
 
 
 def save_false_detection_image(inspection):
+    """
+    Add a corrected frame to the human feedback dataset:
+    human_feedback_data/<approved|not_approved>/<label>_<inspection id>.<ext>
+    plus one manifest.jsonl line. Returns the dataset-relative path, or None
+    if nothing was written (not eligible / already exported).
+    """
     # Only for false detected cases
     if not inspection.image or not inspection.correct_label or not inspection.false_detected:
-        return
+        return None
 
     # Decide folder based on approval
     approval_dir = "approved" if inspection.is_approved else "not_approved"
 
     base_dir = os.path.join(
         settings.MEDIA_ROOT,
-        "human_feedback_data",
+        FEEDBACK_DIR,
         approval_dir
     )
     os.makedirs(base_dir, exist_ok=True)
@@ -35,12 +84,23 @@ def save_false_detection_image(inspection):
 
     # Keep original extension
     _, ext = os.path.splitext(src_path)
+    filename = feedback_filename(inspection, ext)
 
-    # Safe label-based filename
-    safe_label = slugify(inspection.correct_label)
-    filename = f"{safe_label}{ext}"
-
-    # Unique path
-    dst_path = get_unique_path(base_dir, filename)
+    try:
+        link_or_copy(src_path, os.path.join(base_dir, filename))
+    except FileExistsError:
+        # Exported before (re-run of export_feedback_dataset)
+        return None
 
-    shutil.copy(src_path, dst_path)
+    relative_path = f"{approval_dir}/{filename}"
+    append_feedback_manifest({
+        "file": relative_path,
+        "label": inspection.correct_label,
+        "approved": inspection.is_approved,
+        "inspection_id": inspection.pk,
+        "rim_id": inspection.rim_id,
+        "description": inspection.user_description,
+        "source": inspection.image.name,
+        "exported_at": timezone.now().isoformat(),
+    })
+    return relative_path
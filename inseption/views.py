@@ -4,14 +4,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
 from django.utils import timezone
 from datetime import datetime, timedelta
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from .models import Schedule, Inspection,SpeakConfig
 from .serializers import ScheduleSerializer, InspectionSerializer,InspectionHumanVerifySerializer,ScheduleFilterSerializer
-from .tasks import set_status_processing, set_status_completed
-from .serializers import ScheduleDateRangeFilterSerializer
+from .serializers import ScheduleDateRangeFilterSerializer, ScheduleBulkCreateSerializer, ScheduleRecurrenceSerializer
+from .serializers import InspectionTrendFilterSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.generics import ListCreateAPIView,UpdateAPIView
@@ -26,28 +25,46 @@ from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from .models import EmergencyStop
 from .serializers import EmergencyStopSerializer
-from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 from rest_framework.generics import RetrieveAPIView
-from rest_framework.pagination import PageNumberPagination
 from robot_management.models import Robot
 from datetime import datetime, time, date as date_type
 
 
 from .models import RimType
 from .serializers import RimTypeSerializer
+from .ingest import ingest_inspections
+from .scheduling import existing_bookings, find_conflicts, overlapping_schedules, plan_dates
+from .recurrence import drop_future_occurrences, materialize, upcoming_occurrences
+from . import rollups
+from .dataset import (
+    astream_samples, decode_cursor, encode_cursor, shard_end, stream_samples, verified_inspections,
+)
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from .models import ScheduleRecurrence
+from .broadcast import inspection_broadcaster
+from . import counters, dashboard_cache
+from .models import RobotCounter, ScheduleCounter
+from .pagination import KeysetPagination
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from accounts.access import HasRobotAccess, allowed_robot_ids, can_access_robot, scope_queryset
+import calendar
+import json
 
 
 # ----------- Custom Pagination Class -----------
 
-class InspectionPagination(PageNumberPagination):
+class InspectionPagination(KeysetPagination):
+    ordering = ("inspected_at", "id")
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 50
 
-    def get_paginated_response(self, data, *, total_defected=0, total_non_defected=0):
+    def get_paginated_response(self, data, *, count=0, total_defected=0, total_non_defected=0):
         return Response({
-            "count": self.page.paginator.count,
+            "count": count,
             "total_defected": total_defected,
             "total_non_defected": total_non_defected,
             "next": self.get_next_link(),
@@ -58,14 +75,32 @@ class InspectionPagination(PageNumberPagination):
 
 
 
-class SchedulePagination(PageNumberPagination):
+class ScheduleRobotAccessMixin:
+    """HasRobotAccess checks the robot of the schedule_id URL kwarg."""
+
+    def get_access_robot_id(self):
+        return (
+            Schedule.objects
+            .filter(id=self.kwargs["schedule_id"])
+            .values_list("robot_id", flat=True)
+            .first()
+        )
+
+
+def robot_access_denied():
+    return Response(
+        {"success": False, "message": HasRobotAccess.message},
+        status=status.HTTP_403_FORBIDDEN
+    )
+
+
+class SchedulePagination(KeysetPagination):
+    ordering = ("-scheduled_date", "-scheduled_time", "-id")
     page_size = 8
-    page_size_query_param = None
-    page_query_param = "page"
 
-    def get_paginated_response(self, data, **extra):
+    def get_paginated_response(self, data, count=None, **extra):
         return Response({
-            "count": self.page.paginator.count,
+            "count": count,
             "next": self.get_next_link(),
             "previous": self.get_previous_link(),
             "results": data,
@@ -152,12 +187,8 @@ def create_schedule(request, robot_id):
         )
 
     # ---- OVERLAP CHECK ----
-    overlapping = Schedule.objects.filter(
-        robot=robot,
-        scheduled_date=scheduled_date,
-        scheduled_time__lt=end_time,
-        end_time__gt=scheduled_time,
-        is_canceled=False
+    overlapping = overlapping_schedules(
+        robot.id, scheduled_date, scheduled_time, end_time
     ).exists()
 
     if overlapping:
@@ -179,19 +210,9 @@ def create_schedule(request, robot_id):
     })
     serializer.is_valid(raise_exception=True)
 
+    # Status transitions are applied by run_schedule_dispatcher
     schedule = serializer.save(robot=robot)
 
-    # ---- CELERY TASKS ----
-    start_dt = timezone.make_aware(
-        datetime.combine(schedule.scheduled_date, schedule.scheduled_time)
-    )
-    end_dt = timezone.make_aware(
-        datetime.combine(schedule.scheduled_date, schedule.end_time)
-    )
-
-    set_status_processing.apply_async(args=[schedule.id], eta=start_dt)
-    set_status_completed.apply_async(args=[schedule.id], eta=end_dt)
-
     # ---- RESPONSE ----
     return Response(
         {
@@ -206,6 +227,147 @@ def create_schedule(request, robot_id):
 
 
 
+# -----------------------------------
+# BULK CREATE SCHEDULES
+# -----------------------------------
+def _slot_result(index, slot):
+    return {
+        "index": index,
+        "location": slot["location"],
+        "scheduled_date": str(slot["scheduled_date"]),
+        "scheduled_time": str(slot["scheduled_time"]),
+        "end_time": str(slot["end_time"]),
+    }
+
+
+@swagger_auto_schema(
+    method="post",
+    request_body=ScheduleBulkCreateSerializer,
+    responses={201: "Schedules created"}
+)
+@api_view(["POST"])
+def bulk_create_schedules(request, robot_id):
+    """
+    Create many slots for one robot: explicit ``slots`` and/or recurring
+    daily / weekly ``plans``. All slots are checked against the robot's
+    bookings with one query and an in-memory sweep-line.
+    """
+    try:
+        robot = Robot.objects.get(id=robot_id, is_active=True)
+    except Robot.DoesNotExist:
+        return Response(
+            {"status": 404, "message": "Robot not found", "success": False},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    serializer = ScheduleBulkCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "status": 400,
+                "message": "Invalid payload",
+                "success": False,
+                "errors": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    data = serializer.validated_data
+
+    # ---- EXPAND PLANS ----
+    slots = list(data.get("slots", []))
+    for plan in data.get("plans", []):
+        if (plan["end_date"] - plan["start_date"]).days > settings.SCHEDULE_BULK_MAX_DAYS:
+            return Response(
+                {
+                    "status": 400,
+                    "message": f"A plan may span at most {settings.SCHEDULE_BULK_MAX_DAYS} days",
+                    "success": False,
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        for scheduled_date in plan_dates(
+            plan["start_date"],
+            plan["end_date"],
+            plan["frequency"],
+            interval=plan["interval"],
+            weekdays=plan.get("weekdays"),
+        ):
+            slots.append({
+                "location": plan["location"],
+                "scheduled_date": scheduled_date,
+                "scheduled_time": plan["scheduled_time"],
+                "end_time": plan["end_time"],
+            })
+
+    if not slots:
+        return Response(
+            {"status": 400, "message": "Plans produced no slots", "success": False},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if len(slots) > settings.SCHEDULE_BULK_MAX_SLOTS:
+        return Response(
+            {
+                "status": 400,
+                "message": f"At most {settings.SCHEDULE_BULK_MAX_SLOTS} slots per request",
+                "success": False,
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # ---- CONFLICT CHECK + INSERT ----
+    with transaction.atomic():
+        # Serialize bulk bookings per robot so two requests can't both pass the check
+        list(Robot.objects.select_for_update().filter(id=robot.id).values_list("id", flat=True))
+
+        conflicts = find_conflicts(slots, existing_bookings(robot.id, slots))
+
+        results = []
+        for index, slot in enumerate(slots):
+            result = _slot_result(index, slot)
+            result["success"] = index not in conflicts
+            if index in conflicts:
+                result["error"] = conflicts[index]
+            results.append(result)
+
+        if conflicts and not data["skip_conflicts"]:
+            return Response(
+                {
+                    "status": 409,
+                    "message": f"{len(conflicts)} of {len(slots)} slots conflict with existing bookings",
+                    "success": False,
+                    "data": [result for result in results if not result["success"]],
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+
+        created = Schedule.objects.bulk_create([
+            Schedule(robot=robot, **slot)
+            for index, slot in enumerate(slots)
+            if index not in conflicts
+        ])
+        # bulk_create skips the counter signals
+        counters.refresh_schedule_counters(robot_ids=[robot.id])
+
+    # Status transitions are applied by run_schedule_dispatcher
+    created_iter = iter(created)
+    for result in results:
+        if result["success"]:
+            result["id"] = next(created_iter).id
+
+    return Response(
+        {
+            "status": 201,
+            "message": f"{len(created)} schedules created, {len(conflicts)} skipped",
+            "success": True,
+            "data": results,
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
 @api_view(["POST", "PATCH"])
 def create_or_update_schedule(request, robot_id, schedule_id=None):
     # --------------------------------------------------
@@ -334,12 +496,8 @@ def create_or_update_schedule(request, robot_id, schedule_id=None):
     # --------------------------------------------------
     # 7. OVERLAP CHECK
     # --------------------------------------------------
-    overlap_qs = Schedule.objects.filter(
-        robot=robot,
-        scheduled_date=scheduled_date,
-        scheduled_time__lt=end_time,
-        end_time__gt=scheduled_time,
-        is_canceled=False
+    overlap_qs = overlapping_schedules(
+        robot.id, scheduled_date, scheduled_time, end_time
     )
 
     if schedule:
@@ -369,29 +527,12 @@ def create_or_update_schedule(request, robot_id, schedule_id=None):
         partial=True if request.method == "PATCH" else False
     )
     serializer.is_valid(raise_exception=True)
+    # Status transitions are applied by run_schedule_dispatcher,
+    # which picks up the edit through Schedule.updated_at
     schedule = serializer.save(robot=robot)
 
     # --------------------------------------------------
-    # 9. CELERY TASKS (ETA BASED)
-    # --------------------------------------------------
-    start_dt = timezone.make_aware(
-        datetime.combine(schedule.scheduled_date, schedule.scheduled_time)
-    )
-    end_dt = timezone.make_aware(
-        datetime.combine(schedule.scheduled_date, schedule.end_time)
-    )
-
-    set_status_processing.apply_async(
-        args=[schedule.id],
-        eta=start_dt
-    )
-    set_status_completed.apply_async(
-        args=[schedule.id],
-        eta=end_dt
-    )
-
-    # --------------------------------------------------
-    # 10. RESPONSE
+    # 9. RESPONSE
     # --------------------------------------------------
     return Response(
         {
@@ -564,6 +705,7 @@ def create_schedule_immediately(request, robot_id):
         status="canceled",
         is_canceled=True
     )
+    counters.refresh_schedule_counters(robot_ids=[robot.id])
 
     # --------------------------------------------------
     # 7. CREATE IMMEDIATE SCHEDULE
@@ -576,20 +718,10 @@ def create_schedule_immediately(request, robot_id):
         status="processing",
     )
 
-    # --------------------------------------------------
-    # 8. CELERY TASK FOR AUTO COMPLETION
-    # --------------------------------------------------
-    end_datetime = timezone.make_aware(
-        datetime.combine(scheduled_date, end_time)
-    )
-
-    set_status_completed.apply_async(
-        args=[schedule.id],
-        eta=end_datetime
-    )
+    # Auto completion is applied by run_schedule_dispatcher
 
     # --------------------------------------------------
-    # 9. RESPONSE
+    # 8. RESPONSE
     # --------------------------------------------------
     return Response(
         {
@@ -622,6 +754,9 @@ def update_schedule(request, schedule_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+    if not can_access_robot(request.user, schedule.robot_id):
+        return robot_access_denied()
+
     # Optional: allow location update
     location = request.data.get("location", schedule.location)
 
@@ -637,18 +772,15 @@ def update_schedule(request, schedule_id):
     new_end_time = new_end_dt.time()
 
     # 4️⃣ OVERLAP CHECK
-    overlapping = Schedule.objects.filter(
-        location=location,
-        scheduled_date=new_scheduled_date,
-        scheduled_time__lt=new_end_time,
-        end_time__gt=new_scheduled_time
+    overlapping = overlapping_schedules(
+        schedule.robot_id, new_scheduled_date, new_scheduled_time, new_end_time
     ).exclude(id=schedule_id).exists()
 
     if overlapping:
         return Response(
             {
                 "status": 400,
-                "message": "Time slot already booked at this location",
+                "message": "Time slot already booked for this robot",
                 "success": False
             },
             status=status.HTTP_400_BAD_REQUEST
@@ -662,12 +794,7 @@ def update_schedule(request, schedule_id):
     schedule.status = "processing"  # start immediately
     schedule.save()
 
-    # 6️⃣ CELERY TASKS (Correct IST scheduling)
-    start_datetime = timezone.localtime()          # IST now
-    end_datetime = new_end_dt                      # IST + 1 hour
-
-    set_status_processing.apply_async(args=[schedule.id], eta=start_datetime)
-    set_status_completed.apply_async(args=[schedule.id], eta=end_datetime)
+    # 6️⃣ Completion is applied by run_schedule_dispatcher
 
     # 7️⃣ RESPONSE
     return Response(
@@ -705,6 +832,9 @@ def delete_schedule(request, schedule_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+    if not can_access_robot(request.user, schedule.robot_id):
+        return robot_access_denied()
+
     # Prevent deleting completed schedules
     if schedule.status == "completed":
         return Response(
@@ -764,9 +894,14 @@ def create_inspection(request):
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def cancel_all_schedules(request):
-    updated_count = Schedule.objects.filter(is_canceled=False).update(
+    # Staff users without superuser rights only cancel their robots' schedules
+    robot_ids = allowed_robot_ids(request.user)
+    updated_count = scope_queryset(
+        Schedule.objects.filter(is_canceled=False), request.user
+    ).update(
         is_canceled=True
     )
+    counters.refresh_schedule_counters(robot_ids=robot_ids)
 
     return Response({
         "success": True,
@@ -779,40 +914,45 @@ def cancel_all_schedules(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_schedules(request):
+    robot_ids = allowed_robot_ids(request.user)
 
-    base_qs = Schedule.objects.filter(is_canceled=False)
+    def build():
+        base_qs = scope_queryset(Schedule.objects.filter(is_canceled=False), request.user)
 
-    # 🔥 dynamic status counts
-    status_counts = (
-        base_qs
-        .values("status")
-        .annotate(count=Count("id"))
-    )
+        # 🔥 status counts from the materialized robot counters
+        summary = counters.robot_schedule_summary(robot_ids=robot_ids)
+        status_totals = {
+            status_name: summary[status_name]
+            for status_name in ("scheduled", "processing", "completed")
+            if summary[status_name]
+        }
 
-    # flatten counts
-    status_totals = {
-        item["status"]: item["count"]
-        for item in status_counts
-    }
+        paginator = SchedulePagination()
+        paginated_qs = paginator.paginate_queryset(base_qs, request)
 
-    paginator = SchedulePagination()
-    paginated_qs = paginator.paginate_queryset(
-        base_qs.order_by("-id"), request
-    )
+        serializer = ScheduleSerializer(paginated_qs, many=True)
 
-    serializer = ScheduleSerializer(paginated_qs, many=True)
+        return paginator.get_paginated_response({
+            "success": True,
+            "message": "Schedules fetched successfully",
+            "schedules": serializer.data,
+        }, count=summary["total"], status_totals=status_totals).data
 
-    return paginator.get_paginated_response({
-        "success": True,
-        "message": "Schedules fetched successfully",
-        "schedules": serializer.data,
-    }, status_totals=status_totals)
+    # Dashboard poll: served from cache until a schedule changes
+    return Response(dashboard_cache.cached(
+        "list_schedules",
+        None,
+        dashboard_cache.request_params(
+            request, robots=None if robot_ids is None else sorted(robot_ids)
+        ),
+        build,
+    ))
 
 
 
 
 @api_view(["GET"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasRobotAccess])
 def list_schedules_by_robot(request, robot_id=None):
     """
     List schedules for a specific robot (robot_id) or all robots if None.
@@ -833,46 +973,47 @@ def list_schedules_by_robot(request, robot_id=None):
         get_object_or_404(Robot, id=robot_id)
         base_qs = base_qs.filter(robot__id=robot_id)
 
-    # 🔹 status totals
-    status_counts = base_qs.values("status").annotate(count=Count("id"))
-
-    status_mapping = {
-        "scheduled": "pending",
-        "processing": "processing",
-        "completed": "completed",
-    }
-
-    status_totals = {v: 0 for v in status_mapping.values()}
-
-    for item in status_counts:
-        api_status = status_mapping.get(item["status"])
-        status_totals[api_status] = item["count"]
+    def build():
+        # 🔹 status totals (materialized robot counters, no COUNT over schedules)
+        summary = counters.robot_schedule_summary(robot_id or None)
 
-    status_totals["total"] = sum(status_totals.values())
+        status_totals = {
+            "pending": summary["scheduled"],
+            "processing": summary["processing"],
+            "completed": summary["completed"],
+            "total": summary["total"],
+        }
 
-    # 🔹 pagination
-    paginator = SchedulePagination()
-    page = paginator.paginate_queryset(base_qs.order_by("-id"), request)
-    serializer = ScheduleSerializer(page, many=True)
+        # 🔹 pagination
+        paginator = SchedulePagination()
+        page = paginator.paginate_queryset(base_qs, request)
+        serializer = ScheduleSerializer(page, many=True)
 
-    paginated_response = paginator.get_paginated_response(serializer.data)
+        paginated_response = paginator.get_paginated_response(
+            serializer.data, count=summary["total"]
+        )
 
-    # 🔹 final wrapped response
-    paginated_response.data = {
-        "success": True,
-        "message": "Schedules fetched successfully",
-        "data": {
-            "result": paginated_response.data,
-            "status_totals": status_totals,
-        },
-    }
+        # 🔹 final wrapped response
+        return {
+            "success": True,
+            "message": "Schedules fetched successfully",
+            "data": {
+                "result": paginated_response.data,
+                "status_totals": status_totals,
+            },
+        }
 
-    return paginated_response
+    return Response(dashboard_cache.cached(
+        "list_schedules_by_robot",
+        robot_id or None,
+        dashboard_cache.request_params(request),
+        build,
+    ))
 
 
 
-class InspectionListCreateView(ListCreateAPIView):
-    permission_classes = [IsAuthenticated]
+class InspectionListCreateView(ScheduleRobotAccessMixin, ListCreateAPIView):
+    permission_classes = [IsAuthenticated, HasRobotAccess]
     serializer_class = InspectionSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     pagination_class = InspectionPagination  # ← add pagination
@@ -886,18 +1027,10 @@ class InspectionListCreateView(ListCreateAPIView):
         inspection = serializer.save(schedule_id=schedule_id)
 
         # ------------------ Broadcast full serialized data ------------------
-        inspection_data = InspectionSerializer(inspection).data  # includes all fields
-
-        channel_layer = get_channel_layer()
-        group_name = f"schedule_{schedule_id}"
-
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "inspection_created",      # this tells the consumer which method to call
-                "event": "inspection_created",    # optional extra info
-                "data": inspection_data           # your full inspection data
-            }
+        # Coalesced per schedule group, sent off the request thread
+        inspection_broadcaster.publish(
+            f"schedule_{schedule_id}",
+            InspectionSerializer(inspection).data
         )
 
         return inspection
@@ -917,10 +1050,15 @@ class InspectionListCreateView(ListCreateAPIView):
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
 
-        totals = queryset.aggregate(
-            total_defected=Count("id", filter=Q(is_defect=True)),
-            total_non_defected=Count("id", filter=Q(is_defect=False)),
+        # Totals come from the schedule's counter row instead of COUNT(*)
+        summary = counters.inspection_summary(
+            ScheduleCounter.objects.filter(schedule_id=self.kwargs["schedule_id"]).first()
         )
+        totals = {
+            "count": summary["total"],
+            "total_defected": summary["defected"],
+            "total_non_defected": summary["non_defected"],
+        }
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -933,7 +1071,288 @@ class InspectionListCreateView(ListCreateAPIView):
                 },
                 **totals
             )
-        
+
+
+
+class InspectionBatchCreateView(ScheduleRobotAccessMixin, APIView):
+    """
+    Burst ingest: N frames + metadata in one request.
+
+    multipart: ``items`` (JSON array of inspection fields) and ``images``
+    (one file per item, same order). JSON bodies may send ``items`` as a
+    list without images.
+    """
+    permission_classes = [IsAuthenticated, HasRobotAccess]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def post(self, request, schedule_id):
+        schedule = get_object_or_404(Schedule, id=schedule_id)
+
+        items = request.data.get("items")
+        if isinstance(items, str):
+            try:
+                items = json.loads(items)
+            except ValueError:
+                items = None
+
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"success": False, "message": "items must be a non-empty JSON array"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_items = settings.INSPECTION_BATCH_MAX_ITEMS
+        if len(items) > max_items:
+            return Response(
+                {"success": False, "message": f"A batch can contain at most {max_items} items"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        images = request.FILES.getlist("images")
+        if images and len(images) != len(items):
+            return Response(
+                {"success": False, "message": "images count must match items count"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        items = [
+            {**item, "image": images[index]} if images and isinstance(item, dict) else item
+            for index, item in enumerate(items)
+        ]
+
+        try:
+            created, results = ingest_inspections(schedule, items)
+        except IntegrityError:
+            return Response(
+                {"success": False, "message": "rim_id conflict while saving batch, retry the request"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        # ------------------ Broadcast ------------------
+        inspection_broadcaster.publish_many(
+            f"schedule_{schedule.id}",
+            [result["inspection"] for result in results if result["success"]]
+        )
+
+        if len(created) == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {
+                "success": bool(created),
+                "message": f"{len(created)} of {len(items)} inspections created",
+                "created": len(created),
+                "failed": len(items) - len(created),
+                "results": results
+            },
+            status=response_status
+        )
+
+
+
+# -----------------------------------
+# RECURRING SCHEDULES
+# -----------------------------------
+class ScheduleRecurrenceListCreateView(APIView):
+    """
+    Recurring (daily / weekly) runs of a robot. Schedule rows are created
+    only up to SCHEDULE_RECURRENCE_HORIZON_DAYS ahead and rolled forward by
+    the materialize_recurrences beat task.
+    """
+    permission_classes = [IsAuthenticated, HasRobotAccess]
+
+    def get(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+        recurrences = ScheduleRecurrence.objects.filter(robot=robot).order_by("id")
+
+        return Response({
+            "success": True,
+            "message": "Recurrences fetched successfully",
+            "data": ScheduleRecurrenceSerializer(recurrences, many=True).data,
+        })
+
+    @swagger_auto_schema(request_body=ScheduleRecurrenceSerializer)
+    def post(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id, is_active=True)
+
+        serializer = ScheduleRecurrenceSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"success": False, "message": "Invalid payload", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        recurrence = serializer.save(robot=robot)
+        created = materialize(recurrence)
+        recurrence.refresh_from_db()
+
+        return Response(
+            {
+                "success": True,
+                "message": f"Recurrence created, {created} schedules materialized",
+                "data": ScheduleRecurrenceSerializer(recurrence).data,
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ScheduleRecurrenceDetailView(APIView):
+    permission_classes = [IsAuthenticated, HasRobotAccess]
+
+    def get_object(self, robot_id, recurrence_id):
+        return get_object_or_404(ScheduleRecurrence, id=recurrence_id, robot_id=robot_id)
+
+    def get(self, request, robot_id, recurrence_id):
+        recurrence = self.get_object(robot_id, recurrence_id)
+        return Response({
+            "success": True,
+            "message": "Recurrence fetched successfully",
+            "data": ScheduleRecurrenceSerializer(recurrence).data,
+        })
+
+    @swagger_auto_schema(request_body=ScheduleRecurrenceSerializer)
+    def patch(self, request, robot_id, recurrence_id):
+        recurrence = self.get_object(robot_id, recurrence_id)
+
+        serializer = ScheduleRecurrenceSerializer(recurrence, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(
+                {"success": False, "message": "Invalid payload", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            recurrence = serializer.save()
+            # Upcoming occurrences follow the new rule
+            drop_future_occurrences(recurrence)
+            materialize(recurrence)
+        recurrence.refresh_from_db()
+
+        return Response({
+            "success": True,
+            "message": "Recurrence updated successfully",
+            "data": ScheduleRecurrenceSerializer(recurrence).data,
+        })
+
+    def delete(self, request, robot_id, recurrence_id):
+        recurrence = self.get_object(robot_id, recurrence_id)
+
+        with transaction.atomic():
+            dropped = drop_future_occurrences(recurrence)
+            # Past / started runs keep their Schedule rows (recurrence → NULL)
+            recurrence.delete()
+
+        return Response({
+            "success": True,
+            "message": f"Recurrence deleted, {dropped} upcoming schedules removed",
+        })
+
+
+class UpcomingSchedulesView(APIView):
+    """
+    What a robot runs between start_date and end_date (default: next 7 days),
+    including recurring occurrences not materialized yet.
+    """
+    permission_classes = [IsAuthenticated, HasRobotAccess]
+    max_days = 92
+
+    def get(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+
+        today = timezone.localdate()
+        serializer = ScheduleDateRangeFilterSerializer(data={
+            "start_date": request.query_params.get("start_date", today),
+            "end_date": request.query_params.get("end_date", today + timedelta(days=7)),
+        })
+        if not serializer.is_valid():
+            return Response(
+                {"success": False, "message": "Invalid date range", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start_date = serializer.validated_data["start_date"]
+        end_date = serializer.validated_data["end_date"]
+        if (end_date - start_date).days > self.max_days:
+            return Response(
+                {"success": False, "message": f"Date range may span at most {self.max_days} days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        occurrences = upcoming_occurrences(robot.id, start_date, end_date)
+        for item in occurrences:
+            for field in ("scheduled_date", "scheduled_time", "end_time"):
+                item[field] = str(item[field]) if item[field] is not None else None
+
+        return Response({
+            "success": True,
+            "message": "Upcoming schedules fetched successfully",
+            "data": occurrences,
+        })
+
+
+class InspectionTrendView(APIView):
+    """
+    Defect-rate time series from the inspection rollups (rollups.py):
+    one point per hour / day / week / month, optionally for one robot
+    and / or rim type. Default: daily points of the last 30 days.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        serializer = InspectionTrendFilterSerializer(data={
+            "start_date": request.query_params.get("start_date", today - timedelta(days=29)),
+            "end_date": request.query_params.get("end_date", today),
+            **{
+                key: request.query_params[key]
+                for key in ("bucket", "robot", "rim_type")
+                if key in request.query_params
+            },
+        })
+        if not serializer.is_valid():
+            return Response(
+                {"success": False, "message": "Invalid trend filter", "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = serializer.validated_data
+        if "robot" in filters and not can_access_robot(request.user, filters["robot"]):
+            return robot_access_denied()
+
+        bucket = filters["bucket"]
+        _, max_days = rollups.TREND_BUCKETS[bucket]
+        if (filters["end_date"] - filters["start_date"]).days >= max_days:
+            return Response(
+                {"success": False, "message": f"{bucket} trends may span at most {max_days} days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = rollups.trend(
+            bucket,
+            filters["start_date"],
+            filters["end_date"],
+            robot_id=filters.get("robot"),
+            rim_type_id=filters.get("rim_type"),
+            robot_ids=allowed_robot_ids(request.user),
+        )
+        refreshed_until = rollups.refreshed_until()
+
+        return Response({
+            "success": True,
+            "message": "Inspection trends fetched successfully",
+            "data": {
+                "bucket": bucket,
+                "start_date": str(filters["start_date"]),
+                "end_date": str(filters["end_date"]),
+                # Inspections newer than this are not counted yet
+                "refreshed_until": refreshed_until.isoformat() if refreshed_until else None,
+                "series": series,
+            }
+        })
 
 
 class InspectionDetailView(RetrieveAPIView):
@@ -941,6 +1360,10 @@ class InspectionDetailView(RetrieveAPIView):
     serializer_class = InspectionSerializer
     queryset = Inspection.objects.all()  # REQUIRED for RetrieveAPIView
 
+    def get_queryset(self):
+        # Inspections of other users' robots read as not found
+        return scope_queryset(super().get_queryset(), self.request.user, "schedule__robot_id")
+
     def retrieve(self, request, *args, **kwargs):
         inspection = self.get_object()  # uses pk from URL
         serializer = self.get_serializer(inspection)
@@ -1021,6 +1444,9 @@ class InspectionHumanVerifyAPIView(UpdateAPIView):
     queryset = Inspection.objects.all()
     serializer_class = InspectionHumanVerifySerializer
 
+    def get_queryset(self):
+        return scope_queryset(super().get_queryset(), self.request.user, "schedule__robot_id")
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
@@ -1063,6 +1489,58 @@ class InspectionHumanVerifyAPIView(UpdateAPIView):
 
 
 
+class TrainingDatasetExportView(APIView):
+    """
+    Stream human-verified inspections as one WebDataset-style tar shard.
+
+    ?cursor=<X-Next-Cursor of the previous shard>&limit=<samples, default 1000>
+    The response carries X-Next-Cursor for the following request; 204 means
+    there is nothing newer than the cursor (verifications of the last
+    TRAINING_DATASET_EXPORT_LAG_SECONDS are held back, see dataset.py).
+    """
+    permission_classes = [IsAdminUser]
+    max_limit = 10000
+
+    def get(self, request):
+        after = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {"success": False, "message": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            limit = int(request.query_params.get("limit", 1000))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= self.max_limit:
+            return Response(
+                {"success": False, "message": f"limit must be between 1 and {self.max_limit}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Fix the shard boundary up front so the next cursor can go in a header
+        end = shard_end(after, limit)
+        if end is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        next_cursor = encode_cursor(*end)
+        inspections = verified_inspections(after, end)
+        # Match the server: a mismatched iterator is buffered whole by Django
+        if isinstance(request._request, ASGIRequest):
+            content = astream_samples(inspections)
+        else:
+            content = stream_samples(inspections)
+        response = StreamingHttpResponse(content, content_type="application/x-tar")
+        response["Content-Disposition"] = f'attachment; filename="rims-{end[1]}.tar"'
+        response["X-Next-Cursor"] = next_cursor
+        return response
+
+
 class EmergencyStopAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1115,7 +1593,8 @@ class EmergencyStopAPIView(APIView):
         })
 
 
-class EightPerPagePagination(PageNumberPagination):
+class EightPerPagePagination(KeysetPagination):
+    ordering = ("status_order", "scheduled_date", "scheduled_time", "id")
     page_size = 8
     page_size_query_param = "page_size"
     max_page_size = 8
@@ -1227,7 +1706,7 @@ class EightPerPagePagination(PageNumberPagination):
 
 
 class ScheduleFilterView(GenericAPIView):
-    permission_classes = [AllowAny]
+    permission_classes = [AllowAny, HasRobotAccess]
     serializer_class = ScheduleFilterSerializer
     pagination_class = EightPerPagePagination
 
@@ -1235,6 +1714,16 @@ class ScheduleFilterView(GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        # Keyed per robot + filter window (+ cursor); invalidated on robot writes
+        data = dashboard_cache.cached(
+            "schedule_filter",
+            robot_id,
+            dashboard_cache.request_params(request, filter=serializer.validated_data),
+            lambda: self.build(request, robot_id, serializer),
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def build(self, request, robot_id, serializer):
         filter_type = serializer.validated_data["filter_type"]
 
         qs = Schedule.objects.filter(
@@ -1255,10 +1744,10 @@ class ScheduleFilterView(GenericAPIView):
 
         elif filter_type == "month":
             date = serializer.validated_data["date"]
-            qs = qs.filter(
-                scheduled_date__year=date.year,
-                scheduled_date__month=date.month
-            )
+            # Plain date range (not __month) so the slot index can be used
+            start_date = date.replace(day=1)
+            end_date = date.replace(day=calendar.monthrange(date.year, date.month)[1])
+            qs = qs.filter(scheduled_date__range=(start_date, end_date))
 
         elif filter_type == "range":
             qs = qs.filter(
@@ -1268,6 +1757,9 @@ class ScheduleFilterView(GenericAPIView):
                 )
             )
 
+        # -------- Schedule + Inspection Summary (FULL DATA, one grouped query) --------
+        schedule_summary, inspection_summary = counters.window_summary(qs)
+
         # -------- STATUS-BASED ORDERING (processing → completed → scheduled) --------
         qs = qs.annotate(
             status_order=Case(
@@ -1283,81 +1775,36 @@ class ScheduleFilterView(GenericAPIView):
             "scheduled_time"
         )
 
-        # -------- Schedule Summary (FULL DATA) --------
-        schedule_summary = qs.aggregate(
-            total=Count("id"),
-            scheduled=Count("id", filter=Q(status="scheduled")),
-            processing=Count("id", filter=Q(status="processing")),
-            completed=Count("id", filter=Q(status="completed")),
-        )
-
-        # -------- Inspection Summary (FULL DATA) --------
-        inspection_summary = qs.aggregate(
-            total=Count("inspections", distinct=True),
-            defected=Count("inspections", filter=Q(inspections__is_defect=True), distinct=True),
-            non_defected=Count("inspections", filter=Q(inspections__is_defect=False), distinct=True),
-            approved=Count("inspections", filter=Q(inspections__is_approved=True), distinct=True),
-            human_verified=Count("inspections", filter=Q(inspections__is_human_verified=True), distinct=True),
-            pending_verification=Count(
-                "inspections",
-                filter=Q(
-                    inspections__is_human_verified=False,
-                    inspections__is_approved=False
-                ),
-                distinct=True
-            ),
-        )
-
         # -------- Pagination (SAFE & DRF-MANAGED) --------
         page = self.paginate_queryset(qs)
 
         schedules_data = ScheduleSerializer(page, many=True).data
 
-        paginator = self.paginator
-
-        return Response(
-            {
-                "success": True,
-                "message": "Robot schedule & inspection summary fetched",
-                "robot_id": robot_id,
-                "filter_type": filter_type,
+        return {
+            "success": True,
+            "message": "Robot schedule & inspection summary fetched",
+            "robot_id": robot_id,
+            "filter_type": filter_type,
 
-                "schedule_summary": schedule_summary,
-                "inspection_summary": inspection_summary,
+            "schedule_summary": schedule_summary,
+            "inspection_summary": inspection_summary,
 
-                "schedules": schedules_data,
+            "schedules": schedules_data,
 
-                "pagination": {
-                    "current_page": paginator.page.number,
-                    "total_pages": paginator.page.paginator.num_pages,
-                    "total_records": paginator.page.paginator.count,
-                    "page_size": paginator.page_size,
-                    "has_next": paginator.page.has_next(),
-                    "has_previous": paginator.page.has_previous(),
-                }
-            },
-            status=status.HTTP_200_OK
-        )
+            # total_records reuses the summary count: no extra COUNT(*)
+            "pagination": self.paginator.page_info(schedule_summary["total"]),
+        }
     
 
 
 
 
 class RobotInspectionStatsView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasRobotAccess]
 
     def get(self, request, robot_id):
-        inspections = Inspection.objects.filter(
-            schedule__robot_id=robot_id
-        )
-
-        stats = inspections.aggregate(
-            total_inspections=Count("id"),
-            total_defected=Count("id", filter=Q(is_defect=True)),
-            total_passed=Count("id", filter=Q(is_defect=False)),
-            total_approved=Count("id", filter=Q(is_approved=True)),
-            total_verified=Count("id", filter=Q(is_human_verified=True)),
-            total_false_detected=Count("id", filter=Q(false_detected=True)),
+        stats = dashboard_cache.cached(
+            "inspection_stats", robot_id, {}, lambda: self.build(robot_id)
         )
 
         return Response({
@@ -1368,6 +1815,19 @@ class RobotInspectionStatsView(APIView):
                 **stats
             }
         })
+
+    def build(self, robot_id):
+        counter = RobotCounter.objects.filter(robot_id=robot_id).first()
+        summary = counters.inspection_summary(counter)
+
+        return {
+            "total_inspections": summary["total"],
+            "total_defected": summary["defected"],
+            "total_passed": summary["non_defected"],
+            "total_approved": summary["approved"],
+            "total_verified": summary["human_verified"],
+            "total_false_detected": getattr(counter, "false_detected_count", 0),
+        }
     
 
 # ---------------- LIST & CREATE ----------------
@@ -12,14 +12,17 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import websocket_services.routing
+from websocket_services.middleware import JWTAuthMiddleware
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rim_inspection.settings")
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            websocket_services.routing.websocket_urlpatterns
+        JWTAuthMiddleware(
+            URLRouter(
+                websocket_services.routing.websocket_urlpatterns
+            )
         )
     ),
 })
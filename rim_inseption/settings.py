@@ -77,6 +77,25 @@ TIME_ZONE = "Asia/Kolkata"
 USE_TZ = True
 CELERY_TIMEZONE = "Asia/Kolkata"
 
+CELERY_BEAT_SCHEDULE = {
+    "materialize-schedule-recurrences": {
+        "task": "inseption.tasks.materialize_recurrences",
+        "schedule": 60 * 60,
+    },
+    "refresh-inspection-rollups": {
+        "task": "inseption.tasks.refresh_inspection_rollups",
+        "schedule": 5 * 60,
+    },
+    "compact-robot-logs": {
+        "task": "robot_management.tasks.compact_robot_logs",
+        "schedule": 60 * 60,
+    },
+    "flush-robot-telemetry": {
+        "task": "robot_management.tasks.flush_robot_telemetry",
+        "schedule": 60,
+    },
+}
+
 
 TEMPLATES = [
     {
@@ -106,6 +125,96 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Per-socket outbound WebSocket queue (websocket_services/queues.py): frames
+# beyond this follow the consumer's overflow policy; per-group queue stats
+# are published to the cache this often
+WS_SEND_QUEUE_SIZE = 256
+WS_QUEUE_METRICS_INTERVAL = 30
+
+# Robot message sockets (websocket_services/fanout.py): group messages skip
+# the channel layer when every member is in this process; group claims are
+# refreshed and re-read from the cache this often
+WS_LOCAL_DELIVERY_REFRESH_SECONDS = 1
+
+# Active robots for WebSocket connects (robot_management/registry.py): kept
+# in memory this long; a Robot save elsewhere is noticed within the check
+ROBOT_REGISTRY_TTL = 300
+ROBOT_REGISTRY_VERSION_CHECK_SECONDS = 2
+
+# Inspection frame uploads on the robot socket (websocket_services/uploads.py)
+WS_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+WS_UPLOAD_MAX_PENDING = 8
+
+# Shared by web, Celery and the schedule dispatcher so invalidation reaches every process
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    }
+}
+
+# Robot ↔ user bulk assign / revoke (accounts/assignments.py)
+ROBOT_ASSIGNMENT_BULK_MAX_PAIRS = 10000
+
+# Per-user allowed robot ids (accounts/access.py); invalidated on RobotUser
+# changes, the TTL only bounds a missed invalidation
+ROBOT_ACCESS_CACHE_TTL = 300
+
+# Robot logs (robot_management/logs.py): NDJSON ingest limits, rows older
+# than ROBOT_LOG_HOT_DAYS are moved to gzip daily archive files
+ROBOT_LOG_INGEST_CHUNK = 500
+ROBOT_LOG_INGEST_MAX_LINES = 50000
+ROBOT_LOG_HOT_DAYS = 7
+ROBOT_LOG_ARCHIVE_RETENTION_DAYS = 365
+ROBOT_LOG_ARCHIVE_DIR = BASE_DIR / "robot_log_archive"
+
+# Live log tail (HTTP NDJSON stream / WebSocket): poll interval, blank-line
+# heartbeat, and how long one HTTP stream lasts before the client resumes
+ROBOT_LOG_TAIL_POLL_SECONDS = 1
+ROBOT_LOG_TAIL_HEARTBEAT_SECONDS = 15
+ROBOT_LOG_TAIL_MAX_SECONDS = 300
+
+# Robot pose telemetry (robot_management/telemetry.py): latest pose in the
+# cache, written to the database at most once per FLUSH_SECONDS per robot;
+# trajectory keeps one sample per SAMPLE_SECONDS in a ring of HISTORY_SIZE
+# rows per robot (24 hours)
+ROBOT_TELEMETRY_FLUSH_SECONDS = 5
+ROBOT_TELEMETRY_SAMPLE_SECONDS = 10
+ROBOT_TELEMETRY_HISTORY_SIZE = 8640
+
+# Dashboard responses (dashboard_cache.py); entries are invalidated on writes,
+# the TTL only bounds how long unreachable versions linger
+DASHBOARD_CACHE_TTL = 300
+
+# Max frames accepted by the batch inspection ingest endpoint
+INSPECTION_BATCH_MAX_ITEMS = 100
+
+# Inspection image variants: name → longest edge in px (WEBP or JPEG)
+INSPECTION_IMAGE_DERIVATIVES = {"thumb": 240, "medium": 960}
+INSPECTION_IMAGE_DERIVATIVE_FORMAT = "WEBP"
+
+# Trend rollups (rollups.py) skip the newest inspections for this long so
+# rows of still-open transactions are not missed
+INSPECTION_ROLLUP_LAG_SECONDS = 120
+
+# Dataset export shards (dataset.py) leave out verifications newer than this,
+# so ones still committing are not skipped by the client's cursor
+TRAINING_DATASET_EXPORT_LAG_SECONDS = 120
+
+# inspection_created events are coalesced per schedule group over this window
+INSPECTION_BROADCAST_WINDOW_MS = 250
+
+# Schedule dispatcher (manage.py run_schedule_dispatcher)
+SCHEDULE_DISPATCHER_POLL_SECONDS = 5
+SCHEDULE_DISPATCHER_HORIZON_DAYS = 2
+
+# Bulk schedule creation (robots/<id>/schedule/bulk-create/)
+SCHEDULE_BULK_MAX_SLOTS = 1000
+SCHEDULE_BULK_MAX_DAYS = 366
+
+# Recurring schedules are materialized into Schedule rows this far ahead
+SCHEDULE_RECURRENCE_HORIZON_DAYS = 14
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -154,6 +263,8 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
+        # robot_id URL kwarg must be one of the user's robots (accounts/access.py)
+        "accounts.access.HasRobotAccess",
     ),
     "EXCEPTION_HANDLER": "utils.exception_handler.custom_exception_handler",
 }
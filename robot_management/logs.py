@@ -0,0 +1,479 @@
+"""
+RobotLog ingest, compaction and reads.
+
+Logs arrive as NDJSON (one JSON object per line) and are stored with
+bulk_create in chunks. Rows stay in the hot table (robot_logs) for
+ROBOT_LOG_HOT_DAYS; the compact_robot_logs job then moves them into one
+gzip NDJSON file per robot and local day under ROBOT_LOG_ARCHIVE_DIR
+(RobotLogArchive) and drops archives older than
+ROBOT_LOG_ARCHIVE_RETENTION_DAYS. read_logs() serves a time range from
+both, ordered by (created_at, id). LogTail follows the hot table by id for
+the live tail endpoint and WebSocket.
+
+An archive file is rewritten (merged with the day's remaining hot rows,
+deduplicated by log id) before the rows are deleted, so a run that dies
+half way is repaired by the next one.
+"""
+import asyncio
+import base64
+import binascii
+import gzip
+import heapq
+import json
+import logging
+import os
+import re
+import time as clock
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import RobotLog, RobotLogArchive
+
+logger = logging.getLogger(__name__)
+
+READ_LIMIT_MAX = 1000
+
+# Tail: entries per query, and how many log ids one poll may scan past
+TAIL_BATCH = 500
+TAIL_SCAN_IDS = 20000
+
+KEY_SEGMENT = re.compile(r"^\w{1,64}$")
+
+
+class LogIngestError(ValueError):
+    pass
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ---------------- ingest ----------------
+
+def iter_ndjson(stream):
+    """Yield (line number, object or None if the line isn't a JSON object); blank lines are skipped."""
+    for number, raw in enumerate(stream, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            entry = None
+        yield number, entry if isinstance(entry, dict) else None
+
+
+def ingest(robot_id, stream):
+    """
+    Store the NDJSON lines of ``stream`` as RobotLog rows of one robot.
+    Returns (stored count, rejected line numbers). More than
+    ROBOT_LOG_INGEST_MAX_LINES lines raise LogIngestError and store nothing.
+    """
+    chunk_size = settings.ROBOT_LOG_INGEST_CHUNK
+    max_lines = settings.ROBOT_LOG_INGEST_MAX_LINES
+
+    stored = 0
+    rejected = []
+    batch = []
+
+    with transaction.atomic():
+        for number, entry in iter_ndjson(stream):
+            if number > max_lines:
+                raise LogIngestError(f"At most {max_lines} lines per request")
+
+            if entry is None:
+                rejected.append(number)
+                continue
+
+            batch.append(RobotLog(robot_id=robot_id, log_data=entry))
+            if len(batch) >= chunk_size:
+                RobotLog.objects.bulk_create(batch)
+                stored += len(batch)
+                batch = []
+
+        if batch:
+            RobotLog.objects.bulk_create(batch)
+            stored += len(batch)
+
+        if stored:
+            transaction.on_commit(lambda: notify_appended(robot_id))
+
+    return stored, rejected
+
+
+def tail_group(robot_id):
+    return f"robot_logs_{robot_id}"
+
+
+def notify_appended(robot_id):
+    """Wake the robot's tail WebSockets; they fetch the new rows themselves."""
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            tail_group(robot_id), {"type": "logs_appended"}
+        )
+    except Exception:
+        logger.exception("Robot log tail notification failed")
+
+
+# ---------------- archives ----------------
+
+def archive_path(relative_path):
+    return os.path.join(settings.ROBOT_LOG_ARCHIVE_DIR, relative_path)
+
+
+def archive_relative_path(robot_id, day):
+    return os.path.join(str(robot_id), day.strftime("%Y"), f"{day.isoformat()}.ndjson.gz")
+
+
+def _entry(log):
+    return {
+        "id": log.id,
+        # UTC, so entries of one file sort correctly as strings
+        "created_at": log.created_at.astimezone(dt_timezone.utc).isoformat(),
+        "log_data": log.log_data,
+    }
+
+
+def _sort_key(entry):
+    return entry["created_at"], entry["id"]
+
+
+def read_archive(path):
+    """Entries of one archive file, in (created_at, id) order."""
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def _write_archive(path, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+        for entry in entries:
+            archive.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+
+    os.replace(tmp_path, path)
+    return count, os.path.getsize(path)
+
+
+def _deduplicated(entries):
+    last_id = None
+    for entry in entries:
+        if entry["id"] != last_id:
+            yield entry
+        last_id = entry["id"]
+
+
+def archive_day(robot_id, day):
+    """Move one robot's hot rows of a local day into its archive. Returns rows moved."""
+    start = day_start(day)
+    end = day_start(day + timedelta(days=1))
+
+    with transaction.atomic():
+        archive = (
+            RobotLogArchive.objects
+            .select_for_update()
+            .filter(robot_id=robot_id, day=day)
+            .first()
+        )
+        rows = RobotLog.objects.filter(robot_id=robot_id, created_at__gte=start, created_at__lt=end)
+        max_id = rows.order_by("-id").values_list("id", flat=True).first()
+        if max_id is None:
+            return 0
+        rows = rows.filter(id__lte=max_id)
+
+        relative_path = archive.path if archive else archive_relative_path(robot_id, day)
+        path = archive_path(relative_path)
+
+        sources = [
+            (_entry(log) for log in rows.order_by("created_at", "id").iterator(chunk_size=2000))
+        ]
+        if archive and os.path.exists(path):
+            sources.append(read_archive(path))
+
+        # Both sources are sorted: stream-merge instead of loading the day
+        count, size = _write_archive(path, _deduplicated(heapq.merge(*sources, key=_sort_key)))
+
+        RobotLogArchive.objects.update_or_create(
+            robot_id=robot_id,
+            day=day,
+            defaults={"path": relative_path, "entry_count": count, "size_bytes": size},
+        )
+        moved, _ = rows.delete()
+
+    return moved
+
+
+def compact(now=None):
+    """
+    Archive hot rows older than ROBOT_LOG_HOT_DAYS and delete archives
+    past ROBOT_LOG_ARCHIVE_RETENTION_DAYS. Returns (rows archived, archives purged).
+    """
+    today = timezone.localdate(now)
+    cutoff = day_start(today - timedelta(days=settings.ROBOT_LOG_HOT_DAYS))
+
+    days = (
+        RobotLog.objects
+        .filter(created_at__lt=cutoff)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("robot_id", "day")
+        .distinct()
+        .order_by("day", "robot_id")
+    )
+
+    archived = 0
+    for robot_id, day in list(days):
+        try:
+            archived += archive_day(robot_id, day)
+        except OSError:
+            logger.exception("Archiving logs of robot %s on %s failed", robot_id, day)
+
+    purged = purge_archives(today - timedelta(days=settings.ROBOT_LOG_ARCHIVE_RETENTION_DAYS))
+
+    if archived or purged:
+        logger.info("Robot logs: archived %s row(s), purged %s archive(s)", archived, purged)
+    return archived, purged
+
+
+def purge_archives(before_day):
+    purged = 0
+    for archive in RobotLogArchive.objects.filter(day__lt=before_day):
+        try:
+            os.remove(archive_path(archive.path))
+        except FileNotFoundError:
+            pass
+        archive.delete()
+        purged += 1
+    return purged
+
+
+# ---------------- reads ----------------
+
+def encode_cursor(entry):
+    raw = f"{entry['created_at']}|{entry['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (created_at, id); raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _hot_entries(robot_id, start, end, after, limit):
+    rows = RobotLog.objects.filter(robot_id=robot_id, created_at__gte=start, created_at__lt=end)
+    if after:
+        created_at, log_id = after
+        rows = rows.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=log_id)
+    return [_entry(log) for log in rows.order_by("created_at", "id")[:limit]]
+
+
+def _archived_entries(robot_id, start, end, after, limit):
+    archives = RobotLogArchive.objects.filter(
+        robot_id=robot_id,
+        day__gte=timezone.localtime(start).date(),
+        day__lte=timezone.localtime(end).date(),
+    ).order_by("day")
+
+    entries = []
+    for archive in archives:
+        try:
+            for entry in read_archive(archive_path(archive.path)):
+                created_at = datetime.fromisoformat(entry["created_at"])
+                if created_at < start or created_at >= end:
+                    continue
+                if after and (created_at, entry["id"]) <= after:
+                    continue
+                entries.append(entry)
+                if len(entries) >= limit:
+                    return entries
+        except FileNotFoundError:
+            logger.warning("Robot log archive missing: %s", archive.path)
+    return entries
+
+
+def read_logs(robot_id, start, end, after=None, limit=100):
+    """
+    Logs of a robot with start <= created_at < end in (created_at, id)
+    order, from archives and the hot table. ``after`` is a decoded cursor.
+    Returns (entries, next cursor or None).
+    """
+    limit = max(1, min(limit, READ_LIMIT_MAX))
+
+    merged = heapq.merge(
+        _archived_entries(robot_id, start, end, after, limit),
+        _hot_entries(robot_id, start, end, after, limit),
+        key=_sort_key,
+    )
+    entries = list(_deduplicated(merged))[:limit]
+
+    next_cursor = encode_cursor(entries[-1]) if len(entries) == limit else None
+    return entries, next_cursor
+
+
+# ---------------- tail ----------------
+
+def _key_path(key):
+    segments = key.split(".")
+    if not all(KEY_SEGMENT.match(segment) for segment in segments):
+        raise ValueError(f"Invalid log key: {key}")
+    return segments
+
+
+def _json_key(segments):
+    expression = F("log_data")
+    for segment in segments:
+        expression = KeyTransform(segment, expression)
+    return expression
+
+
+def parse_tail_filters(matches=(), has_keys=()):
+    """
+    ``match`` values "key=value" (value parsed as JSON when possible, so
+    code=42 matches a number) and ``has`` keys; dotted keys reach into
+    nested objects. Raises ValueError.
+    """
+    conditions = []
+    for raw in matches:
+        key, sep, value = raw.partition("=")
+        if not sep:
+            raise ValueError(f"match must be key=value: {raw}")
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        conditions.append(("match", _key_path(key), value))
+
+    for key in has_keys:
+        conditions.append(("has", _key_path(key), None))
+    return conditions
+
+
+def _apply_filters(rows, conditions):
+    # Keys are passed as expressions / values, never as lookup paths, so a
+    # key named like a lookup ("in", "contains") can't change the query
+    for index, (kind, segments, value) in enumerate(conditions):
+        name = f"_tail_{index}"
+        if kind == "match":
+            rows = rows.alias(**{name: _json_key(segments)}).filter(**{name: value})
+        else:
+            rows = rows.alias(**{name: _json_key(segments[:-1])}).filter(
+                **{f"{name}__has_key": segments[-1]}
+            )
+    return rows
+
+
+def latest_log_id(robot_id):
+    return (
+        RobotLog.objects.filter(robot_id=robot_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+
+
+def tail_start(robot_id, after=None, since=None):
+    """Tail position: explicit ``after`` id, first log at / after ``since``, else the newest log."""
+    if after is not None:
+        return after
+    if since is not None:
+        first = (
+            RobotLog.objects.filter(robot_id=robot_id, created_at__gte=since)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        return first - 1 if first else latest_log_id(robot_id)
+    return latest_log_id(robot_id)
+
+
+def tail_entries(robot_id, after_id, conditions=(), limit=TAIL_BATCH):
+    """
+    Matching logs with id > after_id, oldest first. Returns (entries, cursor,
+    caught_up). The cursor also moves past rows that didn't match, so a
+    selective filter doesn't rescan them on every poll.
+    """
+    latest = latest_log_id(robot_id)
+    if latest <= after_id:
+        return [], after_id, True
+
+    upper = min(latest, after_id + TAIL_SCAN_IDS)
+    rows = RobotLog.objects.filter(robot_id=robot_id, id__gt=after_id, id__lte=upper)
+    entries = [_entry(log) for log in _apply_filters(rows, conditions).order_by("id")[:limit]]
+
+    cursor = entries[-1]["id"] if len(entries) == limit else upper
+    return entries, cursor, cursor >= latest
+
+
+class LogTail:
+    """
+    Polls one robot's logs from a cursor and renders NDJSON, one line per
+    entry, blank lines as heartbeats. Stops after ROBOT_LOG_TAIL_MAX_SECONDS
+    (or once caught up, unless ``follow``); clients resume with ``after=``
+    the last id they received. Iterate synchronously under WSGI and with
+    ``async for`` under ASGI: StreamingHttpResponse buffers the whole
+    stream when the iterator type doesn't match the server.
+    """
+
+    def __init__(self, robot_id, after_id, conditions=(), follow=True):
+        self.robot_id = robot_id
+        self.cursor = after_id
+        self.conditions = conditions
+        self.follow = follow
+        self.started = self.last_output = clock.monotonic()
+
+    def step(self):
+        """One poll: (NDJSON text, seconds to wait before the next poll or None to stop)."""
+        entries, self.cursor, caught_up = tail_entries(self.robot_id, self.cursor, self.conditions)
+        text = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+
+        now = clock.monotonic()
+        if not caught_up:
+            wait = 0
+        elif not self.follow or now - self.started >= settings.ROBOT_LOG_TAIL_MAX_SECONDS:
+            wait = None
+        else:
+            wait = settings.ROBOT_LOG_TAIL_POLL_SECONDS
+            if not text and now - self.last_output >= settings.ROBOT_LOG_TAIL_HEARTBEAT_SECONDS:
+                text = "\n"
+
+        if text:
+            self.last_output = now
+        return text, wait
+
+    def __iter__(self):
+        while True:
+            text, wait = self.step()
+            if text:
+                yield text
+            if wait is None:
+                return
+            if wait:
+                clock.sleep(wait)
+
+    async def __aiter__(self):
+        step = database_sync_to_async(self.step)
+        while True:
+            text, wait = await step()
+            if text:
+                yield text
+            if wait is None:
+                return
+            if wait:
+                await asyncio.sleep(wait)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from robot_management.logs import compact
+
+
+class Command(BaseCommand):
+    help = "Move RobotLog rows older than ROBOT_LOG_HOT_DAYS into daily archives and purge expired archives"
+
+    def handle(self, *args, **options):
+        archived, purged = compact()
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} log row(s), purged {purged} archive(s)"
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robot_management', '0018_robot_minimum_battery_charge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('path', models.CharField(max_length=255)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'robot_log_archives',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='robotlog',
+            index=models.Index(fields=['robot', 'created_at', 'id'], name='robot_log_robot_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='robotlogarchive',
+            name='robot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_archives', to='robot_management.robot'),
+        ),
+        migrations.AddConstraint(
+            model_name='robotlogarchive',
+            constraint=models.UniqueConstraint(fields=('robot', 'day'), name='unique_robot_log_archive_day'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robot_management', '0019_robot_log_archives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='robotlog',
+            index=models.Index(fields=['robot', 'id'], name='robot_log_tail_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robot_management', '0020_robot_log_tail_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotTrajectorySample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField()),
+                ('recorded_at', models.DateTimeField()),
+                ('location_data', models.JSONField()),
+                ('robot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trajectory', to='robot_management.robot')),
+            ],
+            options={
+                'db_table': 'robot_trajectory_samples',
+                'indexes': [models.Index(fields=['robot', 'recorded_at'], name='robot_trajectory_time_idx')],
+                'constraints': [models.UniqueConstraint(fields=('robot', 'slot'), name='unique_robot_trajectory_slot')],
+            },
+        ),
+    ]
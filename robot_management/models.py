@@ -140,6 +140,10 @@ class RobotLog(models.Model):
         db_table = "robot_logs"
         indexes = [
             models.Index(fields=["created_at"]),
+            # Per-robot time range reads (logs.py)
+            models.Index(fields=["robot", "created_at", "id"], name="robot_log_robot_time_idx"),
+            # Live tail follows a robot's logs by id
+            models.Index(fields=["robot", "id"], name="robot_log_tail_idx"),
         ]
 
     def __str__(self):
@@ -148,11 +152,45 @@ class RobotLog(models.Model):
 
 
 
+class RobotLogArchive(models.Model):
+    """
+    One compressed NDJSON file of a robot's logs for one (local) day,
+    written by the log compaction job once the rows leave the hot table.
+    """
+
+    robot = models.ForeignKey(
+        Robot,
+        on_delete=models.CASCADE,
+        related_name="log_archives"
+    )
+
+    day = models.DateField()
+
+    # Relative to ROBOT_LOG_ARCHIVE_DIR
+    path = models.CharField(max_length=255)
+
+    entry_count = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "robot_log_archives"
+        constraints = [
+            models.UniqueConstraint(fields=["robot", "day"], name="unique_robot_log_archive_day"),
+        ]
+
+    def __str__(self):
+        return f"Logs of robot {self.robot_id} on {self.day}"
+
+
 def validate_stcm_file(value):
     if not value.name.endswith(".stcm"):
         raise ValidationError("Only .stcm map files are allowed")
 
 
+
 class RobotMap(models.Model):
 
     robot = models.ForeignKey(
@@ -200,6 +238,38 @@ class RobotLocation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class RobotTrajectorySample(models.Model):
+    """
+    One down-sampled pose of a robot's trajectory (telemetry.py).
+
+    Samples live in a fixed ring of ROBOT_TELEMETRY_HISTORY_SIZE slots per
+    robot; the slot of a sample follows from its time, so a new lap of the
+    ring overwrites the oldest rows in place.
+    """
+
+    robot = models.ForeignKey(
+        Robot,
+        on_delete=models.CASCADE,
+        related_name="trajectory"
+    )
+
+    slot = models.PositiveIntegerField()
+    recorded_at = models.DateTimeField()
+    location_data = models.JSONField()
+
+    class Meta:
+        db_table = "robot_trajectory_samples"
+        constraints = [
+            models.UniqueConstraint(fields=["robot", "slot"], name="unique_robot_trajectory_slot"),
+        ]
+        indexes = [
+            models.Index(fields=["robot", "recorded_at"], name="robot_trajectory_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"Pose of robot {self.robot_id} at {self.recorded_at}"
+
+
 
 class RobotNavigation(models.Model):
 
@@ -0,0 +1,113 @@
+"""
+In-process registry of active robots (robo_id → id) for WebSocket connects.
+
+Every robot socket connect has to know whether its robo_id belongs to an
+active robot. The registry answers from a dict loaded with one query and
+kept for ROBOT_REGISTRY_TTL seconds; during a reconnect storm the first
+connect loads it and the others wait on the same load instead of each
+taking a thread-pool slot for its own query.
+
+Saving or deleting a Robot (deactivation is a save of is_active) clears
+the registry of the process at commit and bumps a version in the shared
+cache; other processes compare versions at most every
+ROBOT_REGISTRY_VERSION_CHECK_SECONDS and reload when it moved.
+"""
+import asyncio
+import logging
+import time
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Robot
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "robot_registry:version"
+
+
+class RobotRegistry:
+
+    def __init__(self):
+        self._robots = None
+        self._loaded_at = 0
+        self._version = None
+        self._outdated = False
+        self._checked_at = 0
+        self._lock = None
+        self._lock_loop = None
+
+    def _get_lock(self):
+        # One lock per event loop (tests and async_to_sync run several)
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    @staticmethod
+    def _load():
+        return dict(Robot.objects.filter(is_active=True).values_list("robo_id", "id"))
+
+    def _needs_reload(self):
+        return (
+            self._robots is None
+            or self._outdated
+            or time.monotonic() - self._loaded_at >= settings.ROBOT_REGISTRY_TTL
+        )
+
+    async def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < settings.ROBOT_REGISTRY_VERSION_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            version = await cache.aget(VERSION_KEY)
+        except Exception:
+            logger.exception("Robot registry version check failed")
+            return
+        if version != self._version:
+            self._outdated = True
+
+    async def robot_id(self, robo_id):
+        """Id of the active robot with this robo_id, or None."""
+        if not self._needs_reload():
+            await self._check_version()
+        if self._needs_reload():
+            async with self._get_lock():
+                # Reloaded by whoever held the lock before us
+                if self._needs_reload():
+                    await self._reload()
+        return self._robots.get(robo_id)
+
+    async def _reload(self):
+        try:
+            version = await cache.aget(VERSION_KEY)
+        except Exception:
+            logger.exception("Robot registry version read failed")
+            version = None
+        self._robots = await database_sync_to_async(self._load)()
+        self._version = version
+        self._outdated = False
+        self._loaded_at = self._checked_at = time.monotonic()
+
+    def clear(self):
+        # May run on a request thread: flag rather than pull the dict away
+        self._outdated = True
+
+    def invalidate(self):
+        """Drop the registry here and, once the transaction commits, everywhere."""
+
+        def bump():
+            self.clear()
+            try:
+                cache.add(VERSION_KEY, 0, None)
+                cache.incr(VERSION_KEY)
+            except Exception:
+                logger.exception("Robot registry invalidation failed")
+
+        transaction.on_commit(bump)
+
+
+robot_registry = RobotRegistry()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Robot,RobotMap,RobotLocation,RobotNavigation,CalibrateHand,Profile
 from django.contrib.auth.models import User
+from inseption.counters import inspection_summary, schedule_summary
 
 
 class AssignedUserSerializer(serializers.ModelSerializer):
@@ -44,23 +45,13 @@ class RobotSerializer(serializers.ModelSerializer):
             "assigned_users"
         ]
 
+    # Summaries come from the materialized RobotCounter row
+    # (select_related("counters") in RobotViewSet); no row → all zeros.
     def get_schedule_summary(self, obj):
-        return {
-            "total": obj.total_schedules,
-            "scheduled": obj.scheduled_count,
-            "processing": obj.processing_count,
-            "completed": obj.completed_count,
-        }
+        return schedule_summary(getattr(obj, "counters", None))
 
     def get_inspection_summary(self, obj):
-        return {
-            "total": obj.total_inspections,
-            "defected": obj.total_defected,
-            "non_defected": obj.total_non_defected,
-            "approved": obj.approved_count,
-            "human_verified": obj.human_verified_count,
-            "pending_verification": obj.pending_verification_count,
-        }
+        return inspection_summary(getattr(obj, "counters", None))
     
     def get_assigned_users(self, obj):
         request = self.context.get("request")
@@ -69,9 +60,13 @@ class RobotSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_superuser:
             return None
 
-        users = User.objects.filter(
-            assigned_robots__robot=obj
-        ).distinct()
+        # Prefetched by RobotViewSet.get_queryset (assigned_users__user)
+        if "assigned_users" in getattr(obj, "_prefetched_objects_cache", {}):
+            users = [assignment.user for assignment in obj.assigned_users.all()]
+        else:
+            users = User.objects.filter(
+                assigned_robots__robot=obj
+            ).distinct()
 
         return AssignedUserSerializer(users, many=True).data
     
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Robot
+from .registry import robot_registry
+
+
+# Deactivating a robot is a save of is_active: both drop the WebSocket registry
+
+@receiver(post_save, sender=Robot)
+def robot_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        robot_registry.invalidate()
+
+
+@receiver(post_delete, sender=Robot)
+def robot_deleted(sender, instance, **kwargs):
+    robot_registry.invalidate()
@@ -0,0 +1,20 @@
+# tasks.py
+#
+# compact_robot_logs and flush_robot_telemetry run from CELERY_BEAT_SCHEDULE.
+
+from celery import shared_task
+from .logs import compact
+from . import telemetry
+
+
+@shared_task
+def compact_robot_logs():
+    """Beat job: move old RobotLog rows into daily archives, apply retention."""
+    archived, purged = compact()
+    return {"archived": archived, "purged": purged}
+
+
+@shared_task
+def flush_robot_telemetry():
+    """Beat job: write the poses of robots that stopped reporting before their flush."""
+    return {"flushed": telemetry.flush_all()}
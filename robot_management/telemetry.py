@@ -0,0 +1,209 @@
+"""
+Robot pose telemetry.
+
+Robots post their pose several times a second. Each pose only replaces the
+robot's latest pose in the shared cache, which is what location reads are
+served from. The database is written at most once per
+ROBOT_TELEMETRY_FLUSH_SECONDS per robot (plus the flush_robot_telemetry
+beat job for robots that went quiet since), with one upsert of RobotLocation
+and one of the pending trajectory samples.
+
+The trajectory is down-sampled to the first pose of every
+ROBOT_TELEMETRY_SAMPLE_SECONDS bucket (a cache.add per bucket, so concurrent
+workers agree on it) and stored in a ring of ROBOT_TELEMETRY_HISTORY_SIZE
+RobotTrajectorySample rows per robot: bucket n goes to slot
+n % ROBOT_TELEMETRY_HISTORY_SIZE, overwriting the sample one lap older.
+"""
+import logging
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Robot, RobotLocation, RobotTrajectorySample
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "robot_telemetry"
+
+# The latest pose outlives any flush; on a miss reads fall back to RobotLocation
+LATEST_TTL = 24 * 60 * 60
+# Samples only wait in the cache until the next flush
+SAMPLE_TTL = 60 * 60
+
+
+def _key(kind, robot_id, *parts):
+    return ":".join(str(part) for part in (CACHE_PREFIX, kind, robot_id, *parts))
+
+
+def _bucket(ts):
+    return int(ts // settings.ROBOT_TELEMETRY_SAMPLE_SECONDS)
+
+
+def _from_ts(ts):
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+
+
+def record(robot_id, location_data, now=None):
+    """
+    Take a pose of ``robot_id``: make it the latest, sample it into the
+    trajectory if it opens a new bucket, and flush when the robot's flush
+    interval has passed. Returns the pose as stored in the cache.
+    """
+    now = now or timezone.now()
+    ts = now.timestamp()
+    pose = {"ts": ts, "updated_at": now, "location_data": location_data}
+
+    cache.set(_key("latest", robot_id), pose, LATEST_TTL)
+    cache.add(
+        _key("sample", robot_id, _bucket(ts)),
+        {"ts": ts, "location_data": location_data},
+        SAMPLE_TTL,
+    )
+
+    if cache.add(_key("flush_lock", robot_id), 1, settings.ROBOT_TELEMETRY_FLUSH_SECONDS):
+        try:
+            flush(robot_id, now)
+        except Exception:
+            # The pose is in the cache; the next flush picks it up
+            logger.exception("Telemetry flush failed for robot %s", robot_id)
+
+    return pose
+
+
+def latest(robot_id):
+    """
+    Latest pose of a robot as {"updated_at": datetime, "location_data": ...},
+    or None if it never reported one.
+    """
+    pose = cache.get(_key("latest", robot_id))
+    if pose is not None:
+        return pose
+
+    location = RobotLocation.objects.filter(robot_id=robot_id).first()
+    if location is None:
+        return None
+    return {
+        "ts": location.updated_at.timestamp(),
+        "updated_at": location.updated_at,
+        "location_data": location.location_data,
+    }
+
+
+def _flushed_ts(state):
+    # Absent until a pose was written; also tolerate states saved with None
+    ts = state.get("ts")
+    return float("-inf") if ts is None else ts
+
+
+def _pending_samples(robot_id, flushed_bucket, now):
+    """Cached samples newer than ``flushed_bucket``, oldest first."""
+    current = _bucket(now.timestamp())
+    oldest = current - math.ceil(SAMPLE_TTL / settings.ROBOT_TELEMETRY_SAMPLE_SECONDS)
+    if flushed_bucket is not None:
+        oldest = max(oldest, flushed_bucket + 1)
+
+    keys = {_key("sample", robot_id, bucket): bucket for bucket in range(oldest, current + 1)}
+    found = cache.get_many(list(keys))
+    return [(keys[key], found[key]) for key in sorted(found, key=keys.get)]
+
+
+def flush(robot_id, now=None):
+    """
+    Write the latest pose and the pending trajectory samples of a robot.
+    Returns False if there was nothing new to write.
+    """
+    now = now or timezone.now()
+    pose = cache.get(_key("latest", robot_id))
+    state = cache.get(_key("flushed", robot_id)) or {}
+
+    samples = _pending_samples(robot_id, state.get("bucket"), now)
+    pose_is_new = pose is not None and pose["ts"] > _flushed_ts(state)
+    if not pose_is_new and not samples:
+        return False
+
+    size = settings.ROBOT_TELEMETRY_HISTORY_SIZE
+    with transaction.atomic():
+        if pose_is_new:
+            RobotLocation.objects.bulk_create(
+                [RobotLocation(robot_id=robot_id, location_data=pose["location_data"])],
+                update_conflicts=True,
+                unique_fields=["robot"],
+                update_fields=["location_data", "updated_at"],
+            )
+        if samples:
+            RobotTrajectorySample.objects.bulk_create(
+                [
+                    RobotTrajectorySample(
+                        robot_id=robot_id,
+                        slot=bucket % size,
+                        recorded_at=_from_ts(sample["ts"]),
+                        location_data=sample["location_data"],
+                    )
+                    for bucket, sample in samples
+                ],
+                update_conflicts=True,
+                unique_fields=["robot", "slot"],
+                update_fields=["recorded_at", "location_data"],
+            )
+
+    # The current bucket may still gain its sample from a concurrent request:
+    # read it again next time (the upsert is idempotent)
+    flushed = {"bucket": _bucket(now.timestamp()) - 1}
+    flushed_ts = pose["ts"] if pose_is_new else state.get("ts")
+    if flushed_ts is not None:
+        flushed["ts"] = flushed_ts
+    cache.set(_key("flushed", robot_id), flushed, None)
+    return True
+
+
+def flush_all(now=None):
+    """Beat job: flush robots whose latest pose is not in the database yet."""
+    now = now or timezone.now()
+    robot_ids = list(Robot.objects.values_list("id", flat=True))
+
+    poses = cache.get_many([_key("latest", robot_id) for robot_id in robot_ids])
+    states = cache.get_many([_key("flushed", robot_id) for robot_id in robot_ids])
+
+    flushed = 0
+    for robot_id in robot_ids:
+        pose = poses.get(_key("latest", robot_id))
+        state = states.get(_key("flushed", robot_id)) or {}
+        if pose is None or pose["ts"] <= _flushed_ts(state):
+            continue
+        # A request flushing this robot right now covers it
+        if not cache.add(_key("flush_lock", robot_id), 1, settings.ROBOT_TELEMETRY_FLUSH_SECONDS):
+            continue
+        try:
+            flushed += flush(robot_id, now)
+        except Exception:
+            logger.exception("Telemetry flush failed for robot %s", robot_id)
+    return flushed
+
+
+def history(robot_id, start, end, now=None):
+    """
+    Trajectory samples of a robot recorded in [start, end], oldest first,
+    including samples that are not flushed yet.
+    """
+    now = now or timezone.now()
+    samples = {
+        row.recorded_at.timestamp(): row.location_data
+        for row in RobotTrajectorySample.objects.filter(
+            robot_id=robot_id, recorded_at__gte=start, recorded_at__lte=end
+        ).only("recorded_at", "location_data")
+    }
+
+    state = cache.get(_key("flushed", robot_id)) or {}
+    start_ts, end_ts = start.timestamp(), end.timestamp()
+    for _, sample in _pending_samples(robot_id, state.get("bucket"), now):
+        if start_ts <= sample["ts"] <= end_ts:
+            samples[sample["ts"]] = sample["location_data"]
+
+    return [
+        {"recorded_at": _from_ts(ts), "location_data": samples[ts]}
+        for ts in sorted(samples)
+    ]
@@ -1,73 +1,92 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
-
-from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import RobotUser
+from . import telemetry
+from .models import Robot, RobotLocation, RobotTrajectorySample
+
+
+class RobotListQueryCountTests(TestCase):
+    """A page of robots must cost the same number of queries whatever its size."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_robot(self, index):
+        robot = Robot.objects.create(name=f"Robot {index}", robo_id=f"RB-{index}")
+        for n in range(2):
+            user = User.objects.create_user(f"operator-{index}-{n}")
+            RobotUser.objects.create(robot=robot, user=user, assigned_by=self.admin)
+        return robot
+
+    def list_robots(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("robot-list"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_assigned_users_do_not_add_queries_per_robot(self):
+        self.add_robot(0)
+        _, one_robot = self.list_robots()
+
+        for index in range(1, 4):
+            self.add_robot(index)
+        response, full_page = self.list_robots()
+
+        self.assertEqual(full_page, one_robot)
+        robots = response.json()["results"]["data"]
+        self.assertEqual(len(robots), 4)
+        for robot in robots:
+            self.assertEqual(len(robot["assigned_users"]), 2)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TelemetryFlushTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.robot = Robot.objects.create(name="Robot", robo_id="RB-T")
+        self.now = timezone.now()
+
+    def test_samples_only_flush_then_pose_flush(self):
+        # A sample waiting in the cache without a latest pose
+        cache.add(
+            telemetry._key("sample", self.robot.id, telemetry._bucket(self.now.timestamp())),
+            {"ts": self.now.timestamp(), "location_data": {"x": 0}},
+            telemetry.SAMPLE_TTL,
+        )
+        self.assertTrue(telemetry.flush(self.robot.id, self.now))
+        self.assertEqual(RobotTrajectorySample.objects.filter(robot=self.robot).count(), 1)
+        self.assertFalse(RobotLocation.objects.filter(robot=self.robot).exists())
+
+        later = self.now + timedelta(seconds=30)
+        telemetry.record(self.robot.id, {"x": 1}, now=later)
+        self.assertEqual(RobotLocation.objects.get(robot=self.robot).location_data, {"x": 1})
+
+        cache.delete(telemetry._key("flush_lock", self.robot.id))
+        telemetry.record(self.robot.id, {"x": 2}, now=later + timedelta(seconds=30))
+        self.assertEqual(RobotLocation.objects.get(robot=self.robot).location_data, {"x": 2})
 
+    def test_flush_all_survives_state_without_ts(self):
+        # State left by a samples-only flush before "ts" was omitted
+        cache.set(telemetry._key("flushed", self.robot.id), {"ts": None, "bucket": 0}, None)
+        other = Robot.objects.create(name="Other", robo_id="RB-U")
+        for robot in (self.robot, other):
+            cache.set(
+                telemetry._key("latest", robot.id),
+                {"ts": self.now.timestamp(), "updated_at": self.now, "location_data": {"id": robot.id}},
+                telemetry.LATEST_TTL,
+            )
 
-class Robot(models.Model):
-
-    # Identity
-    name = models.CharField(max_length=150)
-    robo_id = models.CharField(
-        max_length=100,
-        unique=True,
-        help_text="Unique robot identifier"
-    )
-    model_number = models.CharField(null=True,blank=True,max_length=100)
-
-    # Network
-    local_ip = models.GenericIPAddressField(
-        protocol="IPv4",
-        null=True,
-        blank=True,
-        help_text="Local network IP of the robot"
-    )
-
-    # Lifecycle
-    status = models.CharField(
-        max_length=20,
-        choices=[
-            ("AVAILABLE", "Available"),
-            ("SOLD", "Sold"),
-            ("IN_TRANSIT", "In Transit"),
-            ("MAINTENANCE", "Maintenance"),
-        ],
-        default="AVAILABLE"
-    )
-
-    # Emergency
-    emergency = models.BooleanField(
-        default=False,
-        help_text="Indicates emergency stop or critical state"
-    )
-
-   
-
-    # Inspection
-    inspection_status = models.CharField(
-        max_length=20,
-        choices=[
-            ("PENDING", "Pending"),
-            ("PASSED", "Passed"),
-            ("FAILED", "Failed"),
-        ],
-        default="PENDING"
-    )
-    last_inspected_at = models.DateTimeField(null=True, blank=True)
-
-    # Meta
-    is_active = models.BooleanField(default=True)
-    created_by = models.ForeignKey(
-        User,
-        on_delete=models.SET_NULL,
-        null=True,
-        related_name="robots_created"
-    )
-
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    def __str__(self):
-        return f"{self.name} ({self.robot_id})"
+        self.assertEqual(telemetry.flush_all(self.now), 2)
+        self.assertEqual(RobotLocation.objects.count(), 2)
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import RobotEventBroadcastAPIView
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RobotViewSet, RobotEventBroadcastAPIView,RobotMapDetailAPIView,RobotMapCreateUpdateAPIView,robot_location,RobotNavigationAPIView
+from .views import RobotViewSet, RobotEventBroadcastAPIView,RobotMapDetailAPIView,RobotMapCreateUpdateAPIView,robot_location,RobotNavigationAPIView,RobotLocationHistoryView
 from .views import EmergencyView, SpeakStartView, RobotViewSet
 from .views import *
 robot_list = RobotViewSet.as_view({
@@ -41,6 +41,12 @@ urlpatterns = [
         name="robot-location"
     ),
 
+    path(
+        "robots/<int:robot_id>/location/history/",
+        RobotLocationHistoryView.as_view(),
+        name="robot-location-history"
+    ),
+
     path(
         "robots/<int:robot_id>/navigation/",
         RobotNavigationAPIView.as_view(),
@@ -108,6 +114,10 @@ urlpatterns = [
         name="calibration-hand-action"
     ),
 
+    path("robots/<int:robot_id>/logs/", RobotLogListView.as_view(), name="robot-logs"),
+    path("robots/<int:robot_id>/logs/ingest/", RobotLogIngestView.as_view(), name="robot-log-ingest"),
+    path("robots/<int:robot_id>/logs/tail/", RobotLogTailView.as_view(), name="robot-log-tail"),
+
     path(
     "robots/<int:id>/get_min_battery/",
     get_or_update_min_battery,
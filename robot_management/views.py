@@ -22,7 +22,16 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count, Q
+from django.db.models import Prefetch
+from accounts.models import RobotUser
+from accounts.access import HasRobotAccess, allowed_robot_ids, can_access_robot, scope_queryset
+from . import logs as robot_logs
+from . import telemetry
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import timedelta
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from .models import RobotLocation,CalibrateHand,Profile
 from robot_management.models import Robot
 from .serializers import RobotLocationSerializer,EmergencySerializer,SpeakStartSerializer,CalibrateHandSerializer,ProfileSerializer
@@ -48,86 +57,24 @@ class RobotViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         if user.is_superuser:
-            qs = Robot.objects.all()
-        else:
-            qs = (
-                Robot.objects
-                .filter(
-                    is_active=True,
-                    assigned_users__user=user
+            # assigned_users is only serialized for superusers: one query per page
+            qs = Robot.objects.prefetch_related(
+                Prefetch(
+                    "assigned_users",
+                    queryset=RobotUser.objects.select_related("user").order_by("user_id"),
                 )
-                .distinct()
+            )
+        else:
+            # Cached assignment set (accounts/access.py): no join / DISTINCT
+            qs = Robot.objects.filter(
+                is_active=True,
+                id__in=allowed_robot_ids(user)
             )
 
 
 
-        # -------- Aggregations --------
-        return qs.annotate(
-            # Schedule summary
-            total_schedules=Count(
-                "schedules",
-                filter=Q(schedules__is_canceled=False),
-                distinct=True
-            ),
-            scheduled_count=Count(
-                "schedules",
-                filter=Q(
-                    schedules__status="scheduled",
-                    schedules__is_canceled=False
-                ),
-                distinct=True
-            ),
-            processing_count=Count(
-                "schedules",
-                filter=Q(
-                    schedules__status="processing",
-                    schedules__is_canceled=False
-                ),
-                distinct=True
-            ),
-            completed_count=Count(
-                "schedules",
-                filter=Q(
-                    schedules__status="completed",
-                    schedules__is_canceled=False
-                ),
-                distinct=True
-            ),
-
-            # Inspection summary
-            total_inspections=Count(
-                "schedules__inspections",
-                distinct=True
-            ),
-            total_defected=Count(
-                "schedules__inspections",
-                filter=Q(schedules__inspections__is_defect=True),
-                distinct=True
-            ),
-            total_non_defected=Count(
-                "schedules__inspections",
-                filter=Q(schedules__inspections__is_defect=False),
-                distinct=True
-            ),
-            approved_count=Count(
-                "schedules__inspections",
-                filter=Q(schedules__inspections__is_approved=True),
-                distinct=True
-            ),
-            human_verified_count=Count(
-                "schedules__inspections",
-                filter=Q(schedules__inspections__is_human_verified=True),
-                distinct=True
-            ),
-            pending_verification_count=Count(
-                "schedules__inspections",
-                filter=Q(
-                    schedules__inspections__is_human_verified=False,
-                    schedules__inspections__is_approved=False
-                ),
-                distinct=True
-            ),
-        )
+        # -------- Summaries (materialized in inseption.RobotCounter) --------
+        return qs.select_related("counters")
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -294,7 +241,7 @@ class RobotEventBroadcastAPIView(APIView):
 
 
 class RobotMapCreateUpdateAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasRobotAccess]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request, robot_id):
@@ -410,10 +357,8 @@ class RobotMapDetailAPIView(APIView):
     parser_classes = [MultiPartParser, FormParser]
 
     def get_object(self, pk):
-        try:
-            return RobotMap.objects.get(pk=pk)
-        except RobotMap.DoesNotExist:
-            return None
+        # Maps of robots the user isn't assigned to read as not found
+        return scope_queryset(RobotMap.objects.all(), self.request.user).filter(pk=pk).first()
 
     # GET by ID
     def get(self, request, pk):
@@ -495,7 +440,7 @@ class RobotMapDetailAPIView(APIView):
 
 
 @api_view(["GET", "POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasRobotAccess])
 def robot_location(request, robot_id):
     # -------- Validate robot --------
     try:
@@ -508,15 +453,14 @@ def robot_location(request, robot_id):
 
     # -------- GET LOCATION --------
     if request.method == "GET":
-        try:
-            location = RobotLocation.objects.get(robot=robot)
-        except RobotLocation.DoesNotExist:
+        pose = telemetry.latest(robot.id)
+        if pose is None:
             return Response(
                 {"success": False, "message": "Location not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = RobotLocationSerializer(location)
+        serializer = RobotLocationSerializer(_location_from_pose(robot, pose))
         return Response({
             "success": True,
             "message": "Robot location retrieved successfully",
@@ -525,21 +469,57 @@ def robot_location(request, robot_id):
 
     # -------- CREATE / UPDATE LOCATION --------
     if request.method == "POST":
-        location_obj, created = RobotLocation.objects.get_or_create(
-            robot=robot,
-            defaults={"location_data": request.data.get("location_data")}
-        )
+        location_data = request.data.get("location_data")
+        if location_data is None:
+            return Response(
+                {"success": False, "message": "location_data is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        if not created:
-            location_obj.location_data = request.data.get("location_data")
-            location_obj.save()
+        # Cached, and written to the database at a bounded rate
+        pose = telemetry.record(robot.id, location_data)
 
-        serializer = RobotLocationSerializer(location_obj)
+        serializer = RobotLocationSerializer(_location_from_pose(robot, pose))
         return Response({
             "success": True,
             "message": "Robot location saved successfully",
             "data": serializer.data
         }, status=status.HTTP_200_OK)
+
+
+def _location_from_pose(robot, pose):
+    return RobotLocation(robot=robot, location_data=pose["location_data"], updated_at=pose["updated_at"])
+
+
+class RobotLocationHistoryView(APIView):
+    """
+    Down-sampled trajectory of a robot between ``start`` and ``end`` (ISO
+    date or datetime; default: the last hour), oldest first.
+    """
+
+    def get(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+        now = timezone.now()
+
+        try:
+            start = _parse_log_bound(request.query_params.get("start"), now - timedelta(hours=1))
+            end = _parse_log_bound(request.query_params.get("end"), now)
+        except ValueError:
+            return Response(
+                {"success": False, "message": "Invalid start or end"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "success": True,
+            "message": "Robot location history fetched successfully",
+            "data": {
+                "robot_id": robot.id,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "samples": telemetry.history(robot.id, start, end, now=now),
+            }
+        })
     
 
 
@@ -1224,6 +1204,15 @@ def get_or_update_min_battery(request, id):
     # --------------------------------------------------
     # 1. VALIDATE ROBOT
     # --------------------------------------------------
+    if not can_access_robot(request.user, id):
+        return Response(
+            {
+                "success": False,
+                "message": HasRobotAccess.message
+            },
+            status=status.HTTP_403_FORBIDDEN
+        )
+
     try:
         robot = Robot.objects.get(id=id, is_active=True)
     except Robot.DoesNotExist:
@@ -1321,4 +1310,124 @@ def get_or_update_min_battery(request, id):
             }
         },
         status=status.HTTP_200_OK
-    )
\ No newline at end of file
+    )
+
+
+# ---------------- ROBOT LOGS ----------------
+
+class RobotLogIngestView(APIView):
+    """
+    Bulk log upload: NDJSON body, one JSON object per line. The body is
+    read line by line from the request stream and stored in chunks.
+    """
+
+    def post(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+
+        try:
+            stored, rejected = robot_logs.ingest(robot.id, request.stream or [])
+        except robot_logs.LogIngestError as exc:
+            return Response(
+                {"success": False, "message": str(exc)},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        return Response(
+            {
+                "success": True,
+                "message": "Logs stored",
+                "data": {
+                    "stored": stored,
+                    "rejected_lines": rejected[:100],
+                    "rejected_count": len(rejected),
+                }
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+def _parse_log_bound(value, default):
+    if not value:
+        return default
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        return robot_logs.day_start(day)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class RobotLogListView(APIView):
+    """
+    Logs of a robot between ``start`` and ``end`` (ISO date or datetime;
+    default: the last 24 hours), from the hot table and the daily
+    archives. Page with ``cursor`` from the previous response.
+    """
+
+    def get(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+        now = timezone.now()
+
+        try:
+            start = _parse_log_bound(request.query_params.get("start"), now - timedelta(days=1))
+            end = _parse_log_bound(request.query_params.get("end"), now)
+            limit = int(request.query_params.get("limit", 100))
+            cursor = request.query_params.get("cursor")
+            after = robot_logs.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response(
+                {"success": False, "message": "Invalid start, end, limit or cursor"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries, next_cursor = robot_logs.read_logs(robot.id, start, end, after=after, limit=limit)
+
+        return Response({
+            "success": True,
+            "message": "Robot logs fetched successfully",
+            "data": {
+                "robot_id": robot.id,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "next_cursor": next_cursor,
+                "logs": entries,
+            }
+        })
+
+
+class RobotLogTailView(APIView):
+    """
+    Live tail of a robot's logs as an NDJSON stream. Starts after log id
+    ``after`` (resume), at ``since`` (ISO datetime), or at the newest log;
+    ``match=key=value`` / ``has=key`` (repeatable, dotted keys) filter on
+    the JSON payload. ``follow=0`` returns the backlog and ends.
+    """
+
+    def get(self, request, robot_id):
+        robot = get_object_or_404(Robot, id=robot_id)
+        params = request.query_params
+
+        try:
+            after = int(params["after"]) if params.get("after") else None
+            since = _parse_log_bound(params.get("since"), None)
+            conditions = robot_logs.parse_tail_filters(params.getlist("match"), params.getlist("has"))
+        except ValueError as exc:
+            return Response(
+                {"success": False, "message": f"Invalid tail parameters: {exc}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tail = robot_logs.LogTail(
+            robot.id,
+            robot_logs.tail_start(robot.id, after=after, since=since),
+            conditions,
+            follow=params.get("follow", "1") not in ("0", "false"),
+        )
+
+        # Match the server: a mismatched iterator is buffered whole by Django
+        content = tail.__aiter__() if isinstance(request._request, ASGIRequest) else iter(tail)
+        response = StreamingHttpResponse(content, content_type="application/x-ndjson")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
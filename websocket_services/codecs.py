@@ -0,0 +1,122 @@
+"""
+Frame encodings for the robot message sockets.
+
+JSON text frames stay the default. A client can instead offer the
+``msgpack`` or ``cbor`` WebSocket subprotocol (Sec-WebSocket-Protocol);
+the first one offered that this server supports is accepted, and frames
+are then exchanged as binary MessagePack / CBOR maps of the same
+{"event", "data"} shape. JSON text frames are still accepted from
+binary clients. Each binary codec is only offered when its package
+(msgpack, cbor2) is installed.
+
+``manage.py benchmark_ws_codecs`` compares the encodings on typical
+robot telemetry.
+"""
+import json
+
+try:
+    import msgpack
+except ImportError:  # optional: the msgpack subprotocol is not offered
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional: the cbor subprotocol is not offered
+    cbor2 = None
+
+
+class JSONCodec:
+    name = "json"
+    binary = False
+
+    @staticmethod
+    def dumps(frame):
+        return json.dumps(frame)
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    binary = True
+
+    @staticmethod
+    def dumps(frame):
+        return msgpack.packb(frame, use_bin_type=True)
+
+    @staticmethod
+    def loads(data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class CBORCodec:
+    name = "cbor"
+    binary = True
+
+    @staticmethod
+    def dumps(frame):
+        return cbor2.dumps(frame)
+
+    @staticmethod
+    def loads(data):
+        return cbor2.loads(data)
+
+
+CODECS = {JSONCodec.name: JSONCodec}
+if msgpack is not None:
+    CODECS[MsgpackCodec.name] = MsgpackCodec
+if cbor2 is not None:
+    CODECS[CBORCodec.name] = CBORCodec
+
+
+def negotiate(subprotocols):
+    """
+    (codec, subprotocol to accept) for the client's offered subprotocols:
+    the first supported one, else JSON without a subprotocol.
+    """
+    for subprotocol in subprotocols or ():
+        codec = CODECS.get(subprotocol)
+        if codec is not None:
+            return codec, subprotocol
+    return JSONCodec, None
+
+
+class FrameCodecMixin:
+    """
+    Negotiate with select_codec() in connect and pass the result to
+    accept(); then send_frame() / decode_frame() instead of json.
+    """
+
+    codec = JSONCodec
+
+    def select_codec(self):
+        self.codec, subprotocol = negotiate(self.scope.get("subprotocols"))
+        return subprotocol
+
+    def decode_frame(self, text_data=None, bytes_data=None):
+        """A client frame as a dict; None for an empty frame."""
+        if text_data:
+            return JSONCodec.loads(text_data)
+        if bytes_data and self.codec.binary:
+            return self.codec.loads(bytes_data)
+        return None
+
+    async def send_frame(self, frame, key=None, encoded=None):
+        """
+        Send ``frame`` in the socket's encoding. ``encoded`` is a dict shared
+        by the recipients of one group message, so each encoding of it is
+        produced once per process.
+        """
+        if encoded is None:
+            data = self.codec.dumps(frame)
+        else:
+            data = encoded.get(self.codec.name)
+            if data is None:
+                data = encoded[self.codec.name] = self.codec.dumps(frame)
+
+        if self.codec.binary:
+            await self.send(bytes_data=data, key=key)
+        else:
+            await self.send(text_data=data, key=key)
@@ -2,15 +2,71 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 
 
+import asyncio
 import json
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 
-class InspectionConsumer(AsyncWebsocketConsumer):
+from .codecs import FrameCodecMixin
+from .fanout import INVALID_ROLE, RoleRoutingMixin
+from .queues import COALESCE, DISCONNECT, BoundedSendMixin
+from .uploads import ChunkedUploadMixin, is_chunk
+
+
+# Close code for authenticated users not assigned to the robot
+ACCESS_DENIED = 4003
+
+
+async def robot_access_allowed(user, robo_id=None, schedule_id=None, robot_id=None):
+    """
+    Whether ``user`` may follow the robot (by id, robo_id, or the robot of
+    a schedule), using the shared per-user robot set (accounts/access.py).
+    Anonymous connections are let through as before, without a thread hop.
+    """
+    if user is None or not user.is_authenticated:
+        return True
+    return await _robot_access_allowed(user, robo_id, schedule_id, robot_id)
+
+
+@database_sync_to_async
+def _robot_access_allowed(user, robo_id, schedule_id, robot_id):
+    from accounts.access import can_access_robot, is_unrestricted
+    from inseption.models import Schedule
+    from robot_management.models import Robot
+
+    if is_unrestricted(user):
+        return True
+
+    if robot_id is not None:
+        return can_access_robot(user, robot_id)
+
+    if schedule_id is not None:
+        if not str(schedule_id).isdigit():
+            return False
+        robot_id = Schedule.objects.filter(id=schedule_id).values_list("robot_id", flat=True).first()
+    else:
+        robot_id = Robot.objects.filter(robo_id=robo_id).values_list("id", flat=True).first()
+
+    return robot_id is not None and can_access_robot(user, robot_id)
+
+
+class InspectionConsumer(BoundedSendMixin, AsyncWebsocketConsumer):
+    # Every inspection counts: a client that falls behind reconnects and refetches
+    send_overflow = DISCONNECT
+
     async def connect(self):
         self.schedule_id = self.scope["url_route"]["kwargs"]["schedule_id"]
         self.group_name = f"schedule_{self.schedule_id}"
 
+        if not await robot_access_allowed(self.scope.get("user"), schedule_id=self.schedule_id):
+            await self.close(code=ACCESS_DENIED)
+            return
+
+        # ?batch=1 → receive one inspections_created frame per coalesced batch
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        self.batch_mode = query.get("batch", ["0"])[0] in ("1", "true")
+
         await self.channel_layer.group_add(
             self.group_name,
             self.channel_name
@@ -35,9 +91,29 @@ class InspectionConsumer(AsyncWebsocketConsumer):
         "event": "inspection_created",  # fallback to inspection_created
         "data": event["data"]  # full serialized inspection
     }))
+
+    async def inspections_created(self, event):
+        """
+        Coalesced batch from InspectionBroadcaster. Batch-aware clients get
+        a single frame; older clients keep getting one frame per inspection.
+        """
+        if self.batch_mode:
+            await self.send(text_data=json.dumps({
+                "event": "inspections_created",
+                "data": event["data"]
+            }))
+            return
+
+        for inspection in event["data"]:
+            await self.send(text_data=json.dumps({
+                "event": "inspection_created",
+                "data": inspection
+            }))
         
 
-class EmergencyStopConsumer(AsyncWebsocketConsumer):
+class EmergencyStopConsumer(BoundedSendMixin, AsyncWebsocketConsumer):
+    # Each update carries the full state: only the latest matters
+    send_overflow = COALESCE
 
     async def connect(self):
         self.group_name = "emergency_stop"
@@ -65,148 +141,248 @@ class EmergencyStopConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps({
             "event": "emergency_updated",
             "data": event["data"]
-        }))
+        }), key="emergency_updated")
 
 
 
 
 
 
-class RobotMessageConsumer(AsyncWebsocketConsumer):
+class RobotMessageConsumer(
+    ChunkedUploadMixin, FrameCodecMixin, RoleRoutingMixin, BoundedSendMixin, AsyncWebsocketConsumer
+):
+    # Telemetry streams (pose, battery ...): a slow client gets the latest of each event
+    send_overflow = COALESCE
 
     async def connect(self):
         # Get robo_id from URL
         self.robo_id = self.scope["url_route"]["kwargs"]["robo_id"]
 
-        # Validate robot exists and active
-        robot = await self.get_robot(self.robo_id)
-        if not robot:
+        # Validate robot exists and active (in-memory registry, no query)
+        from robot_management.registry import robot_registry
+        self.robot_id = robot_id = await robot_registry.robot_id(self.robo_id)
+        if robot_id is None:
             await self.close(code=4001)
             return
 
         # Per-robot group
         self.group_name = f"robot_message_{self.robo_id}"
 
-        await self.channel_layer.group_add(
-            self.group_name,
-            self.channel_name
-        )
+        if not await robot_access_allowed(self.scope.get("user"), robot_id=robot_id):
+            await self.close(code=ACCESS_DENIED)
+            return
 
-        await self.accept()
+        # ?role=robot | dashboard → frames only go to the other side
+        if not self.parse_role(parse_qs(self.scope.get("query_string", b"").decode())):
+            await self.close(code=INVALID_ROLE)
+            return
 
-        await self.send(text_data=json.dumps({
+        await self.join_groups()
+
+        # Sec-WebSocket-Protocol: msgpack | cbor → binary frames, else JSON text
+        await self.accept(subprotocol=self.select_codec())
+
+        await self.send_frame({
             "event": "connected",
             "robot": self.robo_id,
+            "role": self.role,
             "message": "WebSocket connected"
-        }))
+        })
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name
-        )
+        self.drop_uploads()
+        await self.leave_groups()
 
     # 🔹 Client → Server
-    async def receive(self, text_data):
-        data = json.loads(text_data)
+    async def receive(self, text_data=None, bytes_data=None):
+        # Inspection frame upload chunk (uploads.py)
+        if is_chunk(bytes_data):
+            await self.receive_chunk(bytes_data)
+            return
+
+        data = self.decode_frame(text_data, bytes_data)
+        if data is None:
+            return
 
         event = data.get("event")
         payload = data.get("data", {})
 
+        if event in self.upload_events:
+            await self.handle_upload_event(event, payload)
+            return
+
         # ping-pong
         if event == "ping":
-            await self.send(text_data=json.dumps({
+            await self.send_frame({
                 "event": "pong"
-            }))
+            })
             return
 
-        # 🔥 Send ONLY to this robot's group
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "robot_message",  # MUST match method below
-                "event": event,
-                "data": payload
-            }
-        )
+        # 🔥 Send ONLY to the other side of this robot's group
+        await self.route({
+            "type": "robot_message",  # MUST match method below
+            "event": event,
+            "data": payload
+        })
 
     # 🔹 Group → WebSocket
     async def robot_message(self, event):
-        await self.send(text_data=json.dumps({
+        if self.is_own_frame(event):
+            return
+        await self.send_frame({
             "event": event["event"],
             "data": event["data"]
-        }))
+        }, key=event["event"], encoded=event.setdefault("encoded", {}))
 
-    @database_sync_to_async
-    def get_robot(self, robo_id):
-        from robot_management.models import Robot
-        return Robot.objects.filter(
-            robo_id=robo_id,
-            is_active=True
-        ).first()
 
 
 
 
-
-class RobotProfileMessageConsumer(AsyncWebsocketConsumer):
+class RobotProfileMessageConsumer(FrameCodecMixin, RoleRoutingMixin, BoundedSendMixin, AsyncWebsocketConsumer):
+    send_overflow = COALESCE
 
     async def connect(self):
         # URL param
         self.robo_id = self.scope["url_route"]["kwargs"]["robo_id"]
 
+        from robot_management.registry import robot_registry
+        robot_id = await robot_registry.robot_id(self.robo_id)
+        if robot_id is None:
+            await self.close(code=4001)
+            return
+
         # Group name (profile_id removed)
         self.group_name = f"robot_profile_{self.robo_id}"
 
+        if not await robot_access_allowed(self.scope.get("user"), robot_id=robot_id):
+            await self.close(code=ACCESS_DENIED)
+            return
+
+        if not self.parse_role(parse_qs(self.scope.get("query_string", b"").decode())):
+            await self.close(code=INVALID_ROLE)
+            return
+
         # Join group
-        await self.channel_layer.group_add(
-            self.group_name,
-            self.channel_name
-        )
+        await self.join_groups()
 
-        await self.accept()
+        await self.accept(subprotocol=self.select_codec())
 
         # Optional: notify client on connect
-        await self.send(text_data=json.dumps({
+        await self.send_frame({
             "event": "CONNECTED",
             "data": {
                 "robo_id": self.robo_id
             }
-        }))
+        })
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name
-        )
+        await self.leave_groups()
 
     async def receive(self, text_data=None, bytes_data=None):
         """
         Handle messages coming FROM Robot / Postman
         """
-        if not text_data:
+        payload = self.decode_frame(text_data, bytes_data)
+        if payload is None:
             return
 
-        payload = json.loads(text_data)
-
         event = payload.get("event")
         data = payload.get("data", {})
 
-        # Broadcast message to group
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
-                "type": "robot_message",
-                "event": event,
-                "data": data,
-            }
-        )
+        # Robot → dashboards, dashboard → robot (everyone else if untagged)
+        await self.route({
+            "type": "robot_message",
+            "event": event,
+            "data": data,
+        })
 
     async def robot_message(self, event):
         """
         Handle messages sent via group_send (backend → websocket)
         """
-        await self.send(text_data=json.dumps({
+        if self.is_own_frame(event):
+            return
+        await self.send_frame({
             "event": event.get("event"),
             "data": event.get("data")
-        }))
\ No newline at end of file
+        }, key=event.get("event"), encoded=event.setdefault("encoded", {}))
+
+
+
+class RobotLogTailConsumer(BoundedSendMixin, AsyncWebsocketConsumer):
+    """
+    Live tail of a robot's logs. Query string as the HTTP tail endpoint
+    (after / since / match / has). Frames: {"event": "logs", "data": [...],
+    "cursor": id}; reconnect with ?after=<cursor> to resume. Ingest only
+    rings the group, each connection then reads its own filtered rows.
+    """
+
+    # Rows are read only as fast as the queue drains; a client that still
+    # overflows it resumes from its cursor
+    send_overflow = DISCONNECT
+
+    async def connect(self):
+        from robot_management import logs as robot_logs
+
+        self.robot_id = int(self.scope["url_route"]["kwargs"]["robot_id"])
+        self.group_name = robot_logs.tail_group(self.robot_id)
+
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4001)
+            return
+        if not await robot_access_allowed(user, robot_id=self.robot_id):
+            await self.close(code=ACCESS_DENIED)
+            return
+
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            after = int(query["after"][0]) if query.get("after") else None
+            since = query["since"][0] if query.get("since") else None
+            if since is not None:
+                from django.utils.dateparse import parse_datetime
+                since = parse_datetime(since)
+                if since is None:
+                    raise ValueError("since")
+            self.conditions = robot_logs.parse_tail_filters(query.get("match", []), query.get("has", []))
+        except ValueError:
+            await self.close(code=4000)
+            return
+
+        self.cursor = await database_sync_to_async(robot_logs.tail_start)(
+            self.robot_id, after=after, since=since
+        )
+        self.fetch = database_sync_to_async(robot_logs.tail_entries)
+        self.flush_lock = asyncio.Lock()
+
+        # Join before the backlog read so nothing appended in between is missed
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.flush()
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def flush(self):
+        self.pending = True
+        if self.flush_lock.locked():
+            # The running flush sees ``pending`` and reads once more
+            return
+        async with self.flush_lock:
+            while self.pending:
+                self.pending = False
+                caught_up = False
+                while not caught_up:
+                    await self.wait_for_send_room()
+                    entries, self.cursor, caught_up = await self.fetch(
+                        self.robot_id, self.cursor, self.conditions
+                    )
+                    if entries:
+                        await self.send(text_data=json.dumps({
+                            "event": "logs",
+                            "data": entries,
+                            "cursor": self.cursor,
+                        }))
+
+    async def logs_appended(self, event):
+        await self.flush()
@@ -0,0 +1,190 @@
+"""
+Role-aware fan-out for the robot message sockets.
+
+A socket on ws/robot_message/<robo_id>/ (and .../profile/) says what it is
+with ``?role=robot`` or ``?role=dashboard``. Besides the robot's group,
+which backend senders (views, dispatcher) keep using, each socket joins
+the directed group of the side it receives from:
+
+    <group>.robots       robots and untagged sockets; dashboards send here
+    <group>.dashboards   dashboards and untagged sockets; robots send here
+
+so a robot's telemetry goes to the dashboards only and never echoes back
+to the robot. Untagged sockets (older clients) send to the whole group
+and skip their own frames.
+
+LocalGroups delivers a group message straight to the consumers of this
+process, without the channel-layer (Redis) round trip, when all members
+of the group are local. A process with members claims the group in the
+shared cache; any other process with members marks it shared. Both keys
+expire unless refreshed every WS_LOCAL_DELIVERY_REFRESH_SECONDS, so a
+crashed worker's marks go away on their own, and anything short of "own
+claim, no shared mark" (missing keys after an eviction or a flush, a
+cache error) means group_send. A new claim starts out marked shared for
+two intervals, giving other workers time to mark it again after a flush.
+Marks are re-read at most every interval, so a socket joining on another
+worker can miss up to that long of traffic sent to it.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import defaultdict
+
+from channels.consumer import get_handler_name
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ROBOT = "robot"
+DASHBOARD = "dashboard"
+ROLES = (ROBOT, DASHBOARD)
+
+# Close code for an unknown ?role=
+INVALID_ROLE = 4000
+
+CACHE_PREFIX = "ws_group_members"
+
+
+class LocalGroups:
+    """Consumers of this process by group, and whether other processes have any."""
+
+    def __init__(self):
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.members = defaultdict(dict)
+        self._exclusive = {}
+        self._refresher = None
+
+    @staticmethod
+    def _keys(group):
+        return f"{CACHE_PREFIX}:{group}:owner", f"{CACHE_PREFIX}:{group}:shared"
+
+    async def _claim(self, groups):
+        """Claim ``groups`` for this process, or mark them shared if another process holds them."""
+        interval = settings.WS_LOCAL_DELIVERY_REFRESH_SECONDS
+        keys = {group: self._keys(group) for group in groups}
+        owners = await cache.aget_many([owner for owner, _ in keys.values()])
+
+        renew = {}
+        for owner, shared in keys.values():
+            holder = owners.get(owner)
+            if holder is None:
+                # Shared mark first: a send in between must not see a bare claim
+                await cache.aset(shared, True, interval * 2)
+                holder = self.worker if await cache.aadd(owner, self.worker, interval * 3) else None
+            if holder == self.worker:
+                renew[owner] = self.worker
+            else:
+                renew[shared] = True
+        await cache.aset_many(renew, interval * 3)
+
+    async def _refresh(self):
+        while self.members:
+            try:
+                await self._claim(list(self.members))
+            except Exception:
+                logger.exception("Refreshing WebSocket group claims failed")
+            await asyncio.sleep(settings.WS_LOCAL_DELIVERY_REFRESH_SECONDS)
+
+    def _ensure_refresher(self):
+        # One refresher per event loop (tests and async_to_sync run several)
+        refresher = self._refresher
+        if refresher is None or refresher.done() or refresher.get_loop() is not asyncio.get_running_loop():
+            self._refresher = asyncio.ensure_future(self._refresh())
+
+    async def _is_exclusive(self, group):
+        """True only if this process holds the group's claim and nobody marked it shared."""
+        exclusive, read_at = self._exclusive.get(group, (False, None))
+        if read_at is None or time.monotonic() - read_at >= settings.WS_LOCAL_DELIVERY_REFRESH_SECONDS:
+            owner, shared = self._keys(group)
+            try:
+                found = await cache.aget_many([owner, shared])
+            except Exception:
+                logger.exception("Reading WebSocket group claim of %s failed", group)
+                found = {}
+            exclusive = found.get(owner) == self.worker and shared not in found
+            self._exclusive[group] = (exclusive, time.monotonic())
+        return exclusive
+
+    async def add(self, channel_layer, group, consumer):
+        self.members[group][consumer.channel_name] = consumer
+        await channel_layer.group_add(group, consumer.channel_name)
+        try:
+            await self._claim([group])
+        except Exception:
+            logger.exception("Claiming WebSocket group %s failed", group)
+        self._ensure_refresher()
+
+    async def discard(self, channel_layer, group, consumer):
+        local = self.members.get(group)
+        if local is not None:
+            local.pop(consumer.channel_name, None)
+            if not local:
+                del self.members[group]
+                self._exclusive.pop(group, None)
+        await channel_layer.group_discard(group, consumer.channel_name)
+
+    async def send(self, channel_layer, group, message):
+        """group_send, or direct calls to the handlers if every member is known to be local."""
+        local = list(self.members.get(group, {}).values())
+        if not local or not await self._is_exclusive(group):
+            await channel_layer.group_send(group, message)
+            return
+
+        for consumer in local:
+            try:
+                await getattr(consumer, get_handler_name(message))(message)
+            except Exception:
+                logger.exception("Local delivery to %s failed", consumer.channel_name)
+
+
+local_groups = LocalGroups()
+
+
+class RoleRoutingMixin:
+    """
+    For consumers with a per-robot ``group_name``. Call join_groups() in
+    connect (after parse_role()), leave_groups() in disconnect and route()
+    for client frames; handlers of routed messages call is_own_frame().
+    """
+
+    def parse_role(self, query):
+        """Role from the parsed query string; False if it is not a known role."""
+        role = query.get("role", [None])[0]
+        if role is not None and role not in ROLES:
+            return False
+        self.role = role
+        return True
+
+    def receive_groups(self):
+        if self.role == ROBOT:
+            return [f"{self.group_name}.robots"]
+        if self.role == DASHBOARD:
+            return [f"{self.group_name}.dashboards"]
+        return [f"{self.group_name}.robots", f"{self.group_name}.dashboards"]
+
+    async def join_groups(self):
+        self.joined_groups = [self.group_name, *self.receive_groups()]
+        for group in self.joined_groups:
+            await local_groups.add(self.channel_layer, group, self)
+
+    async def leave_groups(self):
+        for group in getattr(self, "joined_groups", ()):
+            await local_groups.discard(self.channel_layer, group, self)
+        self.joined_groups = []
+
+    async def route(self, message):
+        """Send a client frame to the other side (everyone else if untagged)."""
+        if self.role == ROBOT:
+            await local_groups.send(self.channel_layer, f"{self.group_name}.dashboards", message)
+        elif self.role == DASHBOARD:
+            await local_groups.send(self.channel_layer, f"{self.group_name}.robots", message)
+        else:
+            await local_groups.send(
+                self.channel_layer, self.group_name, {**message, "sender": self.channel_name}
+            )
+
+    def is_own_frame(self, message):
+        return message.get("sender") == self.channel_name
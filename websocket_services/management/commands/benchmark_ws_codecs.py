@@ -0,0 +1,102 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from websocket_services.codecs import CODECS
+
+
+def pose(rng, seq):
+    return {
+        "event": "pose",
+        "data": {
+            "x": round(rng.uniform(-50, 50), 4),
+            "y": round(rng.uniform(-50, 50), 4),
+            "theta": round(rng.uniform(-3.1416, 3.1416), 5),
+            "linear_velocity": round(rng.uniform(0, 1.5), 3),
+            "angular_velocity": round(rng.uniform(-1, 1), 3),
+            "frame": "map",
+            "seq": seq,
+            "ts": time.time(),
+        },
+    }
+
+
+def battery(rng, seq):
+    return {
+        "event": "battery",
+        "data": {
+            "percentage": rng.randint(5, 100),
+            "voltage": round(rng.uniform(22.0, 29.4), 2),
+            "current": round(rng.uniform(-8, 3), 2),
+            "charging": rng.random() < 0.2,
+            "ts": time.time(),
+        },
+    }
+
+
+def calibration_point(rng, seq):
+    return {
+        "event": "calibration_point",
+        "data": {
+            "hand": rng.choice(["left", "right"]),
+            "point": rng.choice(["point_one", "point_two", "point_three"]),
+            "x": round(rng.uniform(-0.8, 0.8), 5),
+            "y": round(rng.uniform(-0.8, 0.8), 5),
+            "z": round(rng.uniform(0, 1.2), 5),
+            "joints": [round(rng.uniform(-3.1416, 3.1416), 5) for _ in range(6)],
+            "ts": time.time(),
+        },
+    }
+
+
+# Share of each stream in a robot's traffic: pose at ~10 Hz dominates
+STREAMS = [(pose, 10), (battery, 1), (calibration_point, 1)]
+
+
+class Command(BaseCommand):
+    help = "Bytes and CPU per message of the WebSocket frame encodings (JSON, msgpack, CBOR) on robot telemetry"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=100000, help="Messages per codec")
+        parser.add_argument("--robots", type=int, default=50, help="Robots streaming at once")
+        parser.add_argument("--rate", type=float, default=12, help="Messages per second per robot")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        makers = [maker for maker, weight in STREAMS for _ in range(weight)]
+        frames = [rng.choice(makers)(rng, seq) for seq in range(options["messages"])]
+        rate = options["robots"] * options["rate"]
+
+        self.stdout.write(
+            f"{len(frames)} messages, pose/battery/calibration_point = "
+            f"{'/'.join(str(weight) for _, weight in STREAMS)}; "
+            f"CPU share at {rate:g} msg/s ({options['robots']} robots x {options['rate']:g}/s), one core"
+        )
+        self.stdout.write(
+            f"{'codec':<8} {'bytes/msg':>10} {'encode us':>10} {'decode us':>10} {'CPU share':>10}"
+        )
+
+        baseline = None
+        for name, codec in CODECS.items():
+            dumps, loads = codec.dumps, codec.loads
+
+            started = time.process_time()
+            encoded = [dumps(frame) for frame in frames]
+            encode = (time.process_time() - started) / len(frames)
+
+            started = time.process_time()
+            for data in encoded:
+                loads(data)
+            decode = (time.process_time() - started) / len(frames)
+
+            # Bytes on the wire (text frames are UTF-8)
+            size = sum(len(data.encode() if isinstance(data, str) else data) for data in encoded) / len(frames)
+            baseline = baseline or size
+
+            self.stdout.write(
+                f"{name:<8} {size:>10.1f} {encode * 1e6:>10.2f} {decode * 1e6:>10.2f} "
+                f"{(encode + decode) * rate:>9.2%}"
+                + ("" if size == baseline else f"  ({size / baseline:.0%} of json)")
+            )
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from websocket_services.queues import COUNTERS, collect
+
+
+class Command(BaseCommand):
+    help = "Per-group WebSocket send queue depth and drops, summed over the ASGI workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Print the counters as JSON")
+
+    def handle(self, *args, **options):
+        workers, groups = collect()
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"workers": workers, "groups": groups}, indent=2))
+            return
+
+        self.stdout.write(f"{workers} worker(s) reporting")
+        width = max([len("group")] + [len(group) for group in groups])
+        self.stdout.write("  ".join(["group".ljust(width)] + [name.rjust(15) for name in COUNTERS]))
+        # Worst first: dropped, then current depth
+        for group, counters in sorted(
+            groups.items(), key=lambda item: (-item[1]["dropped"], -item[1]["depth"], item[0])
+        ):
+            self.stdout.write("  ".join(
+                [group.ljust(width)] + [str(counters[name]).rjust(15) for name in COUNTERS]
+            ))
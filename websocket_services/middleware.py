@@ -0,0 +1,42 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers can't set an Authorization header on a WebSocket handshake, so
+the access token is passed as ``?token=<jwt>``. A valid token replaces the
+session user set by AuthMiddlewareStack; without one the scope keeps it
+(usually AnonymousUser).
+"""
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+
+
+@database_sync_to_async
+def get_token_user(raw_token):
+    # Imported here: asgi.py loads this module before Django apps are ready
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    authentication = JWTAuthentication()
+    try:
+        validated = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated)
+    except (InvalidToken, TokenError):
+        return None
+
+
+class JWTAuthMiddleware:
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token", [None])[0]
+
+        if token:
+            user = await get_token_user(token)
+            if user is not None:
+                scope = dict(scope, user=user)
+
+        return await self.inner(scope, receive, send)
@@ -0,0 +1,225 @@
+"""
+Bounded outbound queues for WebSocket consumers.
+
+A consumer handles its channel-layer messages one at a time, so a handler
+awaiting a slow socket stalls the consumer's inbox; once that reaches the
+channels_redis capacity, group_send silently drops messages for it (and
+expiry drops the ones that waited too long). With BoundedSendMixin, send()
+only puts the frame on a per-socket queue of WS_SEND_QUEUE_SIZE frames that
+a writer task drains, so handlers return at once and the inbox keeps
+moving. How much a slow client holds the writer back depends on the ASGI
+server applying backpressure on websocket.send.
+
+When the queue is full the consumer's ``send_overflow`` policy applies:
+
+    DROP_OLDEST  the oldest queued frame is discarded
+    COALESCE     the frame replaces the queued frame with the same key
+                 (send(..., key=event)), else the oldest frame is discarded
+    DISCONNECT   the socket is closed with SEND_QUEUE_OVERFLOW; the client
+                 reconnects and resyncs
+
+Socket count, queue depth, sent / dropped / coalesced frames and overflow
+disconnects are counted per group in each process and published to the
+cache every WS_QUEUE_METRICS_INTERVAL seconds; ``manage.py
+websocket_queue_stats`` adds up the workers.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+
+# Close code sent to clients that fell too far behind (DISCONNECT policy)
+SEND_QUEUE_OVERFLOW = 4008
+
+CACHE_PREFIX = "ws_queue_stats"
+WORKERS_KEY = f"{CACHE_PREFIX}:workers"
+
+COUNTERS = ("sockets", "depth", "max_depth", "sent", "dropped", "coalesced", "overflow_closes")
+
+
+class QueueStats:
+    """Per-group send queue counters of this process."""
+
+    def __init__(self):
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.groups = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self._published_at = 0
+        self._publishing = None
+
+    def add(self, group, **deltas):
+        counters = self.groups[group]
+        for name, delta in deltas.items():
+            counters[name] += delta
+        if counters["depth"] > counters["max_depth"]:
+            counters["max_depth"] = counters["depth"]
+
+    def snapshot(self):
+        return {group: dict(counters) for group, counters in self.groups.items()}
+
+    def maybe_publish(self):
+        """Start a publish in the background if the interval has passed."""
+        now = time.monotonic()
+        if now - self._published_at < settings.WS_QUEUE_METRICS_INTERVAL:
+            return
+        if self._publishing is not None and not self._publishing.done():
+            return
+        self._published_at = now
+        self._publishing = asyncio.ensure_future(self.publish())
+
+    async def publish(self):
+        interval = settings.WS_QUEUE_METRICS_INTERVAL
+        try:
+            await cache.aset(f"{CACHE_PREFIX}:{self.worker}", self.snapshot(), interval * 3)
+            # Read-modify-write: a worker lost to a race is back on its next publish
+            workers = await cache.aget(WORKERS_KEY) or {}
+            workers[self.worker] = time.time()
+            await cache.aset(WORKERS_KEY, workers, None)
+        except Exception:
+            logger.exception("Publishing WebSocket queue stats failed")
+
+
+queue_stats = QueueStats()
+
+
+def collect(stale_after=None):
+    """
+    Per-group counters summed over the workers that published recently.
+    max_depth is the largest of the workers'.
+    """
+    stale_after = stale_after or settings.WS_QUEUE_METRICS_INTERVAL * 3
+    workers = cache.get(WORKERS_KEY) or {}
+    now = time.time()
+    live = [worker for worker, seen in workers.items() if now - seen <= stale_after]
+    snapshots = cache.get_many([f"{CACHE_PREFIX}:{worker}" for worker in live])
+
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for snapshot in snapshots.values():
+        for group, counters in snapshot.items():
+            total = totals[group]
+            for name, value in counters.items():
+                if name == "max_depth":
+                    total[name] = max(total[name], value)
+                else:
+                    total[name] += value
+    return len(snapshots), dict(totals)
+
+
+class BoundedSendMixin:
+    """
+    Put before AsyncWebsocketConsumer. Frames passed to send() go through
+    the bounded queue; accept() and close() are not queued. ``group_name``
+    labels the metrics.
+    """
+
+    send_overflow = DROP_OLDEST
+
+    def _send_queue_init(self):
+        self._send_queue = deque()
+        self._queued_by_key = {}
+        self._send_ready = asyncio.Event()
+        self._send_room = asyncio.Event()
+        self._send_room.set()
+        self._send_closed = False
+        self._send_group = getattr(self, "group_name", None) or type(self).__name__
+        queue_stats.add(self._send_group, sockets=1)
+        self._send_writer = asyncio.ensure_future(self._drain_send_queue())
+
+    async def send(self, text_data=None, bytes_data=None, close=False, key=None):
+        if close:
+            await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+            return
+
+        if not hasattr(self, "_send_queue"):
+            self._send_queue_init()
+        if self._send_closed:
+            return
+
+        stats = queue_stats
+        group = self._send_group
+
+        if len(self._send_queue) >= settings.WS_SEND_QUEUE_SIZE:
+            if self.send_overflow == DISCONNECT:
+                await self._overflow_close()
+                return
+
+            queued = self._queued_by_key.get(key) if key is not None else None
+            if self.send_overflow == COALESCE and queued is not None:
+                # Keep the older frame's place, deliver the newer content
+                queued[1], queued[2] = text_data, bytes_data
+                stats.add(group, coalesced=1)
+                stats.maybe_publish()
+                return
+
+            self._pop_queued()
+            stats.add(group, depth=-1, dropped=1)
+
+        entry = [key, text_data, bytes_data]
+        self._send_queue.append(entry)
+        if key is not None:
+            self._queued_by_key[key] = entry
+        if len(self._send_queue) >= settings.WS_SEND_QUEUE_SIZE:
+            self._send_room.clear()
+        self._send_ready.set()
+        stats.add(group, depth=1)
+        stats.maybe_publish()
+
+    async def wait_for_send_room(self):
+        """For producers that would rather wait than overflow (e.g. backlog reads)."""
+        if hasattr(self, "_send_queue"):
+            await self._send_room.wait()
+
+    def _pop_queued(self):
+        entry = self._send_queue.popleft()
+        if self._queued_by_key.get(entry[0]) is entry:
+            del self._queued_by_key[entry[0]]
+        self._send_room.set()
+        return entry
+
+    async def _drain_send_queue(self):
+        try:
+            while True:
+                await self._send_ready.wait()
+                while self._send_queue:
+                    _, text_data, bytes_data = self._pop_queued()
+                    queue_stats.add(self._send_group, depth=-1, sent=1)
+                    await super().send(text_data=text_data, bytes_data=bytes_data)
+                self._send_ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("WebSocket writer for %s stopped", self._send_group)
+            self._stop_send_queue()
+
+    async def _overflow_close(self):
+        logger.warning(
+            "Closing WebSocket on %s: %d frames queued", self._send_group, len(self._send_queue)
+        )
+        queue_stats.add(self._send_group, overflow_closes=1)
+        self._stop_send_queue()
+        await self.close(code=SEND_QUEUE_OVERFLOW)
+
+    def _stop_send_queue(self):
+        if not hasattr(self, "_send_queue") or self._send_closed:
+            return
+        self._send_closed = True
+        self._send_writer.cancel()
+        queue_stats.add(self._send_group, sockets=-1, depth=-len(self._send_queue), dropped=len(self._send_queue))
+        self._send_queue.clear()
+        self._queued_by_key.clear()
+        self._send_room.set()
+        queue_stats.maybe_publish()
+
+    async def websocket_disconnect(self, message):
+        self._stop_send_queue()
+        await super().websocket_disconnect(message)
@@ -1,5 +1,6 @@
 from django.urls import re_path
 from .consumers import InspectionConsumer,EmergencyStopConsumer,RobotMessageConsumer,RobotProfileMessageConsumer
+from .consumers import RobotLogTailConsumer
 
 websocket_urlpatterns = [
     
@@ -17,4 +18,6 @@ websocket_urlpatterns = [
         RobotProfileMessageConsumer.as_asgi()
     ),
 
+    re_path(r"ws/robot_logs/(?P<robot_id>\d+)/$", RobotLogTailConsumer.as_asgi()),
+
 ]
@@ -1,3 +1,81 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .fanout import LocalGroups
+
+GROUP = "robot_message_RB-1.dashboards"
+
+
+class Dashboard:
+    channel_name = "specific.local!dashboard"
+
+    def __init__(self):
+        self.received = []
+
+    async def robot_message(self, message):
+        self.received.append(message)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    WS_LOCAL_DELIVERY_REFRESH_SECONDS=60,
+)
+class LocalGroupsTests(SimpleTestCase):
+    """Local delivery only when no other process can have members."""
+
+    message = {"type": "robot_message", "event": "pose", "data": {}}
+
+    def setUp(self):
+        cache.clear()
+        self.groups = LocalGroups()
+        self.layer = mock.AsyncMock()
+        self.dashboard = Dashboard()
+
+    async def join(self):
+        await self.groups.add(self.layer, GROUP, self.dashboard)
+        self.groups._refresher.cancel()
+
+    async def send(self):
+        # Re-read the marks every time rather than once a minute
+        self.groups._exclusive.clear()
+        await self.groups.send(self.layer, GROUP, self.message)
+        return self.layer.group_send.await_count
+
+    async def test_new_claim_uses_channel_layer_until_settled(self):
+        await self.join()
+        self.assertEqual(await self.send(), 1)
+
+        # Settle mark expired, nobody else marked the group
+        owner, shared = self.groups._keys(GROUP)
+        await cache.adelete(shared)
+        self.assertEqual(await self.send(), 1)
+        self.assertEqual(self.dashboard.received, [self.message])
+
+    async def test_member_in_other_process_uses_channel_layer(self):
+        await self.join()
+        other = LocalGroups()
+        other.worker = "other:1"
+        await other.add(self.layer, GROUP, Dashboard())
+        other._refresher.cancel()
+
+        owner, shared = self.groups._keys(GROUP)
+        await cache.adelete(shared)
+        # Re-marked by the other process on its next refresh
+        await other._claim([GROUP])
+        self.assertEqual(await self.send(), 1)
+        self.assertEqual(self.dashboard.received, [])
+
+    async def test_flushed_cache_falls_back_to_channel_layer(self):
+        await self.join()
+        owner, shared = self.groups._keys(GROUP)
+        await cache.adelete(shared)
+        self.assertEqual(await self.send(), 0)
+
+        await cache.aclear()
+        self.assertEqual(await self.send(), 1)
+        # Reclaimed by the refresh, but still marked shared while others re-mark
+        await self.groups._claim([GROUP])
+        self.assertEqual(await self.send(), 2)
+        self.assertEqual(len(self.dashboard.received), 1)
@@ -0,0 +1,220 @@
+"""
+Inspection frame uploads over the robot's WebSocket.
+
+A robot that already holds ws/robot_message/<robo_id>/ can send its rim
+frames on it instead of one HTTPS multipart request per frame:
+
+1. control frame (JSON, or the socket's binary codec)
+
+       {"event": "upload_start", "data": {
+           "upload_id": "<uuid>", "schedule_id": 12, "size": 183422,
+           "filename": "rim.jpg", "item": {"rim_id": "...", "is_defect": true, ...}}}
+
+2. binary chunk frames, sent right after (no need to wait for a reply)
+
+       b"RIMC" + upload_id (16 bytes) + seq (uint32, big endian, from 0) + bytes
+
+   appended as they arrive to a temporary file, like a large multipart
+   upload.
+
+3. once ``size`` bytes are in, the frame goes through ingest_inspections()
+   (same validation, content-addressed storage, counters and broadcast as
+   the batch endpoint) and the socket gets ``upload_complete`` with the
+   inspection, or ``upload_error`` with the reason.
+
+``{"event": "upload_abort", "data": {"upload_id": ...}}`` drops an upload.
+Uploads need an authenticated socket (?token=) and a schedule of this
+robot; WS_UPLOAD_MAX_BYTES and WS_UPLOAD_MAX_PENDING bound a socket's
+uploads, and unfinished ones are dropped on disconnect.
+"""
+import logging
+import struct
+import uuid
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MAGIC = b"RIMC"
+CHUNK_HEADER = struct.Struct("!4s16sI")
+
+
+class UploadError(Exception):
+    pass
+
+
+class Upload:
+
+    def __init__(self, upload_id, schedule, size, filename, item):
+        self.upload_id = upload_id
+        self.schedule = schedule
+        self.size = size
+        self.item = item
+        self.next_seq = 0
+        self.received = 0
+        self.file = TemporaryUploadedFile(filename, None, size, None)
+
+    def write(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+@database_sync_to_async
+def _schedule_of_robot(schedule_id, robot_id):
+    from inseption.models import Schedule
+    return Schedule.objects.filter(id=schedule_id, robot_id=robot_id).first()
+
+
+@database_sync_to_async
+def _ingest(upload):
+    from inseption.broadcast import inspection_broadcaster
+    from inseption.ingest import ingest_inspections
+
+    # Image validation opens the temporary file by path
+    upload.file.flush()
+    upload.file.seek(0)
+    try:
+        created, results = ingest_inspections(upload.schedule, [{**upload.item, "image": upload.file}])
+    except IntegrityError:
+        return {"rim_id": ["rim_id conflict while saving, retry the upload"]}, None
+
+    result = results[0]
+    if not result["success"]:
+        return result["errors"], None
+
+    inspection_broadcaster.publish(f"schedule_{upload.schedule.id}", result["inspection"])
+    return None, result["inspection"]
+
+
+def is_chunk(bytes_data):
+    return bytes_data is not None and bytes_data[:4] == CHUNK_MAGIC
+
+
+class ChunkedUploadMixin:
+    """
+    For consumers of one robot (``robot_id``) with FrameCodecMixin.
+    receive() hands chunk frames to receive_chunk() and upload_* control
+    events to handle_upload_event(); disconnect() calls drop_uploads().
+    """
+
+    upload_events = ("upload_start", "upload_abort")
+
+    @property
+    def uploads(self):
+        if not hasattr(self, "_uploads"):
+            self._uploads = {}
+        return self._uploads
+
+    async def send_upload_error(self, upload_id, errors):
+        await self.send_frame({
+            "event": "upload_error",
+            "data": {"upload_id": upload_id, "errors": errors},
+        })
+
+    async def handle_upload_event(self, event, data):
+        upload_id = data.get("upload_id") if isinstance(data, dict) else None
+        try:
+            key = uuid.UUID(str(upload_id)).bytes
+        except ValueError:
+            await self.send_upload_error(upload_id, {"upload_id": ["Must be a UUID."]})
+            return
+
+        if event == "upload_abort":
+            self._drop_upload(key)
+            return
+
+        try:
+            upload = await self._start_upload(key, data)
+        except UploadError as exc:
+            await self.send_upload_error(upload_id, {"upload": [str(exc)]})
+            return
+        self.uploads[key] = upload
+
+    async def _start_upload(self, key, data):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            raise UploadError("Uploads need an authenticated connection (?token=).")
+        if key in self.uploads:
+            raise UploadError("An upload with this id is already in progress.")
+        if len(self.uploads) >= settings.WS_UPLOAD_MAX_PENDING:
+            raise UploadError(f"At most {settings.WS_UPLOAD_MAX_PENDING} uploads at a time.")
+
+        size = data.get("size")
+        if not isinstance(size, int) or not 0 < size <= settings.WS_UPLOAD_MAX_BYTES:
+            raise UploadError(f"size must be 1..{settings.WS_UPLOAD_MAX_BYTES} bytes.")
+        item = data.get("item")
+        if not isinstance(item, dict):
+            raise UploadError("item must be an object of inspection fields.")
+        schedule_id = data.get("schedule_id")
+        if not isinstance(schedule_id, int):
+            raise UploadError("schedule_id must be an integer.")
+
+        schedule = await _schedule_of_robot(schedule_id, self.robot_id)
+        if schedule is None:
+            raise UploadError("Schedule not found for this robot.")
+
+        filename = str(data.get("filename") or "frame.jpg")
+        return await sync_to_async(Upload, thread_sensitive=False)(
+            str(uuid.UUID(bytes=key)), schedule, size, filename, item
+        )
+
+    async def receive_chunk(self, bytes_data):
+        if len(bytes_data) < CHUNK_HEADER.size:
+            await self.send_upload_error(None, {"chunk": ["Truncated chunk header."]})
+            return
+
+        _, key, seq = CHUNK_HEADER.unpack_from(bytes_data)
+        payload = memoryview(bytes_data)[CHUNK_HEADER.size:]
+        upload = self.uploads.get(key)
+        upload_id = str(uuid.UUID(bytes=key))
+
+        if upload is None:
+            await self.send_upload_error(upload_id, {"chunk": ["Unknown upload id."]})
+            return
+        if seq != upload.next_seq or upload.received + len(payload) > upload.size:
+            self._drop_upload(key)
+            await self.send_upload_error(upload_id, {
+                "chunk": [f"Expected chunk {upload.next_seq} within {upload.size} bytes, got chunk {seq}."]
+            })
+            return
+
+        # Disk writes off the event loop; frames of a socket arrive in order
+        await sync_to_async(upload.write, thread_sensitive=False)(payload)
+        upload.next_seq += 1
+        upload.received += len(payload)
+
+        if upload.received == upload.size:
+            del self.uploads[key]
+            await self._finish_upload(upload)
+
+    async def _finish_upload(self, upload):
+        try:
+            errors, inspection = await _ingest(upload)
+        except Exception:
+            logger.exception("WebSocket upload %s failed", upload.upload_id)
+            errors, inspection = {"upload": ["Could not store the frame."]}, None
+        finally:
+            upload.close()
+
+        if errors:
+            await self.send_upload_error(upload.upload_id, errors)
+            return
+        await self.send_frame({
+            "event": "upload_complete",
+            "data": {"upload_id": upload.upload_id, "inspection": inspection},
+        })
+
+    def _drop_upload(self, key):
+        upload = self.uploads.pop(key, None)
+        if upload is not None:
+            upload.close()
+
+    def drop_uploads(self):
+        for key in list(self.uploads):
+            self._drop_upload(key)